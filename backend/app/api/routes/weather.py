@@ -1,8 +1,30 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import Optional
+import asyncio
+import weakref
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, NoReturn, Optional
 from ...services.weather_service import WeatherService
-from ...models.weather import WeatherResponse
+from ...services.broadcaster import HEARTBEAT_FRAME, WeatherBroadcaster, sse_frame
+from ...services.history import ARCHIVE_START, HistoryService
+from ...services.prewarmer import create_prewarmer
+from ...models.weather import (
+    WeatherResponse,
+    ForecastResponse,
+    HistoryResponse,
+    BatchWeatherRequest,
+    BatchWeatherResponse
+)
+from ...utils.cache import cache, get_cache_info
+from ...utils.http_client import http_client
+from ...utils.rate_limiter import upstream_limiters
+from ...utils.response_cache import response_cache
+from ...utils.serialization import FastJSONResponse, dumps
+from ...utils.text import canonicalize_city
+from ...config import settings
 from ...utils.exceptions import (
+    WeatherAPIException,
+    describe_exception,
     handle_city_not_found,
     handle_weather_data_unavailable,
     handle_external_api_error
@@ -10,12 +32,47 @@ from ...utils.exceptions import (
 
 router = APIRouter(prefix="/weather", tags=["weather"])
 weather_service = WeatherService()
+prewarmer = create_prewarmer(weather_service)
+broadcaster = WeatherBroadcaster(weather_service)
+history_service = HistoryService(weather_service)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Interpreta horários sem fuso como UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _raise_http_error(e: Exception) -> NoReturn:
+    """Converte exceções do serviço em respostas HTTP"""
+    if isinstance(e, HTTPException):
+        raise e
+    if isinstance(e, WeatherAPIException):
+        status_code, detail = describe_exception(e)
+        raise HTTPException(status_code=status_code, detail=detail)
+    
+    error_message = str(e).lower()
+    
+    if "não encontrada" in error_message or "not found" in error_message:
+        handle_city_not_found()
+    elif "indisponíveis" in error_message or "unavailable" in error_message:
+        handle_weather_data_unavailable()
+    elif "clima" in error_message or "geocodificação" in error_message or "api" in error_message:
+        handle_external_api_error()
+    else:
+        
+        raise HTTPException(
+            status_code=500,
+            detail="Erro interno ao processar solicitação. Tente novamente."
+        )
 
 
 @router.get("", response_model=WeatherResponse, summary="Obter informações climáticas por cidade")
 async def get_weather_by_city(
+    request: Request,
     city: str = Query(..., min_length=1, max_length=100, description="Nome da cidade para busca")
-) -> WeatherResponse:
+):
     """
     Retorna informações climáticas atuais e insights agrícolas para a cidade especificada.
     
@@ -23,6 +80,9 @@ async def get_weather_by_city(
     
     Retorna dados como temperatura, umidade, precipitação, vento, pressão,
     além de análises específicas para cultivo de cana-de-açúcar.
+    
+    A resposta traz ETag (suporta If-None-Match / 304) e é comprimida com
+    gzip ou brotli conforme o Accept-Encoding do cliente.
     """
     try:
         
@@ -32,27 +92,224 @@ async def get_weather_by_city(
         
         city_normalized = city.strip()
         
+        if not settings.response_cache_enabled:
+            return await weather_service.get_weather_by_city(city_normalized)
+        
+        payload = await weather_service.get_weather_payload(city_normalized)
+        encoding = payload.negotiate(
+            request.headers.get("accept-encoding", ""),
+            settings.response_compression_min_size
+        )
+        headers = {"ETag": payload.etag(encoding), "Vary": "Accept-Encoding"}
         
-        weather_data = await weather_service.get_weather_by_city(city_normalized)
+        if payload.matches(request.headers.get("if-none-match"), encoding):
+            response_cache.not_modified += 1
+            return Response(status_code=304, headers=headers)
         
-        return weather_data
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        
+        return Response(content=payload.encoded(encoding), media_type="application/json", headers=headers)
         
     except Exception as e:
+        _raise_http_error(e)
+
+
+@router.get("/forecast", response_model=ForecastResponse, summary="Obter linha do tempo de risco pela previsão")
+async def get_forecast_by_city(
+    city: str = Query(..., min_length=1, max_length=100, description="Nome da cidade para busca"),
+    start: Optional[datetime] = Query(None, description="Início da janela (ISO 8601). Padrão: agora"),
+    end: Optional[datetime] = Query(None, description="Fim da janela (ISO 8601). Padrão: início + 48h")
+) -> FastJSONResponse:
+    """
+    Retorna a previsão horária e diária com o nível de risco agrícola de cada horário.
+    
+    - **city**: Nome da cidade
+    - **start** / **end**: janela desejada dentro dos próximos dias de previsão
+    
+    A previsão completa é obtida uma vez por rodada do modelo e as janelas
+    são recortadas localmente.
+    """
+    try:
+        
+        if not city or city.strip() == "":
+            raise HTTPException(status_code=400, detail="Nome da cidade é obrigatório")
         
-        error_message = str(e).lower()
+        start, end = _as_utc(start), _as_utc(end)
+        if start is not None and end is not None and end <= start:
+            raise HTTPException(status_code=400, detail="O fim da janela deve ser posterior ao início")
         
-        if "não encontrada" in error_message or "not found" in error_message:
-            handle_city_not_found()
-        elif "indisponíveis" in error_message or "unavailable" in error_message:
-            handle_weather_data_unavailable()
-        elif "clima" in error_message or "geocodificação" in error_message or "api" in error_message:
-            handle_external_api_error()
-        else:
-            
+        return FastJSONResponse(await weather_service.get_forecast_by_city(city.strip(), start, end))
+        
+    except Exception as e:
+        _raise_http_error(e)
+
+
+@router.get("/history", response_model=HistoryResponse, summary="Comparar a safra com safras anteriores")
+async def get_history_by_city(
+    city: str = Query(..., min_length=1, max_length=100, description="Nome da cidade para busca"),
+    start: Optional[date] = Query(None, description="Primeiro dia da janela. Padrão: início da safra atual"),
+    end: Optional[date] = Query(None, description="Último dia da janela. Padrão: último dia disponível no arquivo"),
+    compare_years: int = Query(5, ge=0, le=settings.history_max_compare_years, description="Safras anteriores comparadas"),
+    base_temperature: Optional[float] = Query(None, ge=-10, le=40, description="Temperatura base dos graus-dia (°C)")
+) -> FastJSONResponse:
+    """
+    Retorna chuva acumulada, graus-dia e veranicos de uma janela e da mesma janela em anos anteriores.
+    
+    - **city**: Nome da cidade
+    - **start** / **end**: janela consultada (padrão: safra atual até o último dia do arquivo)
+    - **compare_years**: quantas safras anteriores incluir na comparação
+    
+    Os dados diários ficam armazenados localmente por célula da grade e apenas
+    os dias ainda ausentes são buscados na API de arquivo da Open-Meteo.
+    """
+    try:
+        
+        if not settings.history_enabled:
+            raise HTTPException(status_code=404, detail="Histórico climático desabilitado")
+        
+        if not city or city.strip() == "":
+            raise HTTPException(status_code=400, detail="Nome da cidade é obrigatório")
+        
+        default_start, default_end = history_service.default_window()
+        start = max(start or default_start, ARCHIVE_START)
+        end = min(end or default_end, history_service.available_until())
+        if end < start:
             raise HTTPException(
-                status_code=500,
-                detail="Erro interno ao processar solicitação. Tente novamente."
+                status_code=400,
+                detail=f"Janela sem dados no arquivo (disponível de {ARCHIVE_START.isoformat()} a {history_service.available_until().isoformat()})"
             )
+        
+        return FastJSONResponse(
+            await history_service.get_history(city.strip(), start, end, compare_years, base_temperature)
+        )
+        
+    except Exception as e:
+        _raise_http_error(e)
+
+
+@router.post("/batch", response_model=BatchWeatherResponse, summary="Obter informações climáticas em lote")
+async def get_weather_batch(request: BatchWeatherRequest) -> FastJSONResponse:
+    """
+    Retorna informações climáticas para várias cidades ou coordenadas de uma vez.
+    
+    - **locations**: lista de itens com `city` ou `latitude`/`longitude`
+    
+    Cada item traz seu próprio `statusCode` e `error`, de modo que uma cidade
+    inválida não invalida o lote inteiro.
+    """
+    results = await weather_service.get_weather_batch(request.locations)
+    return FastJSONResponse(BatchWeatherResponse(results=results))
+
+
+@router.get("/stream", summary="Receber atualizações climáticas por Server-Sent Events")
+async def stream_weather(
+    city: List[str] = Query(..., description="Cidades acompanhadas (repita o parâmetro para várias)")
+) -> StreamingResponse:
+    """
+    Mantém uma conexão Server-Sent Events com atualizações das cidades informadas.
+    
+    - **city**: nome da cidade; repita o parâmetro para acompanhar várias
+    
+    O estado atual de cada cidade é enviado na conexão (evento `weather`, com o
+    mesmo corpo de `GET /weather`) e, depois, um novo evento sempre que o clima
+    em cache da localização é atualizado. Cidades inválidas geram um evento
+    `error`. Comentários keep-alive são enviados periodicamente.
+    """
+    cities = list(dict.fromkeys(name.strip() for name in city if name.strip()))
+    if not cities:
+        raise HTTPException(status_code=400, detail="Nome da cidade é obrigatório")
+    if len(cities) > settings.stream_max_locations:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {settings.stream_max_locations} cidades por conexão"
+        )
+    if broadcaster.subscribers >= settings.stream_max_subscribers:
+        raise HTTPException(status_code=503, detail="Limite de conexões de atualização atingido. Tente novamente mais tarde.")
+    # A vaga é reservada já na verificação: conexões simultâneas esperando a
+    # resolução abaixo não passam todas do limite
+    subscriber = broadcaster.register()
+    
+    async def resolve(name: str):
+        location = await weather_service.get_coordinates(name)
+        return location, await weather_service.get_weather_payload(name)
+    
+    try:
+        resolved = await asyncio.gather(*(resolve(name) for name in cities), return_exceptions=True)
+        if all(isinstance(result, BaseException) for result in resolved):
+            _raise_http_error(resolved[0])
+    except BaseException:
+        broadcaster.unsubscribe(subscriber)
+        raise
+    
+    async def events():
+        watched = []
+        try:
+            frames = []
+            for name, result in zip(cities, resolved):
+                canonical_name = canonicalize_city(name)
+                if isinstance(result, BaseException):
+                    status_code, detail = describe_exception(result)
+                    error = {"city": name, "statusCode": status_code, "error": detail}
+                    frames.append(sse_frame("error", canonical_name, dumps(error)))
+                    continue
+                location, payload = result
+                broadcaster.subscribe(subscriber, payload.source_key, canonical_name, location)
+                prewarmer.watch(payload.point)
+                watched.append(payload.point)
+                frames.append(sse_frame("weather", canonical_name, payload.body))
+            yield b"".join(frames)
+            
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.event.wait(), settings.stream_heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    continue
+                yield subscriber.drain()
+        finally:
+            broadcaster.unsubscribe(subscriber)
+            for point in watched:
+                prewarmer.unwatch(point)
+    
+    stream = events()
+    # Se o cliente sair antes do primeiro envio o gerador nunca roda (nem o finally)
+    weakref.finalize(stream, broadcaster.unsubscribe, subscriber)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats", summary="Estatísticas de cache e do pool de conexões")
+async def get_stats():
+    """Retorna estatísticas do cache e da utilização do cliente HTTP"""
+    return {
+        "cache": await get_cache_info(),
+        "weather_buckets": weather_service.get_weather_at.hit_counter.top(),
+        "circuit_breakers": {
+            "geocoding": weather_service.geocoding_breaker.get_stats(),
+            "weather": weather_service.weather_breaker.get_stats()
+        },
+        "response_cache": response_cache.get_stats(),
+        "prewarmer": prewarmer.get_stats(),
+        "stream": broadcaster.get_stats(),
+        "history": history_service.get_stats(),
+        "upstream_limiters": {host: limiter.get_stats() for host, limiter in upstream_limiters.items()},
+        "http_pool": http_client.get_stats()
+    }
+
+
+@router.get("/stats/keys", summary="Chaves do cache, paginadas")
+async def get_cache_keys(
+    cursor: int = Query(0, ge=0, description="Deslocamento retornado em next_cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Chaves por página"),
+    prefix: Optional[str] = Query(None, description="Filtra por prefixo (ex.: weather, geocoding)"),
+    tag: Optional[str] = Query(None, description="Filtra por tag (ex.: city:sao paulo, cell:-21.1500,-47.8500)")
+):
+    """Lista as chaves do cache em páginas, usando os índices de prefixo e tag"""
+    return cache.keys_page(cursor, limit, prefix=prefix, tag=tag)
 
 
 @router.get("/health", summary="Health check do serviço de clima")
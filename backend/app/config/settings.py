@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -12,10 +12,123 @@ class Settings(BaseSettings):
     cache_enabled: bool = True
     cache_ttl_geocoding: int = 86400  # 24 horas em segundos
     cache_ttl_weather: int = 300      # 5 minutos em segundos
+    cache_ttl_forecast: int = 3600    # 1 hora (intervalo entre rodadas do modelo)
     cache_max_size: int = 1000        # Número máximo de itens no cache
+    cache_ttl_not_found: int = 600      # Cache negativo para cidades não encontradas
+    cache_ttl_upstream_error: int = 5   # Cache curto de falhas das APIs externas
+    cache_eviction_policy: str = "lru"  # Política de remoção: lru, lfu ou ttl
+    cache_sweep_interval: float = 30.0  # Intervalo do varredor de entradas expiradas
+    cache_bucket_stats_max: int = 1000  # Máximo de células com estatísticas individuais
+    cache_memory_sample_size: int = 200 # Entradas amostradas para estimar bytes por entrada
+    
+    # Segundo nível de cache persistente (SQLite), compartilhado entre workers
+    cache_l2_enabled: bool = False
+    cache_l2_path: str = "cache.sqlite3"
+    cache_l2_flush_interval: float = 1.0   # Intervalo de gravação em lote (write-behind)
+    cache_l2_warm_start_keys: int = 500    # Chaves mais acessadas carregadas na inicialização
+    cache_stale_ttl_weather: int = 600  # Janela em que o clima obsoleto é servido enquanto atualiza
+    cache_fallback_ttl: int = 1800      # Último valor mantido após expirar, servido se o prazo da requisição se esgotar
+    cache_refresh_ahead_enabled: bool = True
+    cache_refresh_ahead_ratio: float = 0.2  # Atualiza quando resta menos de 20% do TTL
+    cache_refresh_ahead_min_hits: int = 5   # Acessos mínimos para considerar a chave quente
+    
+    # Cache compartilhado entre workers (servidor local em socket Unix, iniciado por app.launcher)
+    cache_shared_socket: Optional[str] = None  # Definido pelo launcher; None mantém cada worker isolado
+    cache_shared_max_size: int = 100000        # Número máximo de itens no servidor compartilhado
+    cache_shared_lease_ttl: float = 30.0       # Validade da concessão de atualização de uma chave
+    cache_shared_wait_timeout: float = 10.0    # Espera máxima pelo valor que outro worker está buscando
+    cache_shared_timeout: float = 1.0          # Timeout das operações no servidor compartilhado
+    
+    # APIs externas (Open-Meteo); podem apontar para um servidor local em benchmarks
+    geocoding_api_url: str = "https://geocoding-api.open-meteo.com/v1/search"
+    weather_api_url: str = "https://api.open-meteo.com/v1/forecast"
     
     # Configurações de timeout
     request_timeout: float = 10.0
+    geocoding_timeout: Optional[float] = None  # Se None, usa request_timeout
+    weather_timeout: Optional[float] = None    # Se None, usa request_timeout
+    request_deadline: float = 15.0             # Prazo total por requisição, somando todas as chamadas (0 desativa)
+    
+    # Cache de respostas serializadas (ETag / compressão)
+    response_cache_enabled: bool = True
+    response_cache_max_size: int = 1000
+    response_compression_min_size: int = 500  # Bytes mínimos para comprimir o corpo
+    
+    # Previsão horária/diária
+    forecast_days: int = 7              # Dias solicitados à Open-Meteo (máx. 16)
+    forecast_default_hours: int = 48    # Janela padrão da linha do tempo
+    
+    # Histórico climático (API de arquivo da Open-Meteo, armazenado localmente em colunas)
+    history_enabled: bool = True
+    archive_api_url: str = "https://archive-api.open-meteo.com/v1/archive"
+    archive_timeout: Optional[float] = None   # Se None, usa request_timeout
+    history_path: str = "history"             # Diretório dos arquivos .npy por célula e ano
+    history_grid_size: float = 0.25           # Célula em graus (resolução aproximada do arquivo)
+    history_archive_delay_days: int = 5       # Dias mais recentes ainda ausentes no arquivo
+    history_max_days_per_call: int = 3660     # Dias máximos por chamada ao arquivo
+    history_merge_gap_days: int = 366         # Lacunas menores que isso são buscadas na mesma chamada
+    history_max_compare_years: int = 30       # Safras anteriores comparáveis por consulta
+    history_max_open_chunks: int = 512        # Arquivos anuais mapeados em memória ao mesmo tempo
+    history_season_start_month: int = 4       # Início da safra (janela padrão: safra atual até hoje)
+    history_degree_day_base: float = 10.0     # Temperatura base dos graus-dia (°C)
+    history_dry_day_threshold: float = 1.0    # Chuva diária (mm) abaixo da qual o dia é seco
+    history_dry_spell_min_days: int = 5       # Dias secos seguidos para contar um veranico
+    
+    # Índice local de municípios (geocodificação offline)
+    geocoding_index_enabled: bool = True
+    geocoding_index_path: Optional[str] = None  # Se None, usa app/data/municipios.tsv.gz
+    
+    # Apelidos adicionais de cidades (JSON: {"variante": "nome canônico"})
+    city_aliases: Dict[str, str] = {}
+    
+    # Agrupamento espacial das coordenadas de clima
+    weather_grid_mode: str = "off"        # off, grid ou geohash
+    weather_grid_size: float = 0.05       # Tamanho da célula em graus (modo grid)
+    weather_geohash_precision: int = 5    # Caracteres do geohash (~4,9 km no modo geohash)
+    
+    # Configurações do endpoint em lote
+    batch_max_items: int = 200            # Máximo de localizações por requisição
+    batch_concurrency: int = 10           # Operações simultâneas por lote
+    batch_upstream_chunk_size: int = 50   # Coordenadas por chamada multi-localização
+    
+    # Pré-aquecimento periódico do cache
+    prewarm_cities: List[str] = []        # Cidades mantidas sempre em cache (lista JSON)
+    prewarm_interval: float = 300.0       # Segundos entre rodadas
+    prewarm_jitter: float = 0.1           # Variação aleatória do intervalo (fração)
+    prewarm_concurrency: int = 2          # Chamadas simultâneas à Open-Meteo
+    prewarm_min_call_interval: float = 0.5  # Segundos mínimos entre chamadas (cota upstream)
+    
+    # Limitação de taxa e concorrência adaptativa por host upstream
+    upstream_rate_limit: float = 10.0     # Requisições por segundo por host (0 desativa)
+    upstream_burst: int = 20              # Rajada máxima acima da taxa
+    upstream_concurrency_initial: int = 10
+    upstream_concurrency_min: int = 2
+    upstream_concurrency_max: int = 50
+    upstream_queue_timeout: float = 2.0   # Segundos máximos de espera na fila
+    upstream_max_retries: int = 2         # Novas tentativas em 429/5xx/timeouts
+    upstream_retry_base_delay: float = 0.2  # Base do backoff exponencial (segundos)
+    upstream_retry_max_delay: float = 5.0   # Espera máxima, inclusive via Retry-After
+    
+    # Streaming de atualizações (GET /weather/stream, Server-Sent Events)
+    stream_max_locations: int = 20        # Localizações por conexão
+    stream_max_subscribers: int = 10000   # Conexões simultâneas por worker
+    stream_heartbeat_interval: float = 15.0  # Segundos entre comentários keep-alive
+    
+    # Circuit breaker das APIs externas
+    circuit_breaker_failure_threshold: int = 5   # Falhas consecutivas para abrir o circuito
+    circuit_breaker_recovery_timeout: float = 15.0  # Segundos até liberar uma chamada de teste
+    
+    # Serialização JSON com orjson (usa o json da biblioteca padrão se não estiver instalado)
+    fast_json_enabled: bool = True
+    
+    # Métricas no formato Prometheus (GET /metrics)
+    metrics_enabled: bool = True
+    
+    # Configurações do cliente HTTP compartilhado
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # Segundos que uma conexão ociosa fica aberta
+    http2_enabled: bool = False          # Requer o pacote opcional "h2"
     
     class Config:
         env_file = ".env"
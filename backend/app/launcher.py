@@ -0,0 +1,110 @@
+"""
+Inicia a API para produção com vários workers e o cache compartilhado
+
+Cada worker do Uvicorn é um processo com o próprio cache em memória. Com
+mais de um worker, o servidor de cache (app.utils.cache_server) roda em um
+processo à parte e atende os workers por um socket Unix: um valor buscado
+por um worker fica disponível para os demais e apenas um deles atualiza cada
+chave. Se o servidor cair, os workers seguem apenas com o cache local.
+
+Uso (a partir de backend/):
+    python -m app.launcher --workers 4 --port 8000
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+import uvicorn
+
+from .config import settings
+from .utils.cache_server import run_cache_server
+
+logger = logging.getLogger(__name__)
+
+
+def start_cache_server(path: str, timeout: float = 10.0) -> multiprocessing.Process:
+    """Inicia o servidor de cache compartilhado e aguarda o socket ficar disponível"""
+    if os.path.exists(path):
+        os.unlink(path)
+    process = multiprocessing.get_context("spawn").Process(
+        target=run_cache_server,
+        args=(path, settings.cache_shared_max_size, settings.cache_eviction_policy),
+        name="shared-cache",
+        daemon=True
+    )
+    process.start()
+
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if not process.is_alive():
+            raise RuntimeError(f"Servidor de cache encerrou ao iniciar (código {process.exitcode})")
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError(f"Servidor de cache não criou o socket {path} em {timeout}s")
+        time.sleep(0.05)
+    return process
+
+
+def stop_cache_server(process: Optional[multiprocessing.Process], path: str, private_dir: Optional[str] = None) -> None:
+    """Encerra o servidor de cache e remove o socket (e o diretório privado criado para ele)"""
+    if process is not None and process.is_alive():
+        process.terminate()
+        process.join(5.0)
+    if os.path.exists(path):
+        os.unlink(path)
+    if private_dir is not None:
+        shutil.rmtree(private_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", default=None, help="Socket Unix do cache compartilhado")
+    parser.add_argument("--no-shared-cache", action="store_true", help="Cada worker mantém apenas o próprio cache")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    workers = max(args.workers, 1)
+    path = args.socket or settings.cache_shared_socket
+    private_dir = None
+    process = None
+    if workers > 1 and not args.no_shared_cache:
+        if not path:
+            # Diretório 0700 com nome aleatório: nenhum outro usuário alcança o socket
+            private_dir = tempfile.mkdtemp(prefix="clima-cana-cache-")
+            path = os.path.join(private_dir, "cache.sock")
+        process = start_cache_server(path)
+        # Lido pelas configurações de cada worker ao importar a aplicação
+        os.environ["CACHE_SHARED_SOCKET"] = path
+        logger.info(f"Starting {workers} workers with shared cache at {path}")
+    else:
+        os.environ["CACHE_SHARED_SOCKET"] = ""
+        logger.info(f"Starting {workers} workers with independent caches")
+
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            log_level=args.log_level
+        )
+    finally:
+        if process is not None:
+            stop_cache_server(process, path, private_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 
 from app.api.routes import weather
+from app.services.geocoding_index import geocoding_index
+from app.config import settings
+from app.utils.cache import cache, warm_start_cache
+from app.utils.deadline import RequestDeadlineMiddleware
+from app.utils.exceptions import DEADLINE_EXCEEDED_DETAIL, DeadlineExceededException
+from app.utils.persistent_cache import persistent_cache
+from app.utils.http_client import http_client
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.serialization import FAST_JSON, FastJSONResponse
+from app.utils.shared_cache import shared_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -11,12 +22,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicializa e libera recursos compartilhados da aplicação"""
+    logger.info(f"JSON serialization: {'orjson' if FAST_JSON else 'stdlib json'}")
+    await http_client.start()
+    if settings.geocoding_index_enabled:
+        geocoding_index.load()
+    if shared_cache is not None:
+        await shared_cache.start()
+    if persistent_cache is not None:
+        await persistent_cache.start()
+        await warm_start_cache(settings.cache_l2_warm_start_keys)
+    cache.start_sweeper(settings.cache_sweep_interval)
+    weather.prewarmer.start()
+    try:
+        yield
+    finally:
+        await weather.prewarmer.stop()
+        await cache.stop_sweeper()
+        if persistent_cache is not None:
+            await persistent_cache.close()
+        if shared_cache is not None:
+            await shared_cache.close()
+        await http_client.close()
+
+
 app = FastAPI(
     title="Clima Cana API",
     description="API para fornecer informações climáticas relevantes para produtores de cana-de-açúcar",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,6 +67,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestDeadlineMiddleware, budget=settings.request_deadline)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(weather.router)
 
 
@@ -51,6 +96,20 @@ async def health_check():
     }
 
 
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    """Métricas da aplicação no formato de exposição do Prometheus"""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("Métricas desabilitadas", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.exception_handler(DeadlineExceededException)
+async def deadline_exception_handler(request, exc):
+    """Prazo da requisição esgotado sem valor em cache para servir"""
+    return JSONResponse(status_code=504, content={"detail": DEADLINE_EXCEEDED_DETAIL})
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Tratador global de exceções não tratadas"""
@@ -62,11 +121,12 @@ async def global_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
+    # Processo único para desenvolvimento; em produção use python -m app.launcher --workers N
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=settings.debug,
         log_level="info"
     )
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import NamedTuple
+
+from .weather import Location
+
+
+class CurrentConditions(NamedTuple):
+    """
+    Condições atuais guardadas no cache de clima
+
+    Apenas os seis valores usados na resposta, em vez do JSON completo da
+    Open-Meteo (unidades, fuso, elevação...): uma tupla sem dicionário por
+    instância ocupa uma fração da memória e é serializada de forma compacta.
+    """
+
+    temperature: float
+    humidity: float
+    precipitation: float
+    wind_speed: float
+    pressure: float
+    cloud_cover: float
+
+    @classmethod
+    def from_api(cls, data: dict) -> "CurrentConditions":
+        """Extrai os campos usados do bloco "current" (KeyError/TypeError se ausentes ou nulos)"""
+        current = data["current"]
+        return cls(
+            float(current["temperature_2m"]),
+            float(current["relativehumidity_2m"]),
+            float(current["precipitation"]),
+            float(current["windspeed_10m"]),
+            float(current["pressure_msl"]),
+            float(current["cloudcover"])
+        )
+
+
+class GeoPoint(NamedTuple):
+    """Resultado de geocodificação guardado no cache (convertido em Location ao responder)"""
+
+    name: str
+    latitude: float
+    longitude: float
+
+    def to_location(self) -> Location:
+        # Valores já validados na criação do registro
+        return Location.model_construct(name=self.name, latitude=self.latitude, longitude=self.longitude)
@@ -1,7 +1,8 @@
-from datetime import datetime
-from typing import List, Literal
-from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 from pydantic.alias_generators import to_camel
+from ..config import settings
 
 
 class Location(BaseModel):
@@ -36,4 +37,92 @@ class WeatherResponse(BaseModel):
 
 
 class GeocodingResponse(BaseModel):
-    results: List[dict] = Field(..., description="Resultados da geocodificação")
\ No newline at end of file
+    results: List[dict] = Field(..., description="Resultados da geocodificação")
+
+
+class ForecastPoint(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    time: datetime = Field(..., description="Horário da previsão (UTC)")
+    temperature: Optional[float] = Field(None, description="Temperatura em Celsius")
+    humidity: Optional[float] = Field(None, description="Umidade relativa em percentual")
+    precipitation: Optional[float] = Field(None, description="Precipitação em mm")
+    wind_speed: Optional[float] = Field(None, description="Velocidade do vento em km/h")
+    risk_level: Literal["low", "medium", "high"] = Field(..., description="Nível de risco agrícola")
+    risk_factors: int = Field(..., ge=0, description="Número de fatores de risco no horário")
+
+
+class ForecastDay(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    day: date = Field(..., description="Data local")
+    temperature_max: Optional[float] = Field(None, description="Temperatura máxima em Celsius")
+    temperature_min: Optional[float] = Field(None, description="Temperatura mínima em Celsius")
+    precipitation_sum: Optional[float] = Field(None, description="Precipitação acumulada em mm")
+    wind_speed_max: Optional[float] = Field(None, description="Vento máximo em km/h")
+    risk_level: Literal["low", "medium", "high"] = Field(..., description="Pior nível de risco horário do dia")
+    high_risk_hours: int = Field(..., ge=0, description="Horas com risco alto")
+
+
+class ForecastResponse(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    location: Location = Field(..., description="Informações da localização")
+    hourly: List[ForecastPoint] = Field(..., description="Linha do tempo horária de risco")
+    daily: List[ForecastDay] = Field(..., description="Resumo diário")
+
+
+class HistoryWindow(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    start: date = Field(..., description="Primeiro dia da janela")
+    end: date = Field(..., description="Último dia da janela (inclusive)")
+    days: int = Field(..., ge=0, description="Dias na janela")
+    days_with_data: int = Field(..., ge=0, description="Dias com dado no arquivo")
+    rainfall: Optional[float] = Field(None, description="Chuva acumulada em mm")
+    degree_days: Optional[float] = Field(None, description="Graus-dia acumulados acima da temperatura base")
+    dry_days: int = Field(..., ge=0, description="Dias com chuva abaixo do limiar de dia seco")
+    dry_spells: int = Field(..., ge=0, description="Veranicos (sequências de dias secos acima do mínimo)")
+    longest_dry_spell: int = Field(..., ge=0, description="Maior sequência de dias secos")
+
+
+class HistoryResponse(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    location: Location = Field(..., description="Informações da localização")
+    base_temperature: float = Field(..., description="Temperatura base dos graus-dia em Celsius")
+    current: HistoryWindow = Field(..., description="Janela consultada")
+    previous: List[HistoryWindow] = Field(..., description="Mesma janela nas safras anteriores, da mais recente à mais antiga")
+
+
+class BatchLocationQuery(BaseModel):
+    city: Optional[str] = Field(None, min_length=1, max_length=100, description="Nome da cidade")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude (alternativa à cidade)")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude (alternativa à cidade)")
+    name: Optional[str] = Field(None, max_length=100, description="Nome exibido para coordenadas")
+    
+    @model_validator(mode="after")
+    def check_city_or_coordinates(self) -> "BatchLocationQuery":
+        has_coordinates = self.latitude is not None and self.longitude is not None
+        if not (self.city and self.city.strip()) and not has_coordinates:
+            raise ValueError("Informe 'city' ou 'latitude' e 'longitude'")
+        return self
+
+
+class BatchWeatherRequest(BaseModel):
+    locations: List[BatchLocationQuery] = Field(
+        ..., min_length=1, max_length=settings.batch_max_items, description="Cidades ou coordenadas"
+    )
+
+
+class BatchWeatherItem(BaseModel):
+    model_config = {"alias_generator": to_camel, "populate_by_name": True}
+    
+    query: BatchLocationQuery = Field(..., description="Item solicitado")
+    status_code: int = Field(..., description="Status HTTP equivalente do item")
+    data: Optional[WeatherResponse] = Field(None, description="Dados climáticos quando disponíveis")
+    error: Optional[str] = Field(None, description="Mensagem de erro do item")
+
+
+class BatchWeatherResponse(BaseModel):
+    results: List[BatchWeatherItem] = Field(..., description="Resultados na ordem da requisição")
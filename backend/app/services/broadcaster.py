@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, Set, Tuple
+
+from ..models.records import CurrentConditions
+from ..models.weather import Location
+from ..utils.cache import NegativeResult, cache
+from ..utils.metrics import SERIALIZATION_LATENCY
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_FRAME = b": keepalive\n\n"
+
+
+def sse_frame(event: str, event_id: str, data: bytes) -> bytes:
+    """Monta um evento Server-Sent Events (data em uma única linha JSON)"""
+    return b"event: " + event.encode() + b"\nid: " + event_id.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Subscriber:
+    """
+    Conexão inscrita em atualizações de clima
+
+    Guarda apenas o último quadro pendente de cada localização: se o cliente
+    estiver lento, atualizações intermediárias são substituídas em vez de
+    acumuladas, e a memória por conexão fica limitada ao número de localizações.
+    """
+
+    __slots__ = ("pending", "event", "subscriptions", "active")
+
+    def __init__(self):
+        self.pending: Dict[str, bytes] = {}
+        self.event = asyncio.Event()
+        # (chave de cache, nome canônico) de cada localização inscrita
+        self.subscriptions: Set[Tuple[Hashable, str]] = set()
+        self.active = True
+
+    def push(self, name: str, frame: bytes) -> bool:
+        """Enfileira o quadro; retorna True se substituiu um quadro ainda não enviado"""
+        replaced = name in self.pending
+        self.pending[name] = frame
+        self.event.set()
+        return replaced
+
+    def drain(self) -> bytes:
+        """Retorna e limpa os quadros pendentes"""
+        frames, self.pending = self.pending, {}
+        self.event.clear()
+        return b"".join(frames.values())
+
+
+class Topic:
+    """Inscritos de uma entrada de cache de clima, agrupados por localização"""
+
+    __slots__ = ("locations",)
+
+    def __init__(self):
+        # nome canônico -> (Location, inscritos)
+        self.locations: Dict[str, Tuple[Location, Set[Subscriber]]] = {}
+
+
+class WeatherBroadcaster:
+    """
+    Distribui atualizações do cache de clima para conexões inscritas
+
+    Ouve as gravações do MemoryCache: quando a entrada de clima de uma
+    localização é atualizada, a resposta é montada e serializada uma única
+    vez por localização e o mesmo quadro é entregue a todos os inscritos.
+    """
+
+    def __init__(self, service):
+        self._service = service
+        self._topics: Dict[Hashable, Topic] = {}
+        self.subscribers = 0
+        self.published = 0
+        self.coalesced = 0
+        cache.add_listener(self._on_cache_set)
+
+    def register(self) -> Subscriber:
+        """Cria o inscrito de uma nova conexão, ocupando uma vaga até unsubscribe"""
+        self.subscribers += 1
+        return Subscriber()
+
+    def subscribe(self, subscriber: Subscriber, key: Hashable, name: str, location: Location) -> None:
+        """Inscreve a conexão na entrada de cache key sob a localização name"""
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = Topic()
+        _, members = topic.locations.setdefault(name, (location, set()))
+        members.add(subscriber)
+        subscriber.subscriptions.add((key, name))
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a conexão de todas as localizações e libera a vaga (pode ser chamado mais de uma vez)"""
+        if not subscriber.active:
+            return
+        subscriber.active = False
+        for key, name in subscriber.subscriptions:
+            topic = self._topics.get(key)
+            if topic is None:
+                continue
+            entry = topic.locations.get(name)
+            if entry is not None:
+                entry[1].discard(subscriber)
+                if not entry[1]:
+                    del topic.locations[name]
+            if not topic.locations:
+                del self._topics[key]
+        subscriber.subscriptions.clear()
+        self.subscribers -= 1
+
+    def _on_cache_set(self, key: Hashable, value: Any) -> None:
+        topic = self._topics.get(key)
+        if topic is None or isinstance(value, NegativeResult):
+            return
+        self.publish(topic, value)
+
+    def publish(self, topic: Topic, conditions: CurrentConditions) -> None:
+        """Serializa uma vez por localização e entrega a todos os inscritos"""
+        for name, (location, members) in topic.locations.items():
+            try:
+                with SERIALIZATION_LATENCY.time("stream"):
+                    response = self._service.build_weather_response(location, conditions)
+                    frame = sse_frame("weather", name, response.model_dump_json(by_alias=True).encode())
+            except Exception as e:
+                logger.error(f"Failed to build weather update for {name}: {e}")
+                continue
+            for subscriber in members:
+                if subscriber.push(name, frame):
+                    self.coalesced += 1
+            self.published += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas das inscrições"""
+        return {
+            "subscribers": self.subscribers,
+            "topics": len(self._topics),
+            "locations": sum(len(topic.locations) for topic in self._topics.values()),
+            "published": self.published,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from ..utils.metrics import RISK_ANALYSIS_LATENCY
+from .risk_engine import RiskAssessment, assess_risk
+
+HOURLY_VARIABLES = [
+    "temperature_2m",
+    "relativehumidity_2m",
+    "precipitation",
+    "windspeed_10m"
+]
+
+DAILY_VARIABLES = [
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum",
+    "windspeed_10m_max"
+]
+
+
+def _column(block: dict, name: str) -> np.ndarray:
+    """Converte uma série da Open-Meteo em array float32 (valores nulos viram NaN)"""
+    return np.array(block.get(name, []), dtype=np.float64).astype(np.float32)
+
+
+class ForecastSeries:
+    """
+    Previsão horária e diária de uma localização em colunas (arrays NumPy)
+
+    Os horários ficam em segundos Unix (UTC), o que permite recortar qualquer
+    janela com busca binária. A avaliação de risco horária é calculada uma
+    única vez, na criação, e reaproveitada por todos os recortes.
+    """
+
+    __slots__ = (
+        "times", "temperature", "humidity", "precipitation", "wind_speed",
+        "day_starts", "temperature_max", "temperature_min", "precipitation_sum",
+        "wind_speed_max", "utc_offset_seconds", "risk"
+    )
+
+    def __init__(self, data: dict):
+        hourly = data.get("hourly", {})
+        daily = data.get("daily", {})
+
+        self.times = np.array(hourly.get("time", []), dtype=np.int64)
+        self.temperature = _column(hourly, "temperature_2m")
+        self.humidity = _column(hourly, "relativehumidity_2m")
+        self.precipitation = _column(hourly, "precipitation")
+        self.wind_speed = _column(hourly, "windspeed_10m")
+
+        self.day_starts = np.array(daily.get("time", []), dtype=np.int64)
+        self.temperature_max = _column(daily, "temperature_2m_max")
+        self.temperature_min = _column(daily, "temperature_2m_min")
+        self.precipitation_sum = _column(daily, "precipitation_sum")
+        self.wind_speed_max = _column(daily, "windspeed_10m_max")
+        self.utc_offset_seconds = int(data.get("utc_offset_seconds", 0))
+
+        with RISK_ANALYSIS_LATENCY.time("forecast"):
+            self.risk: RiskAssessment = assess_risk(
+                self.temperature, self.humidity, self.precipitation, self.wind_speed
+            )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def hourly_window(self, start: Optional[datetime], end: Optional[datetime]) -> slice:
+        """Intervalo de índices horários dentro de [start, end)"""
+        low = 0 if start is None else int(np.searchsorted(self.times, start.timestamp(), side="left"))
+        high = len(self.times) if end is None else int(np.searchsorted(self.times, end.timestamp(), side="left"))
+        return slice(low, max(low, high))
+
+    def daily_window(self, hours: slice) -> slice:
+        """Intervalo de dias que contêm algum horário do recorte"""
+        if hours.start >= hours.stop:
+            return slice(0, 0)
+        first, last = self.times[hours.start], self.times[hours.stop - 1]
+        low = max(int(np.searchsorted(self.day_starts, first, side="right")) - 1, 0)
+        high = int(np.searchsorted(self.day_starts, last, side="right"))
+        return slice(low, high)
+
+    def day_of(self, index: int) -> date:
+        """Data local de um dia da série diária"""
+        return datetime.fromtimestamp(
+            int(self.day_starts[index]) + self.utc_offset_seconds, tz=timezone.utc
+        ).date()
+
+    def time_of(self, index: int) -> datetime:
+        """Horário (UTC) de um ponto da série horária"""
+        return datetime.fromtimestamp(int(self.times[index]), tz=timezone.utc)
+
+    def day_risk(self, day_index: int, hours: slice) -> tuple[int, int]:
+        """Pior nível de risco horário e número de horas de risco alto no dia, dentro do recorte"""
+        day_start = self.day_starts[day_index]
+        day_end = self.day_starts[day_index + 1] if day_index + 1 < len(self.day_starts) else day_start + 86400
+        low = max(int(np.searchsorted(self.times, day_start, side="left")), hours.start)
+        high = min(int(np.searchsorted(self.times, day_end, side="left")), hours.stop)
+        if low >= high:
+            return 0, 0
+        levels = self.risk.levels[low:high]
+        return int(levels.max()), int(np.count_nonzero(levels == 2))
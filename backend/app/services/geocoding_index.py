@@ -0,0 +1,114 @@
+import gzip
+import logging
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from ..models.weather import Location
+from ..utils.text import normalize_text
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "municipios.tsv.gz"
+
+# Sufixo de UF aceito nas consultas: "Cidade - SP", "Cidade, SP" ou "Cidade/SP"
+_STATE_SUFFIX = re.compile(r"^(?P<city>.+?)\s*[-,/]\s*(?P<state>[A-Za-z]{2})$")
+
+BRAZILIAN_STATES = frozenset({
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"
+})
+
+Record = Tuple[str, str, float, float]
+
+
+def write_index(records: Iterable[Record], path: Path) -> int:
+    """
+    Grava o índice compacto (TSV compactado com gzip: nome, UF, latitude, longitude)
+
+    Returns:
+        Número de municípios gravados
+    """
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for name, state, latitude, longitude in records:
+            file.write(f"{name}\t{state.upper()}\t{latitude:.4f}\t{longitude:.4f}\n")
+            count += 1
+    return count
+
+
+class GeocodingIndex:
+    """
+    Índice local de municípios brasileiros para geocodificação offline
+
+    Os nomes normalizados ficam em uma lista ordenada (busca binária) e as
+    coordenadas em arrays de double, evitando um objeto Python por município.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._names: List[str] = []
+        self._states: List[str] = []
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """Carrega o índice a partir do arquivo compacto"""
+        path = Path(path or settings.geocoding_index_path or DEFAULT_INDEX_PATH)
+        records = []
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                name, state, latitude, longitude = line.rstrip("\n").split("\t")
+                records.append((normalize_text(name), name, state, float(latitude), float(longitude)))
+
+        records.sort(key=lambda record: (record[0], record[2]))
+        self._keys = [record[0] for record in records]
+        self._names = [record[1] for record in records]
+        self._states = [record[2] for record in records]
+        self._latitudes = array("d", (record[3] for record in records))
+        self._longitudes = array("d", (record[4] for record in records))
+
+        logger.info(f"Geocoding index loaded with {len(self._keys)} municipalities from {path}")
+        return len(self._keys)
+
+    def _location(self, index: int) -> Location:
+        return Location(
+            name=self._names[index],
+            latitude=self._latitudes[index],
+            longitude=self._longitudes[index]
+        )
+
+    def lookup(self, query: str) -> Optional[Location]:
+        """
+        Busca exata (sem acentos e sem diferenciar maiúsculas) por nome do município
+
+        Nomes que existem em mais de uma UF só são resolvidos quando a UF é
+        informada na consulta; caso contrário retorna None para que a API
+        decida pelo município mais relevante.
+        """
+        state = None
+        match = _STATE_SUFFIX.match(query.strip())
+        if match and match.group("state").upper() in BRAZILIAN_STATES:
+            query, state = match.group("city"), match.group("state").upper()
+
+        key = normalize_text(query)
+        start = bisect_left(self._keys, key)
+        end = bisect_right(self._keys, key, lo=start)
+        candidates = [
+            index for index in range(start, end)
+            if state is None or self._states[index] == state
+        ]
+
+        if len(candidates) != 1:
+            return None
+        return self._location(candidates[0])
+
+
+# Instância global do índice de geocodificação
+geocoding_index = GeocodingIndex()
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from ..config import settings
+from ..models.weather import HistoryResponse, HistoryWindow
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.exceptions import ExternalAPIException, WeatherDataUnavailableException
+from ..utils.geo import snap_to_grid
+from ..utils.serialization import response_json
+from ..utils.shared_cache import shared_lock
+from .history_store import (
+    ARCHIVE_VARIABLES,
+    PRECIPITATION,
+    TEMPERATURE_MAX,
+    TEMPERATURE_MIN,
+    DateRange,
+    HistoryStore,
+    history_store
+)
+
+logger = logging.getLogger(__name__)
+
+# Primeiro dia disponível no arquivo da Open-Meteo
+ARCHIVE_START = date(1940, 1, 1)
+
+# Dias recentes que podem vir nulos enquanto o arquivo é consolidado (não são marcados como obtidos)
+SETTLING_DAYS = 30
+
+
+def shift_years(day: date, years: int) -> date:
+    """Mesma data years anos antes (29/02 vira 28/02)"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def plan_fetches(missing: List[DateRange], merge_gap_days: int, max_days: int) -> List[DateRange]:
+    """
+    Agrupa as lacunas em poucas chamadas grandes
+
+    Lacunas separadas por menos de merge_gap_days dias vão na mesma chamada
+    (dias já armazenados no meio são regravados), limitadas a max_days dias.
+    """
+    plans: List[DateRange] = []
+    for start, end in sorted(missing):
+        if plans and (start - plans[-1][1]).days <= merge_gap_days and (end - plans[-1][0]).days < max_days:
+            plans[-1] = (plans[-1][0], max(end, plans[-1][1]))
+            continue
+        # Lacunas maiores que o limite são divididas
+        while (end - start).days >= max_days:
+            plans.append((start, start + timedelta(days=max_days - 1)))
+            start += timedelta(days=max_days)
+        plans.append((start, end))
+    return plans
+
+
+class HistoryService:
+    """
+    Histórico climático diário por célula da grade
+
+    Janelas consultadas são comparadas com o armazenamento local e apenas os
+    dias ausentes são buscados na API de arquivo da Open-Meteo, em chamadas
+    de intervalos longos. Os agregados são calculados localmente.
+    """
+
+    def __init__(self, weather_service, store: HistoryStore = history_store):
+        self._service = weather_service
+        self._store = store
+        self.archive_url = settings.archive_api_url
+        self.archive_timeout = settings.archive_timeout or settings.request_timeout
+        self.breaker = CircuitBreaker(
+            "arquivo climático",
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_timeout=settings.circuit_breaker_recovery_timeout
+        )
+        # Um preenchimento por célula de cada vez: consultas concorrentes não repetem a busca.
+        # Cada lock guarda quantos o usam e sai do dicionário quando o último termina
+        self._locks: Dict[str, Tuple[asyncio.Lock, List[int]]] = {}
+        self.queries = 0
+        self.upstream_calls = 0
+        self.days_fetched = 0
+
+    @staticmethod
+    def available_until(today: Optional[date] = None) -> date:
+        """Último dia esperado no arquivo"""
+        return (today or date.today()) - timedelta(days=settings.history_archive_delay_days)
+
+    @staticmethod
+    def cell_of(latitude: float, longitude: float) -> Tuple[str, Tuple[float, float]]:
+        """Identificador e centro da célula do histórico"""
+        point = snap_to_grid(latitude, longitude, settings.history_grid_size)
+        return f"{point[0]:.4f}_{point[1]:.4f}", point
+
+    @staticmethod
+    def default_window(today: Optional[date] = None) -> DateRange:
+        """Safra atual até o último dia disponível"""
+        end = HistoryService.available_until(today)
+        start = date(end.year, settings.history_season_start_month, 1)
+        if start > end:
+            start = start.replace(year=end.year - 1)
+        return start, end
+
+    async def _fetch(self, cell: str, point: Tuple[float, float], start: date, end: date) -> None:
+        """Busca [start, end] no arquivo e grava no armazenamento local"""
+        params = {
+            "latitude": point[0],
+            "longitude": point[1],
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "daily": ARCHIVE_VARIABLES,
+            "timezone": "auto"
+        }
+        try:
+            response = await self._service._request(
+                self.archive_url, params, self.archive_timeout, self.breaker, "archive"
+            )
+            daily = response_json(response).get("daily")
+        except httpx.HTTPError as e:
+            raise ExternalAPIException(f"Erro na API de arquivo climático: {str(e)}")
+        except ValueError as e:
+            raise ExternalAPIException(f"Resposta inválida da API de arquivo climático: {str(e)}")
+        if not daily or not daily.get("time"):
+            raise WeatherDataUnavailableException("Histórico climático não disponível")
+
+        days = [date.fromisoformat(value) for value in daily["time"]]
+        if days[0] != start or days[-1] != end or len(days) != (end - start).days + 1:
+            raise ExternalAPIException("Erro na API de arquivo climático: intervalo de datas inesperado")
+
+        columns = {
+            TEMPERATURE_MAX: np.array(daily.get("temperature_2m_max", []), dtype=np.float64),
+            TEMPERATURE_MIN: np.array(daily.get("temperature_2m_min", []), dtype=np.float64),
+            PRECIPITATION: np.array(daily.get("precipitation_sum", []), dtype=np.float64)
+        }
+        if any(len(values) != len(days) for values in columns.values()):
+            raise ExternalAPIException("Erro na API de arquivo climático: séries com tamanhos diferentes")
+
+        # Dias recentes sem nenhum valor ainda não foram consolidados: ficam como lacuna
+        settled = np.array([day < date.today() - timedelta(days=SETTLING_DAYS) for day in days])
+        has_value = ~np.all(np.isnan(np.vstack(list(columns.values()))), axis=0)
+        self._store.write(cell, days, columns, settled | has_value)
+
+        self.upstream_calls += 1
+        self.days_fetched += len(days)
+
+    @asynccontextmanager
+    async def _cell_lock(self, cell: str) -> AsyncIterator[None]:
+        """Lock da célula, descartado quando ninguém mais o usa ou aguarda"""
+        entry = self._locks.get(cell)
+        if entry is None:
+            entry = self._locks[cell] = (asyncio.Lock(), [0])
+        lock, users = entry
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if not users[0]:
+                del self._locks[cell]
+
+    async def ensure(self, cell: str, point: Tuple[float, float], windows: List[DateRange]) -> int:
+        """
+        Garante no armazenamento local os dias das janelas
+
+        Returns:
+            Número de chamadas feitas ao upstream
+        """
+        # Com vários workers, um de cada vez grava os arquivos da célula
+        async with self._cell_lock(cell), shared_lock(("history", cell)):
+            missing = [gap for start, end in windows for gap in self._store.missing_ranges(cell, start, end)]
+            plans = plan_fetches(missing, settings.history_merge_gap_days, settings.history_max_days_per_call)
+            for start, end in plans:
+                await self._fetch(cell, point, start, end)
+        if plans:
+            logger.info(f"History filled {len(missing)} gaps of cell {cell} with {len(plans)} archive calls")
+        return len(plans)
+
+    def _window(self, cell: str, start: date, end: date, base_temperature: float) -> HistoryWindow:
+        stats = self._store.aggregate(
+            cell, start, end, base_temperature,
+            settings.history_dry_day_threshold, settings.history_dry_spell_min_days
+        )
+        for name in ("rainfall", "degree_days"):
+            if stats[name] is not None:
+                stats[name] = round(stats[name], 1)
+        return HistoryWindow(start=start, end=end, **stats)
+
+    async def get_history(
+        self,
+        city_name: str,
+        start: date,
+        end: date,
+        compare_years: int = 0,
+        base_temperature: Optional[float] = None
+    ) -> HistoryResponse:
+        """
+        Agregados da janela [start, end] e da mesma janela em safras anteriores
+
+        end é limitado ao último dia disponível no arquivo; janelas anteriores
+        a 1940 são descartadas.
+        """
+        base_temperature = settings.history_degree_day_base if base_temperature is None else base_temperature
+        end = min(end, self.available_until())
+        location = await self._service.get_coordinates(city_name)
+        cell, point = self.cell_of(location.latitude, location.longitude)
+
+        windows = [(start, end)]
+        for years in range(1, compare_years + 1):
+            previous = (shift_years(start, years), shift_years(end, years))
+            if previous[0] < ARCHIVE_START:
+                break
+            windows.append(previous)
+
+        await self.ensure(cell, point, windows)
+        self.queries += 1
+
+        results = [self._window(cell, window_start, window_end, base_temperature) for window_start, window_end in windows]
+        return HistoryResponse(
+            location=location,
+            base_temperature=base_temperature,
+            current=results[0],
+            previous=results[1:]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do histórico"""
+        return {
+            "queries": self.queries,
+            "upstream_calls": self.upstream_calls,
+            "days_fetched": self.days_fetched,
+            "circuit_breaker": self.breaker.get_stats(),
+            **self._store.get_stats()
+        }
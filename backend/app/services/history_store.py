@@ -0,0 +1,255 @@
+import logging
+import os
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VARIABLES = [
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum"
+]
+
+# Linhas de cada arquivo anual; as colunas são os dias do ano (índice 365 só em anos bissextos)
+TEMPERATURE_MAX, TEMPERATURE_MIN, PRECIPITATION, FETCHED = range(4)
+ROWS = 4
+DAYS_PER_CHUNK = 366
+
+# Intervalo fechado de datas [início, fim]
+DateRange = Tuple[date, date]
+
+
+def day_index(day: date) -> int:
+    """Coluna do dia no arquivo do seu ano"""
+    return day.timetuple().tm_yday - 1
+
+
+def split_by_year(start: date, end: date) -> List[Tuple[int, int, int]]:
+    """Divide [start, end] em (ano, coluna inicial, coluna final exclusiva)"""
+    parts = []
+    for year in range(start.year, end.year + 1):
+        low = day_index(start) if year == start.year else 0
+        high = day_index(end) + 1 if year == end.year else day_index(date(year, 12, 31)) + 1
+        parts.append((year, low, high))
+    return parts
+
+
+class YearChunk:
+    """
+    Um ano de dados diários de uma célula, mapeado do disco (float32, ROWS x 366)
+
+    Somas acumuladas das séries derivadas (chuva, graus-dia, dias secos) são
+    calculadas sob demanda e descartadas quando o ano recebe novos dados, o
+    que torna a soma de qualquer janela O(1) e a atualização incremental.
+    Cada gravação toca o arquivo: o mtime serve de geração para perceber
+    gravações de outros workers, inclusive as que reescrevem dias já obtidos.
+    """
+
+    __slots__ = ("year", "data", "path", "_sums", "_generation")
+
+    def __init__(self, year: int, data: np.ndarray, path: str):
+        self.year = year
+        self.data = data
+        self.path = path
+        self._sums: Dict[Hashable, np.ndarray] = {}
+        self._generation = 0
+        self._generation = self.generation()
+
+    def generation(self) -> int:
+        """Geração da última gravação do arquivo (mtime em nanossegundos)"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._generation
+
+    def range_sum(self, name: Hashable, series: Callable[[np.ndarray], np.ndarray], low: int, high: int) -> float:
+        """Soma da série derivada entre as colunas [low, high)"""
+        sums = self._sums.get(name)
+        if sums is None:
+            sums = self._sums[name] = np.concatenate(([0.0], np.cumsum(series(self.data), dtype=np.float64)))
+        return float(sums[high] - sums[low])
+
+    def invalidate(self) -> None:
+        self._sums.clear()
+        self._generation = self.generation()
+
+    def sync(self) -> None:
+        """Descarta as somas se outro processo (worker) gravou neste ano"""
+        if self.generation() != self._generation:
+            self.invalidate()
+
+
+def _rainfall(data: np.ndarray) -> np.ndarray:
+    return np.nan_to_num(data[PRECIPITATION])
+
+
+def _observed(data: np.ndarray) -> np.ndarray:
+    return ~np.isnan(data[PRECIPITATION])
+
+
+def _degree_days(base: float) -> Callable[[np.ndarray], np.ndarray]:
+    def series(data: np.ndarray) -> np.ndarray:
+        mean = (data[TEMPERATURE_MAX] + data[TEMPERATURE_MIN]) / 2
+        return np.nan_to_num(np.maximum(mean - base, 0))
+    return series
+
+
+def _dry_days(threshold: float) -> Callable[[np.ndarray], np.ndarray]:
+    def series(data: np.ndarray) -> np.ndarray:
+        # Dias sem dado não contam como secos
+        with np.errstate(invalid="ignore"):
+            return data[PRECIPITATION] < threshold
+    return series
+
+
+class HistoryStore:
+    """
+    Armazenamento local e colunar do histórico diário
+
+    Cada célula da grade tem um diretório com um arquivo .npy por ano,
+    aberto com memória mapeada: leituras não copiam o arquivo e uma busca
+    nova grava apenas as colunas dos dias recebidos. A linha FETCHED marca
+    os dias já obtidos, de modo que só as lacunas são buscadas no upstream.
+    """
+
+    def __init__(self, root: str, max_open_chunks: int = 512):
+        self._root = root
+        self._max_open_chunks = max(max_open_chunks, 1)
+        self._chunks: "OrderedDict[Tuple[str, int], YearChunk]" = OrderedDict()
+
+    def _path(self, cell: str, year: int) -> str:
+        return os.path.join(self._root, cell, f"{year}.npy")
+
+    def _chunk(self, cell: str, year: int, create: bool = False) -> Optional[YearChunk]:
+        """Obtém o ano da célula (mapeando o arquivo se necessário)"""
+        key = (cell, year)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+
+        path = self._path(cell, year)
+        if os.path.exists(path):
+            data = np.load(path, mmap_mode="r+")
+        elif create:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(ROWS, DAYS_PER_CHUNK))
+            data[:] = np.nan
+        else:
+            return None
+
+        chunk = self._chunks[key] = YearChunk(year, data, path)
+        # Limita os arquivos mapeados (cada um mantém um descritor aberto)
+        while len(self._chunks) > self._max_open_chunks:
+            _, evicted = self._chunks.popitem(last=False)
+            evicted.data.flush()
+        return chunk
+
+    def missing_ranges(self, cell: str, start: date, end: date) -> List[DateRange]:
+        """Intervalos de [start, end] ainda não obtidos do upstream"""
+        missing: List[DateRange] = []
+        for year, low, high in split_by_year(start, end):
+            chunk = self._chunk(cell, year)
+            if chunk is None:
+                gaps = np.array([[low, high]])
+            else:
+                chunk.sync()
+                absent = np.isnan(chunk.data[FETCHED, low:high]).astype(np.int8)
+                edges = np.diff(np.concatenate(([0], absent, [0])))
+                gaps = np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))) + low
+            first_day = date(year, 1, 1)
+            for gap_start, gap_end in gaps:
+                gap = (first_day + timedelta(days=int(gap_start)), first_day + timedelta(days=int(gap_end) - 1))
+                # Junta com o intervalo anterior quando continua na virada do ano
+                if missing and missing[-1][1] + timedelta(days=1) == gap[0]:
+                    missing[-1] = (missing[-1][0], gap[1])
+                else:
+                    missing.append(gap)
+        return missing
+
+    def write(self, cell: str, days: List[date], columns: Dict[int, np.ndarray], fetched: np.ndarray) -> None:
+        """Grava as séries diárias recebidas (days em ordem crescente e contíguos)"""
+        if not days:
+            return
+        offset = 0
+        for year, low, high in split_by_year(days[0], days[-1]):
+            chunk = self._chunk(cell, year, create=True)
+            count = high - low
+            for row, values in columns.items():
+                chunk.data[row, low:high] = values[offset:offset + count]
+            chunk.data[FETCHED, low:high] = np.where(fetched[offset:offset + count], 1.0, np.nan)
+            chunk.data.flush()
+            # Gravações pela memória mapeada nem sempre atualizam o mtime: a nova geração é explícita
+            os.utime(chunk.path)
+            chunk.invalidate()
+            offset += count
+
+    def series(self, cell: str, start: date, end: date, row: int) -> np.ndarray:
+        """Série diária de [start, end] (NaN nos dias sem dado)"""
+        parts = []
+        for year, low, high in split_by_year(start, end):
+            chunk = self._chunk(cell, year)
+            parts.append(np.full(high - low, np.nan, dtype=np.float32) if chunk is None else chunk.data[row, low:high])
+        return np.concatenate(parts)
+
+    def _range_sum(self, cell: str, start: date, end: date, name: Hashable, series) -> float:
+        total = 0.0
+        for year, low, high in split_by_year(start, end):
+            chunk = self._chunk(cell, year)
+            if chunk is not None:
+                total += chunk.range_sum(name, series, low, high)
+        return total
+
+    def aggregate(
+        self,
+        cell: str,
+        start: date,
+        end: date,
+        base_temperature: float,
+        dry_threshold: float,
+        dry_spell_min_days: int
+    ) -> Dict[str, float]:
+        """
+        Agregados da janela [start, end]
+
+        Somas (chuva, graus-dia, dias secos) saem das somas acumuladas de cada
+        ano; apenas os veranicos percorrem a série da janela.
+        """
+        # Somas de anos gravados por outro worker desde a última consulta são refeitas
+        for year, _, _ in split_by_year(start, end):
+            chunk = self._chunk(cell, year)
+            if chunk is not None:
+                chunk.sync()
+        precipitation = self.series(cell, start, end, PRECIPITATION)
+        with np.errstate(invalid="ignore"):
+            dry = (precipitation < dry_threshold).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], dry, [0])))
+        spells = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+        days_with_data = int(self._range_sum(cell, start, end, "observed", _observed))
+        return {
+            "days": (end - start).days + 1,
+            "days_with_data": days_with_data,
+            "rainfall": self._range_sum(cell, start, end, "rainfall", _rainfall) if days_with_data else None,
+            "degree_days": (
+                self._range_sum(cell, start, end, ("degree_days", base_temperature), _degree_days(base_temperature))
+                if days_with_data else None
+            ),
+            "dry_days": int(self._range_sum(cell, start, end, ("dry_days", dry_threshold), _dry_days(dry_threshold))),
+            "dry_spells": int(np.count_nonzero(spells >= dry_spell_min_days)),
+            "longest_dry_spell": int(spells.max()) if len(spells) else 0
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna estatísticas do armazenamento"""
+        return {"open_chunks": len(self._chunks)}
+
+
+# Instância global do armazenamento do histórico
+history_store = HistoryStore(settings.history_path, settings.history_max_open_chunks)
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.cache import cache
+from ..utils.deadline import deadline_scope
+from ..utils.exceptions import UpstreamRejectedException, WeatherAPIException
+from ..utils.geo import bucket_coordinates
+from ..utils.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[float, float]
+
+
+class CachePrewarmer:
+    """
+    Mantém aquecidas no cache as localizações de uma lista de observação
+
+    A cada rodada (intervalo com variação aleatória, para que vários workers
+    não batam na Open-Meteo ao mesmo tempo) as coordenadas cujo valor em cache
+    ficaria obsoleto antes da próxima rodada são buscadas em chamadas
+    multi-localização, com concorrência e ritmo de chamadas limitados. Com
+    vários workers (cache compartilhado), cada ponto é buscado por apenas um
+    deles e copiado pelos demais.
+    """
+
+    def __init__(
+        self,
+        service,
+        cities: List[str],
+        interval: float = 300.0,
+        jitter: float = 0.1,
+        concurrency: int = 2,
+        min_call_interval: float = 0.5,
+        chunk_size: int = 50
+    ):
+        self._service = service
+        self._cities = list(cities)
+        self._interval = interval
+        self._jitter = jitter
+        self._chunk_size = max(chunk_size, 1)
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._min_call_interval = min_call_interval
+        self._next_call_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._next_run_at: Optional[float] = None
+        # Coordenadas observadas dinamicamente (ex.: conexões de streaming) -> contagem
+        self._watched: Dict[Point, int] = {}
+        self.runs = 0
+        self.last_run: Dict[str, Any] = {}
+
+    def _next_delay(self) -> float:
+        """Intervalo até a próxima rodada, com variação de ±jitter"""
+        spread = self._interval * self._jitter
+        return max(self._interval + random.uniform(-spread, spread), 1.0)
+
+    async def _throttle(self) -> None:
+        """Espaça as chamadas ao upstream em pelo menos min_call_interval segundos"""
+        now = time.monotonic()
+        slot = max(now, self._next_call_at)
+        self._next_call_at = slot + self._min_call_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _needs_refresh(self, point: Point, horizon: float) -> bool:
+        """Verifica se o ponto está fora do cache ou ficará obsoleto antes da próxima rodada"""
+        entry = cache.peek_entry(self._service.get_weather_at.cache_key(self._service, *point))
+        return entry is None or entry.stale_at - time.monotonic() < horizon
+
+    async def _resolve_points(self) -> Tuple[List[Point], int]:
+        """Geocodifica a lista de observação (via cache) e agrupa as coordenadas"""
+        locations = await asyncio.gather(
+            *(self._service.get_coordinates(city) for city in self._cities),
+            return_exceptions=True
+        )
+        points: Dict[Point, None] = {}
+        failed = 0
+        for city, location in zip(self._cities, locations):
+            if isinstance(location, BaseException):
+                logger.warning(f"Prewarm could not resolve '{city}': {location}")
+                failed += 1
+                continue
+            points[bucket_coordinates(location.latitude, location.longitude)] = None
+        for point in self._watched:
+            points[point] = None
+        return list(points), failed
+
+    async def _claim_shared(self, points: List[Point], horizon: float) -> Tuple[List[Point], int, int]:
+        """
+        Divide os pontos com os demais workers pelo cache compartilhado
+
+        Pontos que outro worker já atualizou são copiados de lá; os que outro
+        worker está atualizando (concessão ativa) ficam com ele.
+
+        Returns:
+            (pontos que este worker deve buscar, copiados, deixados para outros workers)
+        """
+        weather = self._service.get_weather_at
+        pulled = await weather.cache_pull([(self._service, *point) for point in points], horizon)
+        remaining = [point for point, ok in zip(points, pulled) if not ok]
+        if not shared_cache.connected:
+            return remaining, sum(pulled), 0
+        granted = await asyncio.gather(
+            *(shared_cache.lock(weather.cache_key(self._service, *point)) for point in remaining)
+        )
+        mine = [point for point, ok in zip(remaining, granted) if ok]
+        return mine, sum(pulled), len(remaining) - len(mine)
+
+    async def _fetch_chunk(self, chunk: List[Point]) -> Tuple[bool, bool]:
+        """Busca um lote; retorna (atualizado, chegou ao upstream)"""
+        async with self._semaphore:
+            await self._throttle()
+            try:
+                results = await self._service.get_weather_many(chunk)
+            except WeatherAPIException as e:
+                logger.warning(f"Prewarm chunk of {len(chunk)} locations failed: {e}")
+                if shared_cache is not None:
+                    # Devolve as concessões para que outro worker (ou uma requisição) tente
+                    for point in chunk:
+                        shared_cache.release(self._service.get_weather_at.cache_key(self._service, *point))
+                # Fila cheia ou circuito aberto: a chamada nem saiu
+                return False, not isinstance(e, UpstreamRejectedException)
+        for point, data in zip(chunk, results):
+            await self._service.get_weather_at.cache_store(data, self._service, *point)
+        return True, True
+
+    async def run_once(self, horizon: Optional[float] = None) -> Dict[str, Any]:
+        """Executa uma rodada de aquecimento e retorna suas estatísticas"""
+        started = time.monotonic()
+        horizon = self._interval * (1 + self._jitter) if horizon is None else horizon
+
+        points, unresolved = await self._resolve_points()
+        stale = [point for point in points if self._needs_refresh(point, horizon)]
+        skipped = len(points) - len(stale)
+        pulled = elsewhere = 0
+        if shared_cache is not None and stale:
+            stale, pulled, elsewhere = await self._claim_shared(stale, horizon)
+        chunks = [stale[i:i + self._chunk_size] for i in range(0, len(stale), self._chunk_size)]
+        outcomes = await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks))
+
+        refreshed = sum(len(chunk) for chunk, (ok, _) in zip(chunks, outcomes) if ok)
+        upstream_calls = sum(1 for _, reached in outcomes if reached)
+        self.runs += 1
+        self.last_run = {
+            "started_at": datetime.now().isoformat(),
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "cities": len(self._cities),
+            "watched": len(self._watched),
+            "locations": len(points),
+            "refreshed": refreshed,
+            "skipped": skipped,
+            "pulled_from_shared": pulled,
+            "left_to_other_workers": elsewhere,
+            "failed": len(stale) - refreshed + unresolved,
+            "upstream_calls": upstream_calls
+        }
+        logger.info(
+            f"Prewarm refreshed {refreshed}/{len(points)} locations "
+            f"in {self.last_run['duration_ms']}ms ({upstream_calls} upstream calls)"
+        )
+        return self.last_run
+
+    async def _run_loop(self, initial_delay: float = 0.0) -> None:
+        delay = initial_delay
+        while True:
+            if delay:
+                self._next_run_at = time.monotonic() + delay
+                await asyncio.sleep(delay)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prewarm run failed: {e}")
+            delay = self._next_delay()
+
+    def watch(self, point: Point) -> None:
+        """Passa a manter o ponto aquecido (iniciando o agendador se necessário)"""
+        self._watched[point] = self._watched.get(point, 0) + 1
+        # O ponto acabou de ser buscado: a primeira rodada pode esperar um intervalo
+        self.start(initial_delay=self._next_delay())
+
+    def unwatch(self, point: Point) -> None:
+        """Desfaz um watch; o ponto sai da lista quando ninguém mais o observa"""
+        count = self._watched.get(point, 0) - 1
+        if count > 0:
+            self._watched[point] = count
+        else:
+            self._watched.pop(point, None)
+
+    def start(self, initial_delay: float = 0.0) -> None:
+        """Inicia o agendador em segundo plano (nada a fazer com a lista vazia)"""
+        if (self._cities or self._watched) and (self._task is None or self._task.done()):
+            # Pode ser chamado durante uma requisição (watch): o agendador não herda o prazo dela
+            with deadline_scope(None):
+                self._task = asyncio.create_task(self._run_loop(initial_delay))
+            logger.info(f"Cache prewarmer started ({len(self._cities)} cities, {len(self._watched)} watched points)")
+
+    async def stop(self) -> None:
+        """Interrompe o agendador"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._next_run_at = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas da última rodada"""
+        next_run_in = None
+        if self._next_run_at is not None:
+            next_run_in = round(max(self._next_run_at - time.monotonic(), 0.0), 1)
+        return {
+            "enabled": self._task is not None,
+            "runs": self.runs,
+            "watched_points": len(self._watched),
+            "next_run_in": next_run_in,
+            "last_run": self.last_run
+        }
+
+
+def create_prewarmer(service) -> CachePrewarmer:
+    """Cria o pré-aquecedor a partir das configurações"""
+    return CachePrewarmer(
+        service,
+        settings.prewarm_cities,
+        interval=settings.prewarm_interval,
+        jitter=settings.prewarm_jitter,
+        concurrency=settings.prewarm_concurrency,
+        min_call_interval=settings.prewarm_min_call_interval,
+        chunk_size=settings.batch_upstream_chunk_size
+    )
@@ -0,0 +1,147 @@
+from typing import List, Literal, Sequence, Union
+
+import numpy as np
+
+RiskLevel = Literal["low", "medium", "high"]
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+RISK_LEVELS: List[RiskLevel] = ["low", "medium", "high"]
+
+# Códigos das faixas de cada variável (índices nas tabelas de mensagens)
+TEMP_IDEAL, TEMP_HOT, TEMP_COLD, TEMP_WARM, TEMP_MILD = range(5)
+PRECIP_NONE, PRECIP_LIGHT, PRECIP_MODERATE, PRECIP_HEAVY = range(4)
+HUMIDITY_OK, HUMIDITY_LOW, HUMIDITY_HIGH, HUMIDITY_MODERATE = range(4)
+WIND_OK, WIND_MODERATE, WIND_STRONG = range(3)
+
+TEMPERATURE_MESSAGES = [
+    "✅ Temperatura ideal para o desenvolvimento da cana",
+    "⚠️ Temperatura muito alta - risco de estresse hídrico",
+    "⚠️ Temperatura baixa - risco de crescimento lento",
+    "🌡️ Temperatura elevada - monitore a irrigação",
+    "🌡️ Temperatura amena - boas condições para desenvolvimento"
+]
+PRECIPITATION_MESSAGES = [
+    "☀️ Sem chuva - verifique necessidade de irrigação",
+    "🌦️ Chuva leve - condições favoráveis",
+    "💧 Chuva moderada - boas condições de umidade",
+    "🌧️ Chuva intensa - risco de erosão e alagamento"
+]
+HUMIDITY_MESSAGES = [
+    "💨 Umidade adequada para o cultivo",
+    "🏜️ Umidade baixa - risco de desidratação",
+    "💦 Umidade alta - risco de doenças fúngicas",
+    "🌫️ Umidade moderada - monitore pragas e doenças"
+]
+WIND_MESSAGES = [
+    "🍃 Condições de vento favoráveis",
+    "🍃 Vento moderado - evite pulverização",
+    "💨 Vento forte - risco de quebra e perda de umidade"
+]
+LEVEL_MESSAGES = [
+    "✅ CONDIÇÕES FAVORÁVEIS - Bom momento para atividades agrícolas",
+    "⚠️ ATENÇÃO - Mantenha-se alerta às condições",
+    "🚨 CONDIÇÕES ADVERSAS - Monitore sua lavoura constantemente"
+]
+
+
+class RiskAssessment:
+    """Resultado colunar da avaliação de risco (um elemento por ponto/horário)"""
+
+    __slots__ = ("levels", "temperature", "precipitation", "humidity", "wind", "factor_counts")
+
+    def __init__(
+        self,
+        levels: np.ndarray,
+        temperature: np.ndarray,
+        precipitation: np.ndarray,
+        humidity: np.ndarray,
+        wind: np.ndarray,
+        factor_counts: np.ndarray
+    ):
+        self.levels = levels
+        self.temperature = temperature
+        self.precipitation = precipitation
+        self.humidity = humidity
+        self.wind = wind
+        self.factor_counts = factor_counts
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def risk_level(self, index: int) -> RiskLevel:
+        """Nível de risco do elemento"""
+        return RISK_LEVELS[self.levels[index]]
+
+    def risk_levels(self) -> List[RiskLevel]:
+        """Níveis de risco de todos os elementos"""
+        return [RISK_LEVELS[level] for level in self.levels.tolist()]
+
+    def recommendations(self, index: int) -> List[str]:
+        """Recomendações do elemento, na mesma ordem da análise escalar"""
+        return [
+            LEVEL_MESSAGES[self.levels[index]],
+            TEMPERATURE_MESSAGES[self.temperature[index]],
+            PRECIPITATION_MESSAGES[self.precipitation[index]],
+            HUMIDITY_MESSAGES[self.humidity[index]],
+            WIND_MESSAGES[self.wind[index]]
+        ]
+
+
+def assess_risk(
+    temperature: ArrayLike,
+    humidity: ArrayLike,
+    precipitation: ArrayLike,
+    wind_speed: ArrayLike
+) -> RiskAssessment:
+    """
+    Avalia o risco agrícola de vários pontos de uma vez
+
+    Recebe colunas (temperatura °C, umidade %, precipitação mm, vento km/h)
+    e aplica as mesmas faixas da análise escalar com comparações vetorizadas.
+    """
+    temp = np.asarray(temperature, dtype=np.float64)
+    hum = np.asarray(humidity, dtype=np.float64)
+    precip = np.asarray(precipitation, dtype=np.float64)
+    wind = np.asarray(wind_speed, dtype=np.float64)
+
+    temp_hot = temp > 35
+    temp_cold = temp < 10
+    temp_warm = ~temp_hot & (temp > 30)
+    temp_mild = ~temp_cold & (temp < 15)
+    temp_code = np.select(
+        [temp_hot, temp_cold, temp_warm, temp_mild],
+        [TEMP_HOT, TEMP_COLD, TEMP_WARM, TEMP_MILD],
+        TEMP_IDEAL
+    ).astype(np.int8)
+
+    precip_heavy = precip > 50
+    precip_code = np.select(
+        [precip_heavy, precip > 20, precip > 0],
+        [PRECIP_HEAVY, PRECIP_MODERATE, PRECIP_LIGHT],
+        PRECIP_NONE
+    ).astype(np.int8)
+
+    humidity_code = np.select(
+        [hum < 30, hum > 90, (hum < 40) | (hum > 80)],
+        [HUMIDITY_LOW, HUMIDITY_HIGH, HUMIDITY_MODERATE],
+        HUMIDITY_OK
+    ).astype(np.int8)
+
+    wind_code = np.select(
+        [wind > 40, wind > 25],
+        [WIND_STRONG, WIND_MODERATE],
+        WIND_OK
+    ).astype(np.int8)
+
+    factor_counts = (
+        (temp_code != TEMP_IDEAL).astype(np.int8)
+        + (precip_code >= PRECIP_MODERATE)
+        + (humidity_code != HUMIDITY_OK)
+        + (wind_code != WIND_OK)
+    )
+
+    # Risco alto: três ou mais fatores, ou temperatura extrema, ou chuva intensa
+    high = (factor_counts >= 3) | temp_hot | temp_cold | precip_heavy
+    levels = np.where(high, 2, np.where(factor_counts >= 1, 1, 0)).astype(np.int8)
+
+    return RiskAssessment(levels, temp_code, precip_code, humidity_code, wind_code, factor_counts)
@@ -1,60 +1,225 @@
+import asyncio
 import httpx
-from datetime import datetime
-from typing import List, Literal
-from ..models.weather import Location, CurrentWeather, AgriculturalInsight, WeatherResponse
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Literal, Optional, Tuple, Union
+from ..models.weather import (
+    Location,
+    CurrentWeather,
+    AgriculturalInsight,
+    WeatherResponse,
+    BatchLocationQuery,
+    BatchWeatherItem,
+    ForecastPoint,
+    ForecastDay,
+    ForecastResponse
+)
+from ..models.records import CurrentConditions, GeoPoint
 from ..utils.exceptions import (
     CityNotFoundException,
     WeatherDataUnavailableException,
-    ExternalAPIException
+    ExternalAPIException,
+    DeadlineExceededException,
+    describe_exception
 )
-from ..utils.cache import cached
+from .geocoding_index import geocoding_index
+from .forecast import DAILY_VARIABLES, HOURLY_VARIABLES, ForecastSeries
+from .risk_engine import RISK_LEVELS, assess_risk
+from ..utils.cache import NegativeResult, cache, cached
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.deadline import budget, time_left, within_deadline
+from ..utils.geo import bucket_coordinates, bucket_label, cell_tag
+from ..utils.http_client import http_client
+from ..utils.metrics import RISK_ANALYSIS_LATENCY, SERIALIZATION_LATENCY, UPSTREAM_LATENCY, UPSTREAM_RETRIES
+from ..utils.rate_limiter import backoff_delay, get_upstream_limiter, parse_retry_after
+from ..utils.response_cache import CachedResponse, response_cache
+from ..utils.serialization import response_json
+from ..utils.text import canonicalize_city, normalize_text
 from ..config import settings
 
 
+# Respostas do upstream que indicam sobrecarga e podem ser repetidas
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+def _conditions(data: dict) -> CurrentConditions:
+    """Converte uma localização da resposta da API de clima no registro compacto do cache"""
+    try:
+        return CurrentConditions.from_api(data)
+    except (KeyError, TypeError, ValueError):
+        raise WeatherDataUnavailableException("Dados climáticos não disponíveis")
+
+
+def _rounded(value: float) -> Optional[float]:
+    """Converte um valor float32 da série para float com 2 casas (NaN vira None)"""
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
+
+
 class WeatherService:
     def __init__(self):
-        self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        self.weather_url = "https://api.open-meteo.com/v1/forecast"
+        self.geocoding_url = settings.geocoding_api_url
+        self.weather_url = settings.weather_api_url
         self.timeout = settings.request_timeout
+        self.geocoding_timeout = settings.geocoding_timeout or self.timeout
+        self.weather_timeout = settings.weather_timeout or self.timeout
+        self.geocoding_breaker = CircuitBreaker(
+            "geocodificação",
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_timeout=settings.circuit_breaker_recovery_timeout
+        )
+        self.weather_breaker = CircuitBreaker(
+            "clima",
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_timeout=settings.circuit_breaker_recovery_timeout
+        )
+
+    async def _request(
+        self,
+        url: str,
+        params: dict,
+        timeout: float,
+        breaker: CircuitBreaker,
+        endpoint: str
+    ) -> httpx.Response:
+        """
+        Executa um GET no upstream com limitação de taxa, circuit breaker e novas tentativas
+        
+        Sobrecarga (429, 502, 503, 504 e timeouts) e falhas de transporte são
+        repetidas até upstream_max_retries vezes com backoff exponencial e
+        jitter, respeitando Retry-After. A latência é medida por endpoint.
+        
+        Fila, chamada e esperas entre tentativas ficam dentro do prazo da
+        requisição: cada tentativa usa o menor entre timeout e o que resta.
+        """
+        limiter = get_upstream_limiter(httpx.URL(url).host)
+        attempt = 0
+        
+        while True:
+            await within_deadline(limiter.acquire(breaker.name))
+            try:
+                breaker.before_call()
+            except ExternalAPIException:
+                limiter.release("rejected")
+                raise
+            
+            started = time.perf_counter()
+            outcome = "error"
+            retry_after = None
+            try:
+                response = await within_deadline(
+                    http_client.get(url, params=params, timeout=budget(timeout))
+                )
+                response.raise_for_status()
+                outcome = "ok"
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                # Apenas erros do servidor e limitação de taxa indicam indisponibilidade
+                if status_code >= 500 or status_code == 429:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if status_code not in RETRYABLE_STATUS_CODES:
+                    raise
+                outcome = "overloaded"
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                error = e
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if isinstance(e, httpx.TimeoutException):
+                    outcome = "overloaded"
+                error = e
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+            except (asyncio.CancelledError, DeadlineExceededException):
+                outcome = "cancelled"
+                breaker.abandon()
+                raise
+            finally:
+                UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint, outcome)
+                limiter.release(outcome)
+            
+            if outcome == "ok":
+                breaker.record_success()
+                return response
+            
+            delay = backoff_delay(attempt, retry_after) if attempt < settings.upstream_max_retries else None
+            # Não vale esperar por uma tentativa que terminaria depois do prazo
+            if delay is None or delay >= time_left():
+                raise error
+            attempt += 1
+            UPSTREAM_RETRIES.inc(endpoint)
+            await asyncio.sleep(delay)
 
-    @cached(ttl=None, key_prefix="geocoding")
     async def get_coordinates(self, city_name: str) -> Location:
-        """Obtém coordenadas da cidade usando a API de geocodificação"""
+        """Obtém coordenadas da cidade, consultando o índice local antes da API"""
+        # Variações de acento, caixa, espaços e apelidos compartilham a mesma chave
+        canonical_name = canonicalize_city(city_name)
+        
+        if settings.geocoding_index_enabled:
+            location = geocoding_index.lookup(canonical_name)
+            if location is not None:
+                return location
+        
+        point = await self.geocode_remote(canonical_name, city_name.strip())
+        return point.to_location()
+
+    @cached(
+        ttl=None,
+        key_prefix="geocoding",
+        key_args=("canonical_name",),
+        tags=lambda self, canonical_name, city_name: (f"city:{canonical_name}",),
+        negative_ttls={
+            CityNotFoundException: settings.cache_ttl_not_found,
+            ExternalAPIException: settings.cache_ttl_upstream_error
+        }
+    )
+    async def geocode_remote(self, canonical_name: str, city_name: str) -> GeoPoint:
+        """
+        Obtém coordenadas da cidade usando a API de geocodificação (registro compacto para o cache)
+        
+        A chave usa apenas canonical_name; a API, a mensagem de erro e o nome
+        de reserva usam o nome como o usuário escreveu (ou o nome canônico,
+        quando o informado é um apelido que a API não conhece).
+        """
+        query = city_name if normalize_text(city_name) == canonical_name else canonical_name
         params = {
-            "name": city_name,
+            "name": query,
             "count": 1,
             "language": "pt",
             "format": "json"
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.geocoding_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data.get("results") or len(data["results"]) == 0:
-                    raise CityNotFoundException(f"Cidade '{city_name}' não encontrada")
-                
-                result = data["results"][0]
-                return Location(
-                    name=result.get("name", city_name),
-                    latitude=result["latitude"],
-                    longitude=result["longitude"]
-                )
+            response = await self._request(
+                self.geocoding_url, params, self.geocoding_timeout, self.geocoding_breaker, "geocoding"
+            )
+            data = response_json(response)
+            
+            if not data.get("results") or len(data["results"]) == 0:
+                raise CityNotFoundException(f"Cidade '{city_name}' não encontrada")
+            
+            result = data["results"][0]
+            location = Location(
+                name=result.get("name", city_name),
+                latitude=result["latitude"],
+                longitude=result["longitude"]
+            )
+            return GeoPoint(location.name, location.latitude, location.longitude)
         except httpx.HTTPError as e:
             raise ExternalAPIException(f"Erro na API de geocodificação: {str(e)}")
         except Exception as e:
-            if isinstance(e, (CityNotFoundException, ExternalAPIException)):
+            if isinstance(e, (CityNotFoundException, ExternalAPIException, DeadlineExceededException)):
                 raise
             raise ExternalAPIException(f"Erro ao buscar coordenadas: {str(e)}")
 
-    @cached(ttl=None, key_prefix="weather")
-    async def get_weather_data(self, location: Location) -> dict:
-        """Obtém dados climáticos atuais usando a API Open-Meteo"""
-        params = {
-            "latitude": location.latitude,
-            "longitude": location.longitude,
+    def _weather_params(self, latitude: str, longitude: str) -> dict:
+        """Monta os parâmetros da API de clima (aceita coordenadas separadas por vírgula)"""
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
             "current": [
                 "temperature_2m",
                 "relativehumidity_2m",
@@ -65,107 +230,146 @@ class WeatherService:
             ],
             "timezone": "auto"
         }
+
+    async def get_weather_data(self, location: Location) -> CurrentConditions:
+        """Obtém dados climáticos atuais usando a API Open-Meteo"""
+        # Localizações vizinhas na mesma célula compartilham cache e chamada upstream
+        latitude, longitude = bucket_coordinates(location.latitude, location.longitude)
+        return await self.get_weather_at(latitude, longitude)
+
+    @cached(
+        ttl=None,
+        key_prefix="weather",
+        stale_ttl=settings.cache_stale_ttl_weather,
+        refresh_ahead=settings.cache_refresh_ahead_enabled,
+        track_by=lambda self, latitude, longitude: bucket_label(latitude, longitude),
+        tags=lambda self, latitude, longitude: (cell_tag(latitude, longitude),),
+        negative_ttls={
+            WeatherDataUnavailableException: settings.cache_ttl_upstream_error,
+            ExternalAPIException: settings.cache_ttl_upstream_error
+        }
+    )
+    async def get_weather_at(self, latitude: float, longitude: float) -> CurrentConditions:
+        """Obtém dados climáticos atuais para um par de coordenadas"""
+        params = self._weather_params(str(latitude), str(longitude))
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.weather_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if "current" not in data:
-                    raise WeatherDataUnavailableException("Dados climáticos não disponíveis")
-                
-                return data
+            response = await self._request(
+                self.weather_url, params, self.weather_timeout, self.weather_breaker, "current"
+            )
+            return _conditions(response_json(response))
+        except httpx.HTTPError as e:
+            raise ExternalAPIException(f"Erro na API de clima: {str(e)}")
+        except Exception as e:
+            if isinstance(e, (WeatherDataUnavailableException, ExternalAPIException, DeadlineExceededException)):
+                raise
+            raise ExternalAPIException(f"Erro ao buscar dados climáticos: {str(e)}")
+
+    async def get_weather_many(self, points: List[Tuple[float, float]]) -> List[CurrentConditions]:
+        """
+        Obtém dados climáticos de várias coordenadas em uma única chamada
+        
+        Usa o suporte da Open-Meteo a múltiplas localizações (latitude e
+        longitude separadas por vírgula). O resultado segue a ordem de points.
+        """
+        params = self._weather_params(
+            ",".join(str(lat) for lat, _ in points),
+            ",".join(str(lon) for _, lon in points)
+        )
+        
+        try:
+            response = await self._request(
+                self.weather_url, params, self.weather_timeout, self.weather_breaker, "current"
+            )
+            data = response_json(response)
+            
+            # Com uma única localização a API retorna um objeto em vez de lista
+            results = data if isinstance(data, list) else [data]
+            if len(results) != len(points):
+                raise WeatherDataUnavailableException("Dados climáticos não disponíveis")
+            
+            return [_conditions(item) for item in results]
         except httpx.HTTPError as e:
             raise ExternalAPIException(f"Erro na API de clima: {str(e)}")
         except Exception as e:
-            if isinstance(e, (WeatherDataUnavailableException, ExternalAPIException)):
+            if isinstance(e, (WeatherDataUnavailableException, ExternalAPIException, DeadlineExceededException)):
                 raise
             raise ExternalAPIException(f"Erro ao buscar dados climáticos: {str(e)}")
 
-    def analyze_agricultural_risk(self, weather_data: dict) -> tuple[Literal["low", "medium", "high"], List[str]]:
+    @cached(
+        ttl=settings.cache_ttl_forecast,
+        key_prefix="forecast",
+        tags=lambda self, latitude, longitude: (cell_tag(latitude, longitude),),
+        negative_ttls={
+            WeatherDataUnavailableException: settings.cache_ttl_upstream_error,
+            ExternalAPIException: settings.cache_ttl_upstream_error
+        }
+    )
+    async def get_forecast_at(self, latitude: float, longitude: float) -> ForecastSeries:
+        """Obtém a previsão horária e diária de um par de coordenadas (uma chamada por rodada do modelo)"""
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": HOURLY_VARIABLES,
+            "daily": DAILY_VARIABLES,
+            "forecast_days": settings.forecast_days,
+            "timeformat": "unixtime",
+            "timezone": "auto"
+        }
+        
+        try:
+            response = await self._request(
+                self.weather_url, params, self.weather_timeout, self.weather_breaker, "forecast"
+            )
+            data = response_json(response)
+            
+            if "hourly" not in data:
+                raise WeatherDataUnavailableException("Dados de previsão não disponíveis")
+            
+            return ForecastSeries(data)
+        except httpx.HTTPError as e:
+            raise ExternalAPIException(f"Erro na API de clima: {str(e)}")
+        except Exception as e:
+            if isinstance(e, (WeatherDataUnavailableException, ExternalAPIException, DeadlineExceededException)):
+                raise
+            raise ExternalAPIException(f"Erro ao buscar previsão: {str(e)}")
+
+    def analyze_agricultural_risk(self, conditions: CurrentConditions) -> tuple[Literal["low", "medium", "high"], List[str]]:
         """Analisa os dados climáticos e retorna nível de risco e recomendações"""
-        current = weather_data["current"]
+        with RISK_ANALYSIS_LATENCY.time("current"):
+            assessment = assess_risk(
+                [conditions.temperature],
+                [conditions.humidity],
+                [conditions.precipitation],
+                [conditions.wind_speed]
+            )
+        return assessment.risk_level(0), assessment.recommendations(0)
+
+    def build_weather_response(self, location: Location, conditions: CurrentConditions) -> WeatherResponse:
+        """Monta a resposta completa a partir da localização e das condições em cache"""
+        current_weather = CurrentWeather(
+            temperature=conditions.temperature,
+            humidity=int(conditions.humidity),
+            precipitation=conditions.precipitation,
+            wind_speed=conditions.wind_speed,
+            pressure=conditions.pressure,
+            cloud_cover=int(conditions.cloud_cover),
+            last_updated=datetime.now()
+        )
         
-        temp = current.get("temperature_2m", 0)
-        humidity = current.get("relativehumidity_2m", 0)
-        precipitation = current.get("precipitation", 0)
-        wind_speed = current.get("windspeed_10m", 0)
         
-        risk_factors = []
-        recommendations = []
+        risk_level, recommendations = self.analyze_agricultural_risk(conditions)
+        agricultural_insights = AgriculturalInsight(
+            risk_level=risk_level,
+            recommendations=recommendations
+        )
         
         
-        if temp > 35 or temp < 10:
-            risk_factors.append("temperature")
-            if temp > 35:
-                recommendations.append("⚠️ Temperatura muito alta - risco de estresse hídrico")
-            else:
-                recommendations.append("⚠️ Temperatura baixa - risco de crescimento lento")
-        elif temp > 30 or temp < 15:
-            risk_factors.append("temperature")
-            if temp > 30:
-                recommendations.append("🌡️ Temperatura elevada - monitore a irrigação")
-            else:
-                recommendations.append("🌡️ Temperatura amena - boas condições para desenvolvimento")
-        else:
-            recommendations.append("✅ Temperatura ideal para o desenvolvimento da cana")
-        
-        
-        if precipitation > 50:
-            risk_factors.append("precipitation")
-            recommendations.append("🌧️ Chuva intensa - risco de erosão e alagamento")
-        elif precipitation > 20:
-            risk_factors.append("precipitation")
-            recommendations.append("💧 Chuva moderada - boas condições de umidade")
-        elif precipitation > 0:
-            recommendations.append("🌦️ Chuva leve - condições favoráveis")
-        else:
-            recommendations.append("☀️ Sem chuva - verifique necessidade de irrigação")
-        
-        
-        if humidity < 30 or humidity > 90:
-            risk_factors.append("humidity")
-            if humidity < 30:
-                recommendations.append("🏜️ Umidade baixa - risco de desidratação")
-            else:
-                recommendations.append("💦 Umidade alta - risco de doenças fúngicas")
-        elif humidity < 40 or humidity > 80:
-            risk_factors.append("humidity")
-            recommendations.append("🌫️ Umidade moderada - monitore pragas e doenças")
-        else:
-            recommendations.append("💨 Umidade adequada para o cultivo")
-        
-        
-        if wind_speed > 40:
-            risk_factors.append("wind")
-            recommendations.append("💨 Vento forte - risco de quebra e perda de umidade")
-        elif wind_speed > 25:
-            risk_factors.append("wind")
-            recommendations.append("🍃 Vento moderado - evite pulverização")
-        else:
-            recommendations.append("🍃 Condições de vento favoráveis")
-        
-        
-        risk_level: Literal["low", "medium", "high"]
-        if len(risk_factors) >= 3 or any(factor in ["temperature", "precipitation"] and 
-                                          ((temp > 35 or temp < 10) or precipitation > 50) 
-                                          for factor in risk_factors):
-            risk_level = "high"
-        elif len(risk_factors) >= 1:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        
-        if risk_level == "high":
-            recommendations.insert(0, "🚨 CONDIÇÕES ADVERSAS - Monitore sua lavoura constantemente")
-        elif risk_level == "medium":
-            recommendations.insert(0, "⚠️ ATENÇÃO - Mantenha-se alerta às condições")
-        else:
-            recommendations.insert(0, "✅ CONDIÇÕES FAVORÁVEIS - Bom momento para atividades agrícolas")
-        
-        return risk_level, recommendations
+        return WeatherResponse(
+            location=location,
+            current=current_weather,
+            agricultural_insights=agricultural_insights
+        )
 
     async def get_weather_by_city(self, city_name: str) -> WeatherResponse:
         """Método principal que obtém dados climáticos completos para uma cidade"""
@@ -174,35 +378,164 @@ class WeatherService:
             location = await self.get_coordinates(city_name)
             
             
-            weather_data = await self.get_weather_data(location)
+            conditions = await self.get_weather_data(location)
             
             
-            current = weather_data["current"]
-            current_weather = CurrentWeather(
-                temperature=current["temperature_2m"],
-                humidity=int(current["relativehumidity_2m"]),
-                precipitation=current["precipitation"],
-                wind_speed=current["windspeed_10m"],
-                pressure=current["pressure_msl"],
-                cloud_cover=int(current["cloudcover"]),
-                last_updated=datetime.now()
-            )
+            return self.build_weather_response(location, conditions)
             
+        except Exception as e:
+            if isinstance(e, (CityNotFoundException, WeatherDataUnavailableException, ExternalAPIException, DeadlineExceededException)):
+                raise
+            raise ExternalAPIException(f"Erro ao processar solicitação: {str(e)}")
+
+    async def get_weather_payload(self, city_name: str) -> CachedResponse:
+        """
+        Retorna a resposta de get_weather_by_city já serializada em JSON
+        
+        Cidades quentes são servidas a partir do cache de respostas enquanto a
+        entrada de clima que originou o corpo continuar a mesma no cache; uma
+        atualização dessa entrada invalida a resposta automaticamente.
+        """
+        canonical_name = canonicalize_city(city_name)
+        
+        cached_response = response_cache.get(canonical_name)
+        if cached_response is not None:
+            entry = cache.peek_entry(cached_response.source_key)
+            if entry is not None and entry is cached_response.source_entry:
+                if entry.is_stale():
+                    # Passa pelo cache de clima para agendar a revalidação
+                    await self.get_weather_at(*cached_response.point)
+                response_cache.record_hit()
+                return cached_response
+            response_cache.discard(canonical_name)
+        
+        weather_response = await self.get_weather_by_city(city_name)
+        with SERIALIZATION_LATENCY.time("weather"):
+            body = weather_response.model_dump_json(by_alias=True).encode()
+        
+        location = weather_response.location
+        point = bucket_coordinates(location.latitude, location.longitude)
+        source_key = self.get_weather_at.cache_key(self, *point)
+        entry = cache.peek_entry(source_key)
+        
+        payload = CachedResponse(body, source_key, entry, point)
+        if entry is not None and not isinstance(entry.data, NegativeResult):
+            response_cache.put(canonical_name, payload)
+        return payload
+
+    async def get_forecast_by_city(
+        self,
+        city_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> ForecastResponse:
+        """
+        Retorna a linha do tempo de risco da cidade para a janela [start, end)
+        
+        A série completa é obtida uma vez e mantida em cache; janelas
+        diferentes são recortadas localmente, sem novas chamadas upstream.
+        Sem janela informada, cobre as próximas FORECAST_DEFAULT_HOURS horas.
+        """
+        try:
+            location = await self.get_coordinates(city_name)
+            latitude, longitude = bucket_coordinates(location.latitude, location.longitude)
+            series = await self.get_forecast_at(latitude, longitude)
             
-            risk_level, recommendations = self.analyze_agricultural_risk(weather_data)
-            agricultural_insights = AgriculturalInsight(
-                risk_level=risk_level,
-                recommendations=recommendations
-            )
+            if start is None and end is None:
+                start = datetime.now(timezone.utc)
+                end = start + timedelta(hours=settings.forecast_default_hours)
             
+            hours = series.hourly_window(start, end)
+            risk = series.risk
+            hourly = [
+                ForecastPoint(
+                    time=series.time_of(i),
+                    temperature=_rounded(series.temperature[i]),
+                    humidity=_rounded(series.humidity[i]),
+                    precipitation=_rounded(series.precipitation[i]),
+                    wind_speed=_rounded(series.wind_speed[i]),
+                    risk_level=risk.risk_level(i),
+                    risk_factors=int(risk.factor_counts[i])
+                )
+                for i in range(hours.start, hours.stop)
+            ]
             
-            return WeatherResponse(
-                location=location,
-                current=current_weather,
-                agricultural_insights=agricultural_insights
-            )
+            daily = []
+            for day in range(*series.daily_window(hours).indices(len(series.day_starts))):
+                worst_level, high_risk_hours = series.day_risk(day, hours)
+                daily.append(ForecastDay(
+                    day=series.day_of(day),
+                    temperature_max=_rounded(series.temperature_max[day]),
+                    temperature_min=_rounded(series.temperature_min[day]),
+                    precipitation_sum=_rounded(series.precipitation_sum[day]),
+                    wind_speed_max=_rounded(series.wind_speed_max[day]),
+                    risk_level=RISK_LEVELS[worst_level],
+                    high_risk_hours=high_risk_hours
+                ))
+            
+            return ForecastResponse(location=location, hourly=hourly, daily=daily)
             
         except Exception as e:
-            if isinstance(e, (CityNotFoundException, WeatherDataUnavailableException, ExternalAPIException)):
+            if isinstance(e, (CityNotFoundException, WeatherDataUnavailableException, ExternalAPIException, DeadlineExceededException)):
                 raise
-            raise ExternalAPIException(f"Erro ao processar solicitação: {str(e)}")
\ No newline at end of file
+            raise ExternalAPIException(f"Erro ao processar previsão: {str(e)}")
+
+    async def _resolve_location(self, query: BatchLocationQuery) -> Location:
+        """Converte um item do lote em Location (geocodificando quando necessário)"""
+        if query.city:
+            return await self.get_coordinates(query.city.strip())
+        return Location(
+            name=query.name or f"{query.latitude},{query.longitude}",
+            latitude=query.latitude,
+            longitude=query.longitude
+        )
+
+    async def get_weather_batch(self, queries: List[BatchLocationQuery]) -> List[BatchWeatherItem]:
+        """
+        Obtém dados climáticos de várias localizações com concorrência limitada
+        
+        Acertos de cache são servidos localmente; as coordenadas restantes são
+        agrupadas em chamadas multi-localização à Open-Meteo. Falhas ficam
+        restritas ao item correspondente.
+        """
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        
+        async def resolve(query: BatchLocationQuery) -> Location:
+            async with semaphore:
+                return await self._resolve_location(query)
+        
+        resolved = await asyncio.gather(*(resolve(q) for q in queries), return_exceptions=True)
+        
+        points = list(dict.fromkeys(
+            bucket_coordinates(location.latitude, location.longitude)
+            for location in resolved if not isinstance(location, BaseException)
+        ))
+        
+        async def fetch_chunk(calls: List[tuple]) -> List[CurrentConditions]:
+            async with semaphore:
+                return await self.get_weather_many([call[1:] for call in calls])
+        
+        # Acertos de cache são servidos localmente (obsoletos com revalidação); as faltas entram no
+        # single-flight de get_weather_at e vão ao upstream em chamadas multi-localização
+        outcomes = await self.get_weather_at.cache_many(
+            [(self, *point) for point in points], fetch_chunk, settings.batch_upstream_chunk_size
+        )
+        weather_by_point: Dict[Tuple[float, float], Union[CurrentConditions, BaseException]] = dict(zip(points, outcomes))
+        
+        items: List[BatchWeatherItem] = []
+        for query, location in zip(queries, resolved):
+            outcome = location
+            if not isinstance(location, BaseException):
+                outcome = weather_by_point[bucket_coordinates(location.latitude, location.longitude)]
+            
+            if isinstance(outcome, BaseException):
+                status_code, detail = describe_exception(outcome)
+                items.append(BatchWeatherItem(query=query, status_code=status_code, error=detail))
+            else:
+                items.append(BatchWeatherItem(
+                    query=query,
+                    status_code=200,
+                    data=self.build_weather_response(location, outcome)
+                ))
+        
+        return items
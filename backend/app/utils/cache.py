@@ -1,123 +1,794 @@
 import asyncio
-import hashlib
-import json
+import heapq
+import itertools
 import logging
-from datetime import datetime, timedelta
+import random
+import time
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, TypeVar, Union
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
 from ..config import settings
+from .cache_keys import CacheKey, format_key, key_builder
+from .deadline import check_deadline, deadline_scope, within_deadline
+from .eviction import EvictionPolicy, create_policy
+from .exceptions import DeadlineExceededException
+from .memory import deep_sizeof
+from .metrics import CACHE_EVENTS, REQUEST_DEADLINE_EVENTS, registry
+from .persistent_cache import persistent_cache
+from .shared_cache import SharedRow, shared_cache
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Marca posições ainda não resolvidas em cache_many (None é um resultado válido)
+_MISSING = object()
+
 
 class CacheEntry:
-    """Entrada de cache com timestamp e TTL"""
+    """Entrada de cache com timestamp, TTL e janela opcional de valor obsoleto"""
+    
+    __slots__ = ("data", "created_at", "stale_at", "expires_at", "ttl", "hits")
     
-    def __init__(self, data: Any, ttl: int):
+    def __init__(self, data: Any, ttl: int, stale_ttl: int = 0):
         self.data = data
-        self.created_at = datetime.now()
-        self.expires_at = self.created_at + timedelta(seconds=ttl)
+        self.created_at = time.monotonic()
+        self.stale_at = self.created_at + ttl
+        self.expires_at = self.stale_at + stale_ttl
+        self.ttl = ttl
+        self.hits = 0
+    
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Verifica se a entrada de cache expirou (TTL rígido)"""
+        return (now if now is not None else time.monotonic()) > self.expires_at
+    
+    def is_stale(self) -> bool:
+        """Verifica se a entrada passou do TTL flexível e deve ser revalidada"""
+        return time.monotonic() > self.stale_at
+    
+    def remaining_ratio(self) -> float:
+        """Fração do TTL flexível que ainda resta (0.0 quando obsoleta)"""
+        if self.ttl <= 0:
+            return 0.0
+        remaining = self.stale_at - time.monotonic()
+        return max(remaining, 0.0) / self.ttl
+
+
+class NegativeResult:
+    """Marcador de cache negativo: guarda a exceção levantada pela função"""
+    
+    __slots__ = ("exception",)
     
-    def is_expired(self) -> bool:
-        """Verifica se a entrada de cache expirou"""
-        return datetime.now() > self.expires_at
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+    
+    def reraise(self) -> None:
+        """Levanta uma nova instância da exceção armazenada"""
+        raise type(self.exception)(*self.exception.args)
+
+
+def key_prefix_of(key: Hashable) -> Hashable:
+    """Prefixo da chave: primeiro elemento da tupla ou texto antes do primeiro dois-pontos"""
+    if isinstance(key, tuple):
+        return key[0] if key else ""
+    return str(key).partition(":")[0]
 
 
 class MemoryCache:
-    """Implementação de cache em memória thread-safe"""
+    """
+    Implementação de cache em memória para o event loop
+    
+    Leituras não usam lock: no asyncio não há preempção entre instruções
+    síncronas, então o dicionário nunca é observado em estado intermediário.
+    Escritas são serializadas pelo lock. A política de remoção é plugável
+    e entradas expiradas são recolhidas por um varredor em segundo plano.
+    Índices por prefixo e por tag permitem invalidar grupos de chaves com
+    custo proporcional ao número de chaves atingidas.
+    
+    Entradas expiradas são mantidas por mais fallback_ttl segundos como
+    último valor conhecido (last_entry): não são servidas como acerto, mas
+    podem substituir uma atualização que não cabe no prazo da requisição.
+    """
     
-    def __init__(self, max_size: int = 1000):
-        self._cache: Dict[str, CacheEntry] = {}
+    def __init__(self, max_size: int = 1000, policy: Union[str, EvictionPolicy] = "lru", fallback_ttl: float = 0):
+        self._cache: Dict[Hashable, CacheEntry] = {}
         self._max_size = max_size
+        self._fallback_ttl = fallback_ttl
         self._lock = asyncio.Lock()
+        self._policy = create_policy(policy) if isinstance(policy, str) else policy
+        # Heap (expires_at + fallback_ttl, seq, key, entry) usado apenas pelo varredor de expirados
+        self._expiry_heap: List[Tuple[float, int, Hashable, CacheEntry]] = []
+        self._seq = itertools.count()
+        self._sweeper: Optional[asyncio.Task] = None
+        # Callbacks (key, value) chamados a cada gravação (ex.: push de atualizações)
+        self._listeners: List[Callable[[Hashable, Any], None]] = []
+        # Índices secundários: prefixo -> chaves, tag -> chaves e chave -> tags
+        self._prefix_index: Dict[Hashable, Set[Hashable]] = {}
+        self._tag_index: Dict[str, Set[Hashable]] = {}
+        self._key_tags: Dict[Hashable, Tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Obtém um valor do cache"""
-        async with self._lock:
-            if key not in self._cache:
-                return None
-            
-            entry = self._cache[key]
-            if entry.is_expired():
-                del self._cache[key]
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Obtém um valor do cache (apenas entradas não obsoletas)"""
+        entry = await self.get_entry(key)
+        if entry is None or entry.is_stale():
+            return None
+        return entry.data
+    
+    async def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Obtém a entrada do cache, incluindo valores obsoletos dentro do TTL rígido"""
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            CACHE_EVENTS.inc(str(key_prefix_of(key)), "miss")
+            return None
+        
+        if entry.is_expired():
+            self.misses += 1
+            CACHE_EVENTS.inc(str(key_prefix_of(key)), "miss")
+            # Dentro de fallback_ttl a entrada fica como último valor conhecido (removida pelo varredor)
+            if entry.is_expired(time.monotonic() - self._fallback_ttl):
+                self._remove(key)
+                self.expirations += 1
+                CACHE_EVENTS.inc(str(key_prefix_of(key)), "expiration")
                 logger.debug(f"Cache expired for key: {key}")
-                return None
-            
-            logger.debug(f"Cache hit for key: {key}")
-            return entry.data
+            return None
+        
+        entry.hits += 1
+        self.hits += 1
+        CACHE_EVENTS.inc(str(key_prefix_of(key)), "hit")
+        self._policy.record_access(key)
+        logger.debug(f"Cache hit for key: {key}")
+        return entry
     
-    async def set(self, key: str, value: Any, ttl: int) -> None:
-        """Define um valor no cache"""
+    def peek_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Retorna a entrada não expirada sem contabilizar acesso"""
+        entry = self._cache.get(key)
+        if entry is None or entry.is_expired():
+            return None
+        return entry
+    
+    def last_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Retorna a entrada mesmo expirada (último valor conhecido, dentro de fallback_ttl)"""
+        entry = self._cache.get(key)
+        if entry is None or entry.is_expired(time.monotonic() - self._fallback_ttl):
+            return None
+        return entry
+    
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: int,
+        stale_ttl: int = 0,
+        tags: Sequence[str] = ()
+    ) -> None:
+        """Define um valor no cache, opcionalmente associado a tags (ex.: cidade, célula da grade)"""
         async with self._lock:
-            # Remove entradas mais antigas se o cache estiver cheio
-            if len(self._cache) >= self._max_size:
-                await self._evict_oldest()
+            # Remove entradas segundo a política se o cache estiver cheio
+            if key not in self._cache:
+                if len(self._cache) >= self._max_size:
+                    self._evict()
+                self._prefix_index.setdefault(key_prefix_of(key), set()).add(key)
+            self._index_tags(key, tuple(tags))
             
-            self._cache[key] = CacheEntry(value, ttl)
-            logger.debug(f"Cache set for key: {key}, TTL: {ttl}s")
+            entry = CacheEntry(value, ttl, stale_ttl)
+            self._cache[key] = entry
+            self._policy.record_insert(key, entry.expires_at)
+            heapq.heappush(self._expiry_heap, (entry.expires_at + self._fallback_ttl, next(self._seq), key, entry))
+            logger.debug(f"Cache set for key: {key}, TTL: {ttl}s, stale TTL: {stale_ttl}s")
+        
+        for listener in self._listeners:
+            try:
+                listener(key, value)
+            except Exception as e:
+                logger.error(f"Cache listener failed for key {key}: {e}")
+    
+    def add_listener(self, listener: Callable[[Hashable, Any], None]) -> None:
+        """Registra um callback chamado após cada gravação (deve ser rápido e síncrono)"""
+        self._listeners.append(listener)
     
-    async def delete(self, key: str) -> bool:
+    def remove_listener(self, listener: Callable[[Hashable, Any], None]) -> None:
+        """Remove um callback registrado"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    async def delete(self, key: Hashable) -> bool:
         """Remove uma entrada do cache"""
         async with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 logger.debug(f"Cache deleted for key: {key}")
                 return True
             return False
     
+    async def delete_many(self, keys: Iterable[Hashable], batch_size: int = 500) -> int:
+        """
+        Remove as chaves em lotes, liberando o lock e cedendo o loop entre eles
+        
+        Returns:
+            Número de entradas removidas
+        """
+        keys = list(keys)
+        removed = 0
+        for start in range(0, len(keys), batch_size):
+            async with self._lock:
+                for key in keys[start:start + batch_size]:
+                    if key in self._cache:
+                        self._remove(key)
+                        removed += 1
+            if start + batch_size < len(keys):
+                await asyncio.sleep(0)
+        return removed
+    
+    async def invalidate_prefix(self, prefix: Hashable) -> int:
+        """Remove todas as chaves com o prefixo (ex.: key_prefix de @cached)"""
+        return await self.delete_many(self._prefix_index.get(prefix, ()))
+    
+    async def invalidate_tag(self, tag: str) -> int:
+        """Remove todas as chaves associadas à tag"""
+        return await self.delete_many(self._tag_index.get(tag, ()))
+    
     async def clear(self) -> None:
         """Limpa todo o cache"""
         async with self._lock:
             self._cache.clear()
+            self._policy.clear()
+            self._expiry_heap.clear()
+            self._prefix_index.clear()
+            self._tag_index.clear()
+            self._key_tags.clear()
             logger.debug("Cache cleared")
     
-    async def _evict_oldest(self) -> None:
-        """Remove a entrada mais antiga do cache"""
-        if not self._cache:
+    def _index_tags(self, key: Hashable, tags: Tuple[str, ...]) -> None:
+        """Atualiza o índice de tags da chave (substitui as tags anteriores)"""
+        previous = self._key_tags.get(key, ())
+        if previous == tags:
+            return
+        self._unindex_tags(key, previous)
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+        else:
+            self._key_tags.pop(key, None)
+    
+    def _unindex_tags(self, key: Hashable, tags: Tuple[str, ...]) -> None:
+        for tag in tags:
+            members = self._tag_index.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tag_index[tag]
+    
+    def _remove(self, key: Hashable) -> None:
+        """Remove a chave do dicionário, dos índices e da política de remoção"""
+        del self._cache[key]
+        self._policy.record_remove(key)
+        prefix = key_prefix_of(key)
+        members = self._prefix_index.get(prefix)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self._prefix_index[prefix]
+        tags = self._key_tags.pop(key, None)
+        if tags:
+            self._unindex_tags(key, tags)
+    
+    def _evict(self) -> None:
+        """Remove a entrada escolhida pela política de remoção"""
+        victim = self._policy.select_victim()
+        if victim is None or victim not in self._cache:
             return
         
-        oldest_key = min(self._cache.keys(), 
-                        key=lambda k: self._cache[k].created_at)
-        del self._cache[oldest_key]
-        logger.debug(f"Evicted oldest cache entry: {oldest_key}")
+        self._remove(victim)
+        self.evictions += 1
+        CACHE_EVENTS.inc(str(key_prefix_of(victim)), "eviction")
+        logger.debug(f"Evicted cache entry ({self._policy.name}): {victim}")
+    
+    def sweep_expired(self, max_items: int = 1000) -> int:
+        """
+        Remove até max_items entradas expiradas em ordem de expiração
+        
+        Returns:
+            Número de entradas removidas
+        """
+        heap = self._expiry_heap
+        now = time.monotonic()
+        removed = 0
+        
+        while heap and removed < max_items and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            # Ignora itens do heap de entradas já substituídas ou removidas
+            if self._cache.get(key) is entry:
+                self._remove(key)
+                self.expirations += 1
+                CACHE_EVENTS.inc(str(key_prefix_of(key)), "expiration")
+                removed += 1
+        
+        # Compacta o heap quando acumula muitos itens mortos
+        if len(heap) > 2 * len(self._cache) + 1024:
+            self._expiry_heap = [item for item in heap if self._cache.get(item[2]) is item[3]]
+            heapq.heapify(self._expiry_heap)
+        
+        return removed
+    
+    async def _sweep_loop(self, interval: float, batch_size: int) -> None:
+        """Executa a varredura periodicamente, cedendo o loop entre lotes"""
+        while True:
+            await asyncio.sleep(interval)
+            total = 0
+            while True:
+                removed = self.sweep_expired(batch_size)
+                total += removed
+                if removed < batch_size:
+                    break
+                await asyncio.sleep(0)
+            if total:
+                logger.debug(f"Swept {total} expired cache entries")
+    
+    def start_sweeper(self, interval: float, batch_size: int = 1000) -> None:
+        """Inicia o varredor de entradas expiradas em segundo plano"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval, batch_size))
+    
+    async def stop_sweeper(self) -> None:
+        """Interrompe o varredor de entradas expiradas"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+    
+    def keys_page(
+        self,
+        cursor: int = 0,
+        limit: int = 100,
+        prefix: Optional[Hashable] = None,
+        tag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página de chaves, opcionalmente filtradas por prefixo ou tag
+        
+        O cursor é um deslocamento: com o cache mudando entre páginas,
+        chaves podem ser puladas ou repetidas (introspecção, não exportação).
+        """
+        if tag is not None:
+            source = self._tag_index.get(tag, ())
+        elif prefix is not None:
+            source = self._prefix_index.get(prefix, ())
+        else:
+            source = self._cache
+        total = len(source)
+        keys = [format_key(key) for key in itertools.islice(source, cursor, cursor + limit)]
+        next_cursor = cursor + len(keys)
+        return {
+            "total": total,
+            "keys": keys,
+            "next_cursor": next_cursor if next_cursor < total else None
+        }
+    
+    def _sample(self, count: int) -> Dict[Hashable, CacheEntry]:
+        """
+        Amostra aleatória de entradas sem copiar o dicionário
+        
+        Sorteia posições do heap de expiração (uma lista) e mantém apenas
+        itens ainda vigentes; pode retornar menos que count.
+        """
+        heap = self._expiry_heap
+        sample: Dict[Hashable, CacheEntry] = {}
+        for _ in range(min(count * 3, len(heap))):
+            _, _, key, entry = heap[random.randrange(len(heap))]
+            if self._cache.get(key) is entry:
+                sample[key] = entry
+                if len(sample) >= count:
+                    break
+        return sample
+    
+    def sample_keys(self, count: int = 20) -> List[str]:
+        """Amostra aleatória de chaves (formatadas)"""
+        return [format_key(key) for key in self._sample(count)]
+    
+    def memory_report(self, sample_size: int = 200) -> Dict[str, Any]:
+        """
+        Estimativa do consumo de memória por entrada, a partir de uma amostra
+        
+        Conta chave, CacheEntry e valor (percorrendo os objetos referenciados);
+        não inclui o dicionário, os índices nem as estruturas da política de
+        remoção (em torno de 200 a 500 bytes adicionais por entrada).
+        """
+        sample = self._sample(sample_size)
+        totals: Dict[str, List[int]] = {}
+        # Objetos compartilhados entre entradas (ex.: strings internadas) contam uma vez na amostra
+        seen: Set[int] = set()
+        for key, entry in sample.items():
+            value_bytes = deep_sizeof(entry.data, seen)
+            entry_bytes = deep_sizeof(key, seen) + deep_sizeof(entry, seen) + value_bytes
+            counts = totals.setdefault(str(key_prefix_of(key)), [0, 0, 0])
+            counts[0] += 1
+            counts[1] += entry_bytes
+            counts[2] += value_bytes
+        
+        sampled = sum(counts[0] for counts in totals.values())
+        bytes_per_entry = sum(counts[1] for counts in totals.values()) / sampled if sampled else 0.0
+        return {
+            "sampled": sampled,
+            "bytes_per_entry": round(bytes_per_entry),
+            "estimated_bytes": round(bytes_per_entry * len(self._cache)),
+            "by_prefix": {
+                prefix: {
+                    "sampled": count,
+                    "bytes_per_entry": round(entry_bytes / count),
+                    "value_bytes_per_entry": round(value_bytes / count)
+                }
+                for prefix, (count, entry_bytes, value_bytes) in totals.items()
+            }
+        }
     
     def get_stats(self) -> Dict[str, Any]:
-        """Retorna estatísticas do cache"""
+        """Retorna estatísticas do cache (sem listar chaves; ver keys_page e sample_keys)"""
         return {
             "size": len(self._cache),
             "max_size": self._max_size,
-            "keys": list(self._cache.keys())
+            "policy": self._policy.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "prefixes": {str(prefix): len(keys) for prefix, keys in self._prefix_index.items()},
+            "tags": len(self._tag_index)
         }
 
 
+async def _without_deadline(func: Callable[[], Awaitable[T]]) -> T:
+    """Executa func sem o prazo da requisição que a agendou"""
+    with deadline_scope(None):
+        return await func()
+
+
+class SingleFlight:
+    """Deduplica chamadas concorrentes para a mesma chave (request coalescing)"""
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        # Chamadores aguardando cada execução; sem nenhum, a execução é cancelada
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.coalesced = 0
+        self.background_refreshes = 0
+        self.abandoned = 0
+    
+    def is_in_flight(self, key: Hashable) -> bool:
+        """Verifica se já existe uma execução em andamento para a chave"""
+        return key in self._in_flight
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa func apenas uma vez por chave entre chamadas concorrentes
+        
+        A execução roda em uma task própria, sem o prazo de quem a iniciou:
+        cada chamador espera no máximo até o fim do seu próprio prazo. Se o
+        chamador que a iniciou for cancelado, os demais continuam aguardando o
+        mesmo resultado; quando o último desiste (cancelamento ou prazo
+        esgotado), a execução é cancelada.
+        """
+        check_deadline()
+        task = self.join(key, func)
+        try:
+            return await within_deadline(asyncio.shield(task))
+        finally:
+            self._leave(key, task)
+    
+    def join(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        """
+        Entra na execução da chave (iniciando-a com func se não houver) sem aguardá-la
+        
+        Cada join deve ser desfeito com _leave quando o chamador deixar de aguardar.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(_without_deadline(func))
+            self._in_flight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced call for key: {key}")
+        self._waiters[task] += 1
+        return task
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a execução concluída (sem descartar outra iniciada depois para a mesma chave)"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+    
+    def _leave(self, key: Hashable, task: asyncio.Task) -> None:
+        """Desfaz a espera de um chamador; o último a sair cancela a execução inacabada"""
+        waiters = self._waiters.get(task, 0) - 1
+        if waiters > 0:
+            self._waiters[task] = waiters
+            return
+        self._waiters.pop(task, None)
+        if not task.done():
+            # Libera a vaga e a conexão do upstream; a próxima chamada inicia uma nova execução
+            self._forget(key, task)
+            task.cancel()
+            self.abandoned += 1
+            logger.debug(f"Abandoned call for key: {key}")
+    
+    def refresh_in_background(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> None:
+        """Agenda uma atualização em segundo plano se nenhuma estiver em andamento"""
+        if key in self._in_flight:
+            return
+        
+        self.background_refreshes += 1
+        # A atualização não herda o prazo da requisição que a disparou
+        task = asyncio.ensure_future(_without_deadline(lambda: self.do(key, func)))
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+    
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        """Descarta a referência da task e registra falhas da atualização"""
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de deduplicação"""
+        return {
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "background_refreshes": self.background_refreshes,
+            "abandoned": self.abandoned
+        }
+
+
+class HitCounter:
+    """Contabiliza acertos e faltas de cache por rótulo (ex.: célula da grade)"""
+    
+    OVERFLOW_LABEL = "__other__"
+    
+    def __init__(self, max_labels: int = 1000):
+        self._counts: Dict[str, List[int]] = {}
+        self._max_labels = max_labels
+    
+    def record(self, label: str, hit: bool) -> None:
+        """Registra um acerto ou falta para o rótulo"""
+        counts = self._counts.get(label)
+        if counts is None:
+            # Rótulos além do limite são agregados para manter a memória limitada
+            if len(self._counts) >= self._max_labels:
+                label = self.OVERFLOW_LABEL
+            counts = self._counts.setdefault(label, [0, 0])
+        counts[0 if hit else 1] += 1
+    
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Retorna os rótulos mais acessados com suas taxas de acerto"""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1][0] + item[1][1], reverse=True)
+        return [
+            {
+                "bucket": label,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4)
+            }
+            for label, (hits, misses) in ranked[:limit]
+        ]
+    
+    def clear(self) -> None:
+        """Zera as contagens"""
+        self._counts.clear()
+
+
 # Instância global do cache
-cache = MemoryCache(max_size=settings.cache_max_size)
+cache = MemoryCache(
+    max_size=settings.cache_max_size,
+    policy=settings.cache_eviction_policy,
+    fallback_ttl=settings.cache_fallback_ttl
+)
 
+# Instância global de deduplicação de chamadas
+single_flight = SingleFlight()
 
-def cache_key_generator(*args, **kwargs) -> str:
-    """Gera uma chave de cache única baseada nos argumentos"""
-    # Serializa argumentos para JSON
-    key_data = {
-        "args": [str(arg) for arg in args],
-        "kwargs": {k: str(v) for k, v in kwargs.items()}
-    }
+registry.gauge("cache_entries", "Entradas no cache em memória", function=lambda: len(cache._cache))
+
+
+async def _store_from_persistent(
+    key: CacheKey,
+    value: Any,
+    stale_at: float,
+    expires_at: float,
+    tags: Sequence[str] = ()
+) -> None:
+    """Copia para o cache em memória um valor lido do segundo nível, preservando a validade"""
+    now = time.time()
+    ttl = max(stale_at - now, 0.0)
+    await cache.set(key, value, ttl, expires_at - max(stale_at, now), tags=tags)
+
+
+async def warm_start_cache(limit: int) -> int:
+    """
+    Pré-carrega no cache em memória as chaves mais acessadas do segundo nível
+    
+    Returns:
+        Número de entradas carregadas
+    """
+    if persistent_cache is None:
+        return 0
+    
+    entries = await persistent_cache.hot_entries(limit)
+    for key, value, stale_at, expires_at in entries:
+        await _store_from_persistent(key, value, stale_at, expires_at)
     
-    # Gera hash MD5 para criar chave única
-    key_json = json.dumps(key_data, sort_keys=True)
-    return hashlib.md5(key_json.encode()).hexdigest()
+    logger.info(f"Warm start loaded {len(entries)} cache entries from persistent cache")
+    return len(entries)
 
 
-def cached(ttl: Optional[int] = None, key_prefix: str = ""):
+def last_value(key: Hashable) -> Optional[Any]:
+    """Último valor conhecido da chave para quando o prazo da requisição se esgota (ignora cache negativo)"""
+    entry = cache.last_entry(key)
+    if entry is None or isinstance(entry.data, NegativeResult):
+        return None
+    REQUEST_DEADLINE_EVENTS.inc("stale_fallback")
+    return entry.data
+
+
+def _should_refresh_ahead(entry: CacheEntry) -> bool:
+    """Verifica se uma entrada quente está perto de expirar"""
+    return (
+        entry.hits >= settings.cache_refresh_ahead_min_hits
+        and entry.remaining_ratio() <= settings.cache_refresh_ahead_ratio
+    )
+
+
+def cached(
+    ttl: Optional[int] = None,
+    key_prefix: str = "",
+    stale_ttl: int = 0,
+    refresh_ahead: bool = False,
+    track_by: Optional[Callable[..., str]] = None,
+    negative_ttls: Optional[Dict[Type[BaseException], int]] = None,
+    key: Optional[Callable[..., Any]] = None,
+    key_args: Optional[Sequence[str]] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None
+):
     """
     Decorator para cache de funções assíncronas
     
     Args:
         ttl: Time to live em segundos. Se None, usa o TTL padrão
         key_prefix: Prefixo para a chave do cache
+        stale_ttl: Janela em segundos após o TTL em que o valor obsoleto é
+            servido imediatamente enquanto uma atualização roda em segundo plano
+        refresh_ahead: Atualiza chaves muito acessadas antes de expirarem
+        track_by: Função que recebe os mesmos argumentos e retorna um rótulo
+            para contabilizar acertos por grupo (disponível em wrapper.hit_counter)
+        negative_ttls: Exceções que também são armazenadas (cache negativo),
+            com o TTL em segundos de cada tipo. Nas leituras seguintes a
+            exceção é levantada novamente sem executar a função.
+        key: Função própria de chave; recebe os argumentos (sem self) e
+            retorna um valor ou tupla hashable
+        key_args: Nomes dos argumentos que compõem a chave (padrão: todos,
+            exceto self)
+        tags: Função que recebe os mesmos argumentos e retorna as tags da
+            entrada, para invalidação em grupo com invalidate_tag
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        # Usa TTL fornecido ou um padrão baseado no tipo de função
+        effective_ttl = ttl
+        if effective_ttl is None:
+            # TTL padrão baseado no nome da função
+            if "geocod" in func.__name__.lower():
+                effective_ttl = settings.cache_ttl_geocoding
+            elif "weather" in func.__name__.lower():
+                effective_ttl = settings.cache_ttl_weather
+            else:
+                effective_ttl = 300  # 5 minutos padrão
+        
+        make_key = key_builder(func, key_prefix, key, key_args)
+        
+        hit_counter = HitCounter(settings.cache_bucket_stats_max) if track_by is not None else None
+        
+        def make_tags(*args, **kwargs) -> Tuple[str, ...]:
+            return tuple(tags(*args, **kwargs)) if tags is not None else ()
+        
+        async def _store_negative(key: CacheKey, error: Exception, entry_tags: Tuple[str, ...]) -> Optional[int]:
+            """Armazena a falha como cache negativo; retorna o TTL usado (None se não armazenou)"""
+            if not negative_ttls:
+                return None
+            negative_ttl = next(
+                (seconds for error_type, seconds in negative_ttls.items() if isinstance(error, error_type)),
+                None
+            )
+            if not negative_ttl:
+                return None
+            # Uma falha na revalidação não substitui um valor válido ainda servível
+            existing = cache.peek_entry(key)
+            if existing is not None and not isinstance(existing.data, NegativeResult):
+                return None
+            await cache.set(key, NegativeResult(error), negative_ttl, tags=entry_tags)
+            return negative_ttl
+        
+        async def _store_shared(key: CacheKey, row: SharedRow, entry_tags: Tuple[str, ...]) -> Any:
+            """Copia para o cache em memória um valor gravado por outro worker"""
+            value = row[0]
+            if isinstance(value, NegativeResult):
+                existing = cache.peek_entry(key)
+                if existing is not None and not isinstance(existing.data, NegativeResult):
+                    return value
+            await _store_from_persistent(key, *row, tags=entry_tags)
+            return value
+        
+        async def _store(key: CacheKey, value: T, entry_tags: Tuple[str, ...]) -> None:
+            """Armazena o valor em todos os níveis de cache"""
+            await cache.set(key, value, effective_ttl, stale_ttl, tags=entry_tags)
+            if persistent_cache is not None:
+                persistent_cache.set(key, value, effective_ttl, stale_ttl)
+            if shared_cache is not None:
+                shared_cache.set(key, value, effective_ttl, stale_ttl, tags=entry_tags)
+        
+        def make_loader(key: CacheKey, args: tuple, kwargs: dict) -> Callable[..., Awaitable[T]]:
+            """Carregamento da chave em uma falta: níveis compartilhados e, por fim, a função"""
+            async def load(accept_stale: bool = True) -> T:
+                entry_tags = make_tags(*args, **kwargs)
+                # Com vários workers, apenas o que recebe a concessão da chave executa a função;
+                # os demais aguardam e recebem o valor gravado por ele
+                leased = False
+                if shared_cache is not None:
+                    row, leased = await shared_cache.acquire(key, accept_stale)
+                    if row is not None:
+                        value = await _store_shared(key, row, entry_tags)
+                        if isinstance(value, NegativeResult):
+                            value.reraise()
+                        return value
+                
+                # Consulta o segundo nível antes de executar a função
+                if persistent_cache is not None:
+                    row = await persistent_cache.get(key)
+                    # Revalidações só aceitam um valor mais novo gravado por outro worker
+                    if row is not None and (accept_stale or row[1] > time.time()):
+                        await _store_from_persistent(key, *row, tags=entry_tags)
+                        if leased:
+                            shared_cache.release(key)
+                        return row[0]
+                
+                # Executa a função e armazena no cache
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    negative_ttl = await _store_negative(key, e, entry_tags)
+                    if leased:
+                        if negative_ttl:
+                            shared_cache.set(key, NegativeResult(e), negative_ttl, tags=entry_tags)
+                        else:
+                            shared_cache.release(key)
+                    raise
+                except asyncio.CancelledError:
+                    if leased:
+                        shared_cache.release(key)
+                    raise
+                await _store(key, result, entry_tags)
+                return result
+            
+            return load
+        
+        async def lookup(key: CacheKey, load: Callable[..., Awaitable[T]], args: tuple, kwargs: dict) -> Optional[CacheEntry]:
+            """Consulta o cache em memória, agendando a revalidação de entradas obsoletas ou quentes"""
+            entry = await cache.get_entry(key)
+            if hit_counter is not None:
+                hit_counter.record(track_by(*args, **kwargs), entry is not None)
+            if entry is not None:
+                if entry.is_stale():
+                    # Stale-while-revalidate: serve o valor antigo e atualiza em segundo plano
+                    single_flight.refresh_in_background(key, lambda: load(accept_stale=False))
+                elif refresh_ahead and _should_refresh_ahead(entry):
+                    single_flight.refresh_in_background(key, lambda: load(accept_stale=False))
+            return entry
+        
         @wraps(func)
         async def wrapper(*args, **kwargs) -> T:
             # Verifica se o cache está habilitado
@@ -125,34 +796,269 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
                 return await func(*args, **kwargs)
             
             # Gera chave do cache
-            key_parts = [key_prefix, func.__name__]
-            key = ":".join(key_parts) + ":" + cache_key_generator(*args, **kwargs)
+            key = make_key(*args, **kwargs)
+            load = make_loader(key, args, kwargs)
             
             # Tenta obter do cache
-            cached_result = await cache.get(key)
-            if cached_result is not None:
-                return cached_result
+            entry = await lookup(key, load, args, kwargs)
+            if entry is not None:
+                if isinstance(entry.data, NegativeResult):
+                    entry.data.reraise()
+                return entry.data
+            
+            # Apenas uma chamada por chave vai ao upstream; as demais aguardam o resultado
+            try:
+                return await single_flight.do(key, load)
+            except DeadlineExceededException:
+                # Sem tempo para atualizar: o último valor conhecido é melhor que nenhum
+                fallback = last_value(key)
+                if fallback is None:
+                    raise
+                logger.info(f"Deadline exceeded, serving last known value for key: {format_key(key)}")
+                return fallback
+        
+        async def resolve_many(
+            calls: Dict[CacheKey, tuple],
+            fetch_many: Callable[[List[tuple]], Awaitable[List[T]]],
+            chunk_size: int
+        ) -> Dict[CacheKey, Union[T, BaseException]]:
+            """Faltas de cache_many: níveis compartilhados e, por fim, fetch_many em grupos"""
+            entry_tags = {key: make_tags(*call) for key, call in calls.items()}
+            results: Dict[CacheKey, Union[T, BaseException]] = {}
+            leased: Set[CacheKey] = set()
+            remaining = list(calls)
+            try:
+                # Com vários workers, cada chave é buscada apenas pelo que recebe a concessão
+                if shared_cache is not None:
+                    acquired = await asyncio.gather(*(shared_cache.acquire(key) for key in remaining))
+                    missing = []
+                    for key, (row, lease) in zip(remaining, acquired):
+                        if row is None:
+                            if lease:
+                                leased.add(key)
+                            missing.append(key)
+                            continue
+                        value = await _store_shared(key, row, entry_tags[key])
+                        if isinstance(value, NegativeResult):
+                            value = type(value.exception)(*value.exception.args)
+                        results[key] = value
+                    remaining = missing
+                
+                if persistent_cache is not None and remaining:
+                    rows = await asyncio.gather(*(persistent_cache.get(key) for key in remaining))
+                    missing = []
+                    for key, row in zip(remaining, rows):
+                        if row is None:
+                            missing.append(key)
+                            continue
+                        await _store_from_persistent(key, *row, tags=entry_tags[key])
+                        if key in leased:
+                            leased.discard(key)
+                            shared_cache.release(key)
+                        results[key] = row[0]
+                    remaining = missing
+                
+                async def fetch_chunk(chunk_keys: List[CacheKey]) -> None:
+                    try:
+                        values = await fetch_many([calls[key] for key in chunk_keys])
+                    except Exception as e:
+                        for key in chunk_keys:
+                            negative_ttl = await _store_negative(key, e, entry_tags[key])
+                            if key in leased:
+                                leased.discard(key)
+                                if negative_ttl:
+                                    shared_cache.set(key, NegativeResult(e), negative_ttl, tags=entry_tags[key])
+                                else:
+                                    shared_cache.release(key)
+                            results[key] = e
+                        return
+                    for key, value in zip(chunk_keys, values):
+                        # Gravar no cache compartilhado também devolve a concessão
+                        await _store(key, value, entry_tags[key])
+                        leased.discard(key)
+                        results[key] = value
+                
+                await asyncio.gather(*(
+                    fetch_chunk(remaining[start:start + chunk_size]) for start in range(0, len(remaining), chunk_size)
+                ))
+            finally:
+                # Cancelamento ou erro inesperado: as concessões restantes voltam para os demais workers
+                for key in leased:
+                    shared_cache.release(key)
+            return results
+        
+        async def cache_many(
+            calls: Sequence[tuple],
+            fetch_many: Callable[[List[tuple]], Awaitable[List[T]]],
+            chunk_size: int = 50
+        ) -> List[Union[T, BaseException]]:
+            """
+            Resolve várias chamadas de uma vez, com as mesmas regras de cache de uma chamada
+            
+            Acertos são servidos do cache (obsoletos com revalidação em segundo
+            plano, cache negativo levantando a exceção armazenada). Faltas com
+            execução em andamento aguardam por ela; as demais passam pelo cache
+            compartilhado (com concessão por chave) e pelo segundo nível, e só
+            as que seguirem faltando são buscadas em grupos de chunk_size por
+            fetch_many, que recebe os argumentos posicionais das chamadas e
+            retorna os valores na mesma ordem. Cada chave fica registrada no
+            single-flight durante a busca.
             
-            # Executa a função e armazena no cache
-            result = await func(*args, **kwargs)
+            Returns:
+                Para cada chamada, o valor ou a exceção correspondente
+            """
+            chunk_size = max(chunk_size, 1)
+            outcomes: List[Any] = [_MISSING] * len(calls)
             
-            # Usa TTL fornecido ou um padrão baseado no tipo de função
-            effective_ttl = ttl
-            if effective_ttl is None:
-                # TTL padrão baseado no nome da função
-                if "geocod" in func.__name__.lower():
-                    effective_ttl = settings.cache_ttl_geocoding
-                elif "weather" in func.__name__.lower():
-                    effective_ttl = settings.cache_ttl_weather
+            if not settings.cache_enabled:
+                async def fetch_direct(start: int) -> None:
+                    chunk = list(calls[start:start + chunk_size])
+                    try:
+                        outcomes[start:start + chunk_size] = await fetch_many(chunk)
+                    except Exception as e:
+                        outcomes[start:start + chunk_size] = [e] * len(chunk)
+                await asyncio.gather(*(fetch_direct(start) for start in range(0, len(calls), chunk_size)))
+                return outcomes
+            
+            keys = [make_key(*call) for call in calls]
+            loaders: Dict[CacheKey, Callable[..., Awaitable[T]]] = {}
+            misses: Dict[CacheKey, tuple] = {}
+            for index, (key, call) in enumerate(zip(keys, calls)):
+                if key in loaders:
+                    continue
+                loaders[key] = make_loader(key, call, {})
+                entry = await lookup(key, loaders[key], call, {})
+                if entry is None:
+                    misses[key] = call
+                elif isinstance(entry.data, NegativeResult):
+                    outcomes[index] = type(entry.data.exception)(*entry.data.exception.args)
                 else:
-                    effective_ttl = 300  # 5 minutos padrão
+                    outcomes[index] = entry.data
+            
+            # Chaves sem execução em andamento são resolvidas juntas; cada uma entra no single-flight
+            # antes de qualquer await, para que chamadas concorrentes aguardem a mesma busca
+            pending = {key: misses[key] for key in misses if not single_flight.is_in_flight(key)}
+            tasks: Dict[CacheKey, asyncio.Task] = {}
+            if pending:
+                with deadline_scope(None):
+                    resolving = asyncio.ensure_future(resolve_many(pending, fetch_many, chunk_size))
+                waiting = [len(pending)]
+                
+                def from_batch(key: CacheKey):
+                    async def load_one() -> T:
+                        try:
+                            resolved = await asyncio.shield(resolving)
+                        except asyncio.CancelledError:
+                            # Sem ninguém aguardando nenhuma das chaves, a resolução é cancelada
+                            waiting[0] -= 1
+                            if waiting[0] == 0:
+                                resolving.cancel()
+                            raise
+                        outcome = resolved[key]
+                        if isinstance(outcome, BaseException):
+                            raise outcome
+                        return outcome
+                    return load_one
+                
+                for key in pending:
+                    tasks[key] = single_flight.join(key, from_batch(key))
+            for key in misses:
+                if key not in tasks:
+                    tasks[key] = single_flight.join(key, loaders[key])
             
-            await cache.set(key, result, effective_ttl)
-            return result
+            results: Dict[CacheKey, Union[T, BaseException]] = {}
+            try:
+                if tasks:
+                    done = await within_deadline(asyncio.gather(
+                        *(asyncio.shield(task) for task in tasks.values()), return_exceptions=True
+                    ))
+                    results.update(zip(tasks, done))
+            except DeadlineExceededException as e:
+                # Sem tempo para atualizar: o último valor conhecido de cada chave, se houver
+                for key in tasks:
+                    fallback = last_value(key)
+                    results[key] = e if fallback is None else fallback
+            finally:
+                for key, task in tasks.items():
+                    single_flight._leave(key, task)
+            
+            first_index: Dict[CacheKey, int] = {}
+            for index, key in enumerate(keys):
+                first_index.setdefault(key, index)
+            for index, key in enumerate(keys):
+                if outcomes[index] is _MISSING:
+                    # Chave repetida servida do cache: mesmo resultado da primeira ocorrência
+                    outcomes[index] = results[key] if key in results else outcomes[first_index[key]]
+            return outcomes
+        
+        async def cache_peek(*args, **kwargs) -> Optional[T]:
+            """Retorna o valor em cache (inclusive obsoleto) sem executar a função"""
+            if not settings.cache_enabled:
+                return None
+            entry = await cache.get_entry(make_key(*args, **kwargs))
+            if hit_counter is not None:
+                hit_counter.record(track_by(*args, **kwargs), entry is not None)
+            if entry is None or isinstance(entry.data, NegativeResult):
+                return None
+            return entry.data
+        
+        def cache_fallback(*args, **kwargs) -> Optional[T]:
+            """Retorna o último valor conhecido (inclusive expirado, dentro de fallback_ttl)"""
+            if not settings.cache_enabled:
+                return None
+            return last_value(make_key(*args, **kwargs))
+        
+        async def cache_store(value: T, *args, **kwargs) -> None:
+            """Armazena um valor obtido por fora (ex.: chamada em lote) sob a chave da função"""
+            if settings.cache_enabled:
+                key = make_key(*args, **kwargs)
+                entry_tags = make_tags(*args, **kwargs)
+                await cache.set(key, value, effective_ttl, stale_ttl, tags=entry_tags)
+                if persistent_cache is not None:
+                    persistent_cache.set(key, value, effective_ttl, stale_ttl)
+                if shared_cache is not None:
+                    shared_cache.set(key, value, effective_ttl, stale_ttl, tags=entry_tags)
+        
+        async def cache_pull(calls: Sequence[tuple], fresh_for: float = 0.0) -> List[bool]:
+            """
+            Copia do cache compartilhado os valores que outro worker já buscou
+            
+            Args:
+                calls: Argumentos posicionais de cada chamada (como em cache_store)
+                fresh_for: Segundos mínimos de validade restante para aceitar o valor
+            
+            Returns:
+                Para cada chamada, se o valor foi copiado para o cache em memória
+            """
+            if not settings.cache_enabled or shared_cache is None or not calls:
+                return [False] * len(calls)
+            rows = await shared_cache.get_many([make_key(*call) for call in calls])
+            min_stale_at = time.time() + fresh_for
+            pulled = []
+            for call, row in zip(calls, rows):
+                accepted = row is not None and row[1] >= min_stale_at and not isinstance(row[0], NegativeResult)
+                if accepted:
+                    await _store_shared(make_key(*call), row, make_tags(*call))
+                pulled.append(accepted)
+            return pulled
+        
+        async def invalidate_cache(*args, **kwargs) -> bool:
+            """Remove a entrada da chamada (também do cache compartilhado)"""
+            key = make_key(*args, **kwargs)
+            if shared_cache is not None:
+                shared_cache.delete_many((key,))
+            return await cache.delete(key)
         
         # Adiciona métodos de controle de cache à função decorada
-        wrapper.cache_key = lambda *args, **kwargs: ":".join([key_prefix, func.__name__]) + ":" + cache_key_generator(*args, **kwargs)
-        wrapper.invalidate_cache = lambda *args, **kwargs: cache.delete(wrapper.cache_key(*args, **kwargs))
+        wrapper.cache_key = make_key
+        wrapper.cache_tags = make_tags
+        wrapper.cache_peek = cache_peek
+        wrapper.cache_fallback = cache_fallback
+        wrapper.cache_store = cache_store
+        wrapper.cache_pull = cache_pull
+        wrapper.cache_many = cache_many
+        wrapper.hit_counter = hit_counter
+        wrapper.invalidate_cache = invalidate_cache
         wrapper.clear_cache = lambda: cache.clear()
         wrapper.cache_stats = lambda: cache.get_stats()
         
@@ -162,34 +1068,82 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
 
 
 # Funções utilitárias para controle do cache
-async def invalidate_pattern(pattern: str) -> int:
+async def invalidate_prefix(prefix: Hashable) -> int:
+    """
+    Invalida todas as entradas de um key_prefix (ex.: "weather")
+    
+    Returns:
+        Número de entradas removidas
+    """
+    removed_count = await cache.invalidate_prefix(prefix)
+    if shared_cache is not None:
+        shared_cache.invalidate_prefix(prefix)
+    logger.info(f"Invalidated {removed_count} cache entries with prefix: {prefix}")
+    return removed_count
+
+
+async def invalidate_tag(tag: str) -> int:
+    """
+    Invalida todas as entradas associadas a uma tag (ex.: "cell:-21.15,-47.85")
+    
+    Returns:
+        Número de entradas removidas
+    """
+    removed_count = await cache.invalidate_tag(tag)
+    if shared_cache is not None:
+        shared_cache.invalidate_tag(tag)
+    logger.info(f"Invalidated {removed_count} cache entries with tag: {tag}")
+    return removed_count
+
+
+async def invalidate_pattern(pattern: Union[str, CacheKey], batch_size: int = 1000) -> int:
     """
     Invalida todas as entradas do cache que correspondem a um padrão
     
+    Prefixos em forma de tupla usam o índice de prefixos; substrings exigem
+    percorrer as chaves, o que é feito em lotes cedendo o loop entre eles.
+    
     Args:
-        pattern: Padrão para buscar nas chaves (pode ser substring)
+        pattern: Prefixo da chave em forma de tupla (ex.: ("weather",)) ou
+            substring procurada na chave formatada como "prefixo:função:arg1:..."
     
     Returns:
         Número de entradas removidas
     """
-    stats = cache.get_stats()
-    removed_count = 0
-    
-    for key in stats["keys"]:
-        if pattern in key:
-            if await cache.delete(key):
-                removed_count += 1
+    if isinstance(pattern, tuple):
+        if not pattern:
+            return 0
+        candidates = list(cache._prefix_index.get(pattern[0], ()))
+        matches = [key for key in candidates if key[:len(pattern)] == pattern]
+    else:
+        snapshot = list(cache._cache)
+        matches = []
+        for start in range(0, len(snapshot), batch_size):
+            matches.extend(key for key in snapshot[start:start + batch_size] if pattern in format_key(key))
+            await asyncio.sleep(0)
     
+    removed_count = await cache.delete_many(matches)
+    if shared_cache is not None:
+        if isinstance(pattern, tuple) and len(pattern) == 1:
+            shared_cache.invalidate_prefix(pattern[0])
+        else:
+            # Substrings só alcançam no servidor as chaves que este worker conhece
+            shared_cache.delete_many(matches)
     logger.info(f"Invalidated {removed_count} cache entries matching pattern: {pattern}")
     return removed_count
 
 
-async def get_cache_info() -> Dict[str, Any]:
-    """Retorna informações detalhadas sobre o cache"""
+async def get_cache_info(sample_size: int = 20) -> Dict[str, Any]:
+    """Retorna informações detalhadas sobre o cache, com uma amostra de chaves"""
     stats = cache.get_stats()
+    stats["sample_keys"] = cache.sample_keys(sample_size)
+    stats["memory"] = cache.memory_report(settings.cache_memory_sample_size)
     
     # Adiciona informações de configuração
     stats.update({
+        "single_flight": single_flight.get_stats(),
+        "persistent": persistent_cache.get_stats() if persistent_cache is not None else {"enabled": False},
+        "shared": await shared_cache.get_stats() if shared_cache is not None else {"enabled": False},
         "enabled": settings.cache_enabled,
         "ttl_geocoding": settings.cache_ttl_geocoding,
         "ttl_weather": settings.cache_ttl_weather,
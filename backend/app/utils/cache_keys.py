@@ -0,0 +1,95 @@
+import ast
+import inspect
+from typing import Any, Callable, Hashable, Optional, Sequence, Tuple
+
+# Chave de cache: (prefixo, nome da função, *argumentos relevantes)
+CacheKey = Tuple[Hashable, ...]
+
+
+_EMPTY = inspect.Parameter.empty
+
+
+def format_key(key: Hashable) -> str:
+    """Forma legível da chave ("weather:get_weather_at:-21.2:-47.8")"""
+    if isinstance(key, tuple):
+        return ":".join(str(part) for part in key)
+    return str(key)
+
+
+def encode_key(key: Hashable) -> str:
+    """Serializa a chave como texto (armazenamento persistente)"""
+    return repr(key)
+
+
+def decode_key(text: str) -> Optional[Hashable]:
+    """Converte o texto de encode_key de volta na chave (None se não reconhecido)"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def key_builder(
+    func: Callable,
+    key_prefix: str,
+    key: Optional[Callable[..., Any]] = None,
+    key_args: Optional[Sequence[str]] = None
+) -> Callable[..., CacheKey]:
+    """
+    Cria a função que monta a chave de cache (tupla) de func
+    
+    A chave é (key_prefix, nome da função, *valores). O primeiro parâmetro é
+    ignorado quando se chama self ou cls. Por padrão entram todos os demais
+    argumentos; key_args restringe a chave aos argumentos nomeados e key
+    substitui a montagem por uma função própria (recebe os argumentos sem self).
+    """
+    signature = inspect.signature(func)
+    params = list(signature.parameters)
+    skip = 1 if params and params[0] in ("self", "cls") else 0
+    names = params[skip:]
+    # Caminho rápido só vale para parâmetros simples (sem *args/**kwargs/keyword-only)
+    simple = all(
+        parameter.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD
+        for parameter in list(signature.parameters.values())[skip:]
+    )
+    defaults = tuple(signature.parameters[name].default for name in names)
+    required = sum(1 for value in defaults if value is _EMPTY)
+    index_of = {name: i for i, name in enumerate(names)}
+    
+    if key_args is not None:
+        unknown = set(key_args) - set(names)
+        if unknown:
+            raise ValueError(f"key_args desconhecidos em {func.__name__}: {', '.join(sorted(unknown))}")
+    selected = tuple(key_args) if key_args is not None else tuple(names)
+    positions = tuple(index_of[name] for name in selected)
+    head = (key_prefix, func.__name__)
+    
+    if key is not None:
+        def make_custom_key(*args, **kwargs) -> CacheKey:
+            value = key(*args[skip:], **kwargs)
+            return head + (value if isinstance(value, tuple) else (value,))
+        return make_custom_key
+    
+    def make_key(*args, **kwargs) -> CacheKey:
+        # Caminho rápido: completa com nomeados e padrões sem resolver a assinatura
+        given = len(args) - skip
+        values = None
+        if simple and given <= len(names):
+            if not kwargs:
+                if given >= required:
+                    values = args[skip:] + defaults[given:]
+            elif all(index_of.get(name, -1) >= given for name in kwargs):
+                values = args[skip:] + tuple(kwargs.get(name, defaults[i]) for i, name in enumerate(names[given:], given))
+                if any(value is _EMPTY for value in values):
+                    values = None
+        if values is not None:
+            if key_args is None:
+                return head + values
+            return head + tuple(values[i] for i in positions)
+        # Argumentos inválidos ou assinatura com *args/**kwargs: bind resolve (ou levanta TypeError)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        return head + tuple(arguments[name] for name in selected)
+    
+    return make_key
@@ -0,0 +1,221 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from ..config import settings
+from .cache import MemoryCache
+from .shared_cache import NO_REPLY, read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+# (valor serializado, stale_at, expires_at) com tempos em epoch
+RawRow = Tuple[bytes, float, float]
+
+
+class _Connection:
+    """Estado de um worker conectado"""
+
+    __slots__ = ("id", "leases")
+
+    def __init__(self, connection_id: int):
+        self.id = connection_id
+        self.leases: Set[Hashable] = set()
+
+
+class CacheServer:
+    """
+    Servidor de cache compartilhado pelos workers (processo próprio, socket Unix)
+
+    As linhas ficam em um MemoryCache com a política de remoção configurada,
+    sem desserializar os valores. Cada chave tem no máximo uma concessão de
+    atualização por vez; os demais workers aguardam a gravação do valor.
+    Concessões vencem após o TTL informado (worker travado) e são devolvidas
+    quando a conexão do worker cai.
+    """
+
+    def __init__(self, path: str, max_size: int, policy: str = "lru"):
+        self._path = path
+        self._store = MemoryCache(max_size=max_size, policy=policy)
+        # Concessões: chave -> (conexão, validade no relógio monotônico)
+        self._leases: Dict[Hashable, Tuple[int, float]] = {}
+        # Eventos disparados quando a chave é gravada ou a concessão devolvida
+        self._changed: Dict[Hashable, asyncio.Event] = {}
+        self._ids = itertools.count(1)
+        self.connections = 0
+        self.leases_granted = 0
+        self.lease_expirations = 0
+        self.waits = 0
+
+    def _notify(self, key: Hashable) -> None:
+        event = self._changed.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _try_lease(self, conn: _Connection, key: Hashable, ttl: float) -> bool:
+        now = time.monotonic()
+        holder = self._leases.get(key)
+        if holder is not None and holder[0] != conn.id:
+            if holder[1] > now:
+                return False
+            self.lease_expirations += 1
+            logger.warning(f"Lease of connection {holder[0]} expired for key: {key}")
+        self._leases[key] = (conn.id, now + ttl)
+        conn.leases.add(key)
+        self.leases_granted += 1
+        return True
+
+    def _release(self, key: Hashable, conn: Optional[_Connection] = None) -> None:
+        """Devolve a concessão (de qualquer conexão quando conn é None) e acorda quem aguarda"""
+        holder = self._leases.get(key)
+        if holder is not None and (conn is None or holder[0] == conn.id):
+            del self._leases[key]
+        if conn is not None:
+            conn.leases.discard(key)
+        self._notify(key)
+
+    async def _get(self, key: Hashable) -> Optional[RawRow]:
+        entry = await self._store.get_entry(key)
+        return entry.data if entry is not None else None
+
+    async def _acquire(
+        self,
+        conn: _Connection,
+        key: Hashable,
+        min_stale_at: float,
+        lease_ttl: float,
+        wait_timeout: float,
+        with_value: bool = True
+    ) -> Tuple[str, Optional[RawRow], bool]:
+        """Valor aceitável, concessão ou, esgotado wait_timeout, nenhum dos dois"""
+        deadline = time.monotonic() + wait_timeout
+        waited = False
+        while True:
+            if with_value:
+                row = await self._get(key)
+                if row is not None and row[1] > min_stale_at:
+                    return "value", row, waited
+            if self._try_lease(conn, key, lease_ttl):
+                return "lease", None, waited
+
+            now = time.monotonic()
+            if now >= deadline:
+                return "timeout", None, waited
+            if not waited:
+                waited = True
+                self.waits += 1
+            # Acorda na gravação, na devolução ou no vencimento da concessão atual
+            timeout = min(deadline, self._leases[key][1]) - now
+            event = self._changed.setdefault(key, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), max(timeout, 0.001))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch(self, conn: _Connection, op: str, args: tuple) -> Any:
+        if op == "get":
+            return await self._get(args[0])
+        if op == "get_many":
+            return [await self._get(key) for key in args[0]]
+        if op == "acquire":
+            return await self._acquire(conn, *args)
+        if op == "lock":
+            key, ttl, wait_timeout = args
+            return await self._acquire(conn, key, float("inf"), ttl, wait_timeout, with_value=False)
+        if op == "set":
+            key, payload, stale_at, expires_at, tags = args
+            await self._store.set(key, (payload, stale_at, expires_at), max(expires_at - time.time(), 0.0), tags=tags)
+            self._release(key)
+            return None
+        if op == "release":
+            self._release(args[0], conn)
+            return None
+        if op == "delete_many":
+            return await self._store.delete_many(args[0])
+        if op == "invalidate_prefix":
+            return await self._store.invalidate_prefix(args[0])
+        if op == "invalidate_tag":
+            return await self._store.invalidate_tag(args[0])
+        if op == "stats":
+            return self.get_stats()
+        raise ValueError(f"Operação desconhecida: {op}")
+
+    async def _reply(self, writer: asyncio.StreamWriter, request_id: int, conn: _Connection, op: str, args: tuple) -> None:
+        try:
+            result = await self._dispatch(conn, op, args)
+        except Exception as e:
+            logger.error(f"Shared cache operation {op} failed: {e}")
+            result = None
+        if request_id != NO_REPLY and not writer.is_closing():
+            write_frame(writer, (request_id, result))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende um worker até a conexão cair"""
+        conn = _Connection(next(self._ids))
+        self.connections += 1
+        waiting: Set[asyncio.Task] = set()
+        try:
+            while True:
+                request_id, op, args = await read_frame(reader)
+                if op in ("acquire", "lock"):
+                    # Podem aguardar outro worker: não bloqueiam as demais operações da conexão
+                    task = asyncio.create_task(self._reply(writer, request_id, conn, op, args))
+                    waiting.add(task)
+                    task.add_done_callback(waiting.discard)
+                    continue
+                await self._reply(writer, request_id, conn, op, args)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self.connections -= 1
+            for task in waiting:
+                task.cancel()
+            for key in list(conn.leases):
+                self._release(key, conn)
+            writer.close()
+
+    async def serve(self) -> None:
+        """Atende no socket Unix até o processo ser encerrado"""
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        # O socket já nasce acessível apenas ao usuário do processo: o launcher
+        # o considera pronto assim que o caminho existe
+        previous_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self._path)
+        finally:
+            os.umask(previous_umask)
+        self._store.start_sweeper(settings.cache_sweep_interval)
+        logger.info(f"Shared cache server listening on {self._path} (max_size={self._store._max_size})")
+        async with server:
+            await server.serve_forever()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do servidor"""
+        stats = self._store.get_stats()
+        return {
+            "entries": stats["size"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "connections": self.connections,
+            "active_leases": len(self._leases),
+            "leases_granted": self.leases_granted,
+            "lease_expirations": self.lease_expirations,
+            "waits": self.waits
+        }
+
+
+def run_cache_server(path: str, max_size: int, policy: str = "lru") -> None:
+    """Ponto de entrada do processo do servidor de cache (iniciado por app.launcher)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    try:
+        asyncio.run(CacheServer(path, max_size, policy).serve())
+    except KeyboardInterrupt:
+        pass
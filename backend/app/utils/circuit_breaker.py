@@ -0,0 +1,80 @@
+import logging
+import time
+from typing import Any, Dict
+
+from .exceptions import UpstreamRejectedException
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples para uma API externa
+
+    Após failure_threshold falhas consecutivas o circuito abre e as chamadas
+    falham imediatamente por recovery_timeout segundos. Em seguida uma única
+    chamada de teste é liberada (meio-aberto): sucesso fecha o circuito,
+    falha o reabre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """Levanta UpstreamRejectedException se o circuito não permitir a chamada"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+
+        self.rejected += 1
+        raise UpstreamRejectedException(f"Erro na API de {self.name}: circuito aberto após falhas consecutivas")
+
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida"""
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Registra uma falha de chamada"""
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(f"Circuit breaker '{self.name}' opened after {self._failures} failures")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """Libera a chamada de teste quando ela é cancelada sem resultado"""
+        self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna o estado atual do circuito"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from .exceptions import DeadlineExceededException
+from .metrics import REQUEST_DEADLINE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class Deadline:
+    """Prazo absoluto de uma requisição, no relógio monotônico"""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Segundos restantes (0.0 quando vencido)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Verifica se o prazo já venceu"""
+        return time.monotonic() >= self.expires_at
+
+
+# Prazo da requisição em andamento; tarefas criadas durante a requisição herdam o valor
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Prazo do contexto atual (None fora de requisições, ex.: pré-aquecimento)"""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Define o prazo do contexto atual (None remove o prazo) e restaura o anterior na saída"""
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def time_left() -> float:
+    """Segundos restantes do prazo atual (infinito sem prazo)"""
+    deadline = _current.get()
+    return math.inf if deadline is None else deadline.remaining()
+
+
+def check_deadline() -> None:
+    """Levanta DeadlineExceededException se o prazo atual já venceu"""
+    deadline = _current.get()
+    if deadline is not None and deadline.expired():
+        REQUEST_DEADLINE_EVENTS.inc("exceeded")
+        raise DeadlineExceededException("Prazo da requisição esgotado")
+
+
+def budget(timeout: float) -> float:
+    """Timeout de uma etapa limitado ao que resta do prazo (levanta a exceção se já venceu)"""
+    check_deadline()
+    return min(timeout, time_left())
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Aguarda awaitable no máximo até o fim do prazo atual
+
+    Ao vencer o prazo a espera é cancelada (junto com a chamada ao upstream
+    que estiver em andamento) e DeadlineExceededException é levantada.
+    """
+    remaining = time_left()
+    if remaining == math.inf:
+        return await awaitable
+    try:
+        async with asyncio.timeout(remaining) as scope:
+            return await awaitable
+    except TimeoutError:
+        if not scope.expired():
+            raise
+        REQUEST_DEADLINE_EVENTS.inc("exceeded")
+        raise DeadlineExceededException("Prazo da requisição esgotado")
+
+
+class RequestDeadlineMiddleware:
+    """
+    Middleware ASGI que define o prazo da requisição e a cancela se o cliente desconectar
+
+    O prazo (budget segundos, 0 desativa) vale para toda a requisição: cada
+    chamada ao upstream usa apenas o que resta dele. A aplicação roda na
+    própria tarefa da requisição; apenas requisições que ainda não responderam
+    após watch_after segundos (em geral, esperando o upstream) ganham uma
+    tarefa que lê as mensagens do cliente. Uma desconexão antes do início da
+    resposta cancela o processamento e as chamadas ao upstream em andamento,
+    liberando as conexões. Respostas em streaming tratam a desconexão por conta
+    própria (a mensagem é repassada normalmente).
+    """
+
+    def __init__(self, app, budget: float = 0.0, watch_after: float = 0.05):
+        self.app = app
+        self.budget = budget
+        self.watch_after = watch_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        messages: Optional[asyncio.Queue] = None
+        listener: Optional[asyncio.Task] = None
+        timer: Optional[asyncio.TimerHandle] = None
+        reading = 0
+        response_started = False
+        finished = False
+        disconnected = False
+
+        async def receive_wrapper():
+            nonlocal reading
+            if messages is None:
+                # Sem o leitor, a aplicação lê direto do servidor
+                reading += 1
+                try:
+                    return await receive()
+                finally:
+                    reading -= 1
+            message = await messages.get()
+            if message["type"] == "http.disconnect":
+                # Leituras seguintes também recebem a desconexão
+                messages.put_nowait(message)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def listen() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    if not response_started and not finished:
+                        disconnected = True
+                        task.cancel()
+                    return
+
+        def watch() -> None:
+            nonlocal messages, listener, timer
+            if finished or response_started:
+                return
+            if reading:
+                # A aplicação está lendo o corpo: tenta de novo depois
+                timer = loop.call_later(self.watch_after, watch)
+                return
+            messages = asyncio.Queue()
+            with deadline_scope(None):
+                listener = loop.create_task(listen())
+
+        if task is not None:
+            timer = loop.call_later(self.watch_after, watch)
+        try:
+            with deadline_scope(Deadline(self.budget) if self.budget > 0 else None):
+                await self.app(scope, receive_wrapper, send_wrapper)
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            REQUEST_DEADLINE_EVENTS.inc("client_disconnect")
+            logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+        finally:
+            finished = True
+            if timer is not None:
+                timer.cancel()
+            if listener is not None:
+                listener.cancel()
+            # O cancelamento pedido pelo leitor nunca chega ao servidor, mesmo
+            # que a aplicação o tenha engolido ou já estivesse terminando
+            if disconnected and task.cancelling():
+                task.uncancel()
@@ -0,0 +1,182 @@
+import heapq
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class EvictionPolicy(ABC):
+    """Interface das políticas de remoção usadas pelo MemoryCache"""
+
+    name = "base"
+
+    @abstractmethod
+    def record_insert(self, key: Hashable, expires_at: float) -> None:
+        """Registra a inserção (ou substituição) de uma chave"""
+
+    @abstractmethod
+    def record_access(self, key: Hashable) -> None:
+        """Registra a leitura de uma chave"""
+
+    @abstractmethod
+    def record_remove(self, key: Hashable) -> None:
+        """Registra a remoção de uma chave"""
+
+    @abstractmethod
+    def select_victim(self) -> Optional[Hashable]:
+        """Retorna a próxima chave a ser removida, sem removê-la"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Descarta todo o estado da política"""
+
+
+class LRUPolicy(EvictionPolicy):
+    """Remove a chave acessada há mais tempo (O(1) com OrderedDict)"""
+
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def record_insert(self, key: Hashable, expires_at: float) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def record_access(self, key: Hashable) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def record_remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def select_victim(self) -> Optional[Hashable]:
+        return next(iter(self._order), None)
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFUPolicy(EvictionPolicy):
+    """Remove a chave menos acessada (O(1) com buckets de frequência)
+
+    Empates dentro da mesma frequência são resolvidos por LRU.
+    """
+
+    name = "lfu"
+
+    def __init__(self):
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_freq = 0
+
+    def _bucket(self, freq: int) -> "OrderedDict[Hashable, None]":
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+        return bucket
+
+    def _unlink(self, key: Hashable, freq: int) -> None:
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+
+    def record_insert(self, key: Hashable, expires_at: float) -> None:
+        # Substituir um valor preserva a frequência acumulada da chave
+        if key in self._freq:
+            self.record_access(key)
+            return
+        self._freq[key] = 1
+        self._bucket(1)[key] = None
+        self._min_freq = 1
+
+    def record_access(self, key: Hashable) -> None:
+        freq = self._freq.get(key)
+        if freq is None:
+            return
+        self._unlink(key, freq)
+        self._freq[key] = freq + 1
+        self._bucket(freq + 1)[key] = None
+
+    def record_remove(self, key: Hashable) -> None:
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        self._unlink(key, freq)
+        if not self._freq:
+            self._min_freq = 0
+
+    def select_victim(self) -> Optional[Hashable]:
+        if not self._freq:
+            return None
+        bucket = self._buckets.get(self._min_freq)
+        if bucket is None:
+            # min_freq só fica desatualizado após remoções arbitrárias
+            self._min_freq = min(self._buckets)
+            bucket = self._buckets[self._min_freq]
+        return next(iter(bucket))
+
+    def clear(self) -> None:
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+
+class TTLPolicy(EvictionPolicy):
+    """Remove a chave que expira primeiro (heap com remoção preguiçosa, O(log n))"""
+
+    name = "ttl"
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._live: Dict[Hashable, int] = {}
+        self._seq = 0
+
+    def record_insert(self, key: Hashable, expires_at: float) -> None:
+        self._seq += 1
+        self._live[key] = self._seq
+        heapq.heappush(self._heap, (expires_at, self._seq, key))
+        self._compact_if_needed()
+
+    def record_access(self, key: Hashable) -> None:
+        pass
+
+    def record_remove(self, key: Hashable) -> None:
+        self._live.pop(key, None)
+        self._compact_if_needed()
+
+    def select_victim(self) -> Optional[Hashable]:
+        heap = self._heap
+        while heap:
+            _, seq, key = heap[0]
+            if self._live.get(key) == seq:
+                return key
+            heapq.heappop(heap)
+        return None
+
+    def _compact_if_needed(self) -> None:
+        """Reconstrói o heap quando há muitas entradas mortas acumuladas"""
+        if len(self._heap) > 2 * len(self._live) + 1024:
+            self._heap = [item for item in self._heap if self._live.get(item[2]) == item[1]]
+            heapq.heapify(self._heap)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._live.clear()
+
+
+POLICIES = {
+    LRUPolicy.name: LRUPolicy,
+    LFUPolicy.name: LFUPolicy,
+    TTLPolicy.name: TTLPolicy
+}
+
+
+def create_policy(name: str) -> EvictionPolicy:
+    """Cria a política de remoção pelo nome ("lru", "lfu" ou "ttl")"""
+    try:
+        return POLICIES[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Política de remoção desconhecida: {name}. Use uma de: {', '.join(POLICIES)}")
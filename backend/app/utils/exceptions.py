@@ -21,11 +21,28 @@ class ExternalAPIException(WeatherAPIException):
     pass
 
 
+class UpstreamRejectedException(ExternalAPIException):
+    """Exceção quando a chamada é recusada antes de chegar ao upstream (fila ou circuito aberto)"""
+    pass
+
+
+class DeadlineExceededException(WeatherAPIException):
+    """Exceção quando o prazo total da requisição se esgota"""
+    pass
+
+
+CITY_NOT_FOUND_DETAIL = "Cidade não encontrada. Verifique o nome e tente novamente."
+WEATHER_DATA_UNAVAILABLE_DETAIL = "Dados climáticos temporariamente indisponíveis. Tente novamente mais tarde."
+EXTERNAL_API_ERROR_DETAIL = "Erro ao consultar serviço de clima. Tente novamente mais tarde."
+DEADLINE_EXCEEDED_DETAIL = "Tempo limite da requisição excedido. Tente novamente."
+INTERNAL_ERROR_DETAIL = "Erro interno ao processar solicitação. Tente novamente."
+
+
 def handle_city_not_found():
     """Lança exceção HTTP para cidade não encontrada"""
     raise HTTPException(
         status_code=404,
-        detail="Cidade não encontrada. Verifique o nome e tente novamente."
+        detail=CITY_NOT_FOUND_DETAIL
     )
 
 
@@ -33,7 +50,7 @@ def handle_weather_data_unavailable():
     """Lança exceção HTTP para dados indisponíveis"""
     raise HTTPException(
         status_code=503,
-        detail="Dados climáticos temporariamente indisponíveis. Tente novamente mais tarde."
+        detail=WEATHER_DATA_UNAVAILABLE_DETAIL
     )
 
 
@@ -41,5 +58,26 @@ def handle_external_api_error():
     """Lança exceção HTTP para erro em API externa"""
     raise HTTPException(
         status_code=502,
-        detail="Erro ao consultar serviço de clima. Tente novamente mais tarde."
-    )
\ No newline at end of file
+        detail=EXTERNAL_API_ERROR_DETAIL
+    )
+
+
+def handle_deadline_exceeded():
+    """Lança exceção HTTP para prazo da requisição esgotado"""
+    raise HTTPException(
+        status_code=504,
+        detail=DEADLINE_EXCEEDED_DETAIL
+    )
+
+
+def describe_exception(exc: BaseException) -> tuple[int, str]:
+    """Retorna o status HTTP e a mensagem correspondentes a uma exceção (usado em lotes)"""
+    if isinstance(exc, CityNotFoundException):
+        return 404, CITY_NOT_FOUND_DETAIL
+    if isinstance(exc, WeatherDataUnavailableException):
+        return 503, WEATHER_DATA_UNAVAILABLE_DETAIL
+    if isinstance(exc, ExternalAPIException):
+        return 502, EXTERNAL_API_ERROR_DETAIL
+    if isinstance(exc, DeadlineExceededException):
+        return 504, DEADLINE_EXCEEDED_DETAIL
+    return 500, INTERNAL_ERROR_DETAIL
\ No newline at end of file
@@ -0,0 +1,102 @@
+from typing import Tuple
+from ..config import settings
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_INDEX = {char: index for index, char in enumerate(_GEOHASH_ALPHABET)}
+
+
+def snap_to_grid(latitude: float, longitude: float, size: float) -> Tuple[float, float]:
+    """Ajusta as coordenadas ao centro da célula de uma grade regular de size graus"""
+    lat = (int(latitude // size) + 0.5) * size
+    lon = (int(longitude // size) + 0.5) * size
+    # Arredonda para evitar chaves diferentes por ruído de ponto flutuante
+    return round(min(max(lat, -90.0), 90.0), 6), round(min(max(lon, -180.0), 180.0), 6)
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """Codifica coordenadas em geohash com a precisão (número de caracteres) informada"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_decode(geohash: str) -> Tuple[float, float]:
+    """Retorna o centro (latitude, longitude) da célula geohash"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _GEOHASH_INDEX[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return (
+        round((lat_range[0] + lat_range[1]) / 2, 6),
+        round((lon_range[0] + lon_range[1]) / 2, 6)
+    )
+
+
+def bucket_coordinates(latitude: float, longitude: float) -> Tuple[float, float]:
+    """
+    Ajusta as coordenadas à célula configurada em WEATHER_GRID_MODE
+
+    - "off": mantém as coordenadas exatas
+    - "grid": centro de uma grade de WEATHER_GRID_SIZE graus
+    - "geohash": centro da célula geohash de WEATHER_GEOHASH_PRECISION caracteres
+    """
+    mode = settings.weather_grid_mode
+    if mode == "grid":
+        return snap_to_grid(latitude, longitude, settings.weather_grid_size)
+    if mode == "geohash":
+        return geohash_decode(geohash_encode(latitude, longitude, settings.weather_geohash_precision))
+    return latitude, longitude
+
+
+def bucket_label(latitude: float, longitude: float) -> str:
+    """Identificador legível da célula usado nas estatísticas por bucket"""
+    if settings.weather_grid_mode == "geohash":
+        return geohash_encode(latitude, longitude, settings.weather_geohash_precision)
+    return f"{latitude:.4f},{longitude:.4f}"
+
+
+def cell_tag(latitude: float, longitude: float) -> str:
+    """Tag de cache da célula (invalida clima e previsão de uma área de uma vez)"""
+    return f"cell:{bucket_label(latitude, longitude)}"
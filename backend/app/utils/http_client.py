@@ -0,0 +1,114 @@
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..config import settings
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """Verifica se o pacote opcional h2 está instalado"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientManager:
+    """Mantém um httpx.AsyncClient de longa duração compartilhado pela aplicação"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight = 0
+        self._total_requests = 0
+
+    def _build_client(self, http2: bool) -> httpx.AsyncClient:
+        """Cria o cliente com os limites de pool configurados"""
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        return httpx.AsyncClient(limits=limits, timeout=settings.request_timeout, http2=http2)
+
+    async def start(self) -> httpx.AsyncClient:
+        """Inicializa o cliente compartilhado (chamado no lifespan da aplicação)"""
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+
+        http2 = settings.http2_enabled
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 habilitado mas o pacote 'h2' não está instalado; usando HTTP/1.1")
+            http2 = False
+
+        self._client = self._build_client(http2)
+        logger.info(
+            f"HTTP client started (max_connections={settings.http_max_connections}, "
+            f"keepalive={settings.http_max_keepalive_connections}, http2={http2})"
+        )
+        return self._client
+
+    async def close(self) -> None:
+        """Fecha o cliente e todas as conexões do pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("HTTP client closed")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Retorna o cliente compartilhado, criando-o sob demanda fora do lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client(http2=False)
+        return self._client
+
+    async def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Executa um GET pelo cliente compartilhado contabilizando requisições em andamento"""
+        request_timeout = timeout if timeout is not None else settings.request_timeout
+        self._in_flight += 1
+        self._total_requests += 1
+        try:
+            return await self.client.get(url, timeout=request_timeout, **kwargs)
+        finally:
+            self._in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de utilização do pool de conexões"""
+        stats: Dict[str, Any] = {
+            "started": self._client is not None and not self._client.is_closed,
+            "max_connections": settings.http_max_connections,
+            "max_keepalive_connections": settings.http_max_keepalive_connections,
+            "keepalive_expiry": settings.http_keepalive_expiry,
+            "in_flight": self._in_flight,
+            "total_requests": self._total_requests
+        }
+
+        # O httpx não expõe o pool publicamente; lê do httpcore quando disponível
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            idle = sum(1 for conn in connections if conn.is_idle())
+            stats.update({
+                "connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "http2_connections": sum(
+                    1 for conn in connections if "HTTP/2" in repr(conn)
+                )
+            })
+
+        return stats
+
+
+# Instância global do cliente HTTP
+http_client = HTTPClientManager()
+
+registry.gauge(
+    "upstream_requests_in_flight",
+    "Chamadas à Open-Meteo em andamento",
+    function=lambda: http_client.get_stats()["in_flight"]
+)
@@ -0,0 +1,34 @@
+import sys
+from typing import Any, Optional, Set
+
+# Objetos compartilhados por todo o processo não contam para uma entrada
+_SKIP_TYPES = (type, type(sys), type(len))
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Tamanho aproximado em bytes de obj e de tudo que ele referencia
+
+    Percorre contêineres, __dict__ e __slots__; objetos já visitados (seen)
+    são contados uma única vez. Não inclui o overhead do alocador.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool)) and obj is not None:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(obj.__dict__, seen)
+        for cls in type(obj).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                    size += deep_sizeof(getattr(obj, name), seen)
+    return size
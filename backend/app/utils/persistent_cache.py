@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import pickle
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from ..config import settings
+from .cache_keys import decode_key, encode_key
+
+logger = logging.getLogger(__name__)
+
+# (valor, stale_at, expires_at) com tempos em epoch, comparáveis entre processos
+PersistentRow = Tuple[Any, float, float]
+
+# Versão do formato das chaves e valores; bancos de outra versão são descartados na abertura
+SCHEMA_VERSION = 2
+
+
+class SQLiteCache:
+    """
+    Segundo nível de cache em SQLite (modo WAL) compartilhado entre workers
+
+    Leitura sob demanda (read-through) e escrita adiada (write-behind): as
+    gravações ficam em memória e são persistidas em lote pelo flusher. Todo
+    acesso ao banco roda em uma única thread dedicada, sem bloquear o loop.
+    Os valores são serializados com pickle (binário e compacto) e as chaves
+    (tuplas) gravadas como texto por encode_key.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Tuple[bytes, float, float]] = {}
+        self._pending_hits: Dict[str, int] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+
+    async def _run(self, func, *args):
+        """Executa uma operação na thread do banco"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _open_sync(self) -> None:
+        conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS cache")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "stale_at REAL NOT NULL, expires_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_hits ON cache (hits DESC)")
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        self._conn = conn
+
+    async def start(self) -> None:
+        """Abre o banco e inicia o flusher de escritas"""
+        if self._conn is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-cache")
+        await self._run(self._open_sync)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"Persistent cache opened at {self._path}")
+
+    async def close(self) -> None:
+        """Persiste escritas pendentes e fecha o banco"""
+        if self._conn is None:
+            return
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        await self._run(self._conn.close)
+        self._conn = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        logger.info("Persistent cache closed")
+
+    def _get_sync(self, key: str) -> Optional[Tuple[bytes, float, float]]:
+        return self._conn.execute(
+            "SELECT value, stale_at, expires_at FROM cache WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+
+    async def get(self, key: Hashable) -> Optional[PersistentRow]:
+        """Obtém um valor não expirado (considera também escritas ainda não persistidas)"""
+        if self._conn is None:
+            return None
+
+        key = encode_key(key)
+        self.reads += 1
+        row = self._pending.get(key)
+        if row is None:
+            row = await self._run(self._get_sync, key)
+        if row is None or row[2] <= time.time():
+            return None
+
+        self.hits += 1
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        payload, stale_at, expires_at = row
+        return pickle.loads(payload), stale_at, expires_at
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        """Agenda a gravação do valor (write-behind)"""
+        if self._conn is None:
+            return
+        stale_at = time.time() + ttl
+        self._pending[encode_key(key)] = (
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            stale_at,
+            stale_at + stale_ttl
+        )
+
+    def _flush_sync(self, rows: List[Tuple[str, bytes, float, float]], hits: List[Tuple[int, str]]) -> None:
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO cache (key, value, stale_at, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "stale_at = excluded.stale_at, expires_at = excluded.expires_at",
+                rows
+            )
+            conn.executemany("UPDATE cache SET hits = hits + ? WHERE key = ?", hits)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def flush(self) -> int:
+        """Persiste em uma transação as escritas e contagens de acesso pendentes"""
+        if self._conn is None or (not self._pending and not self._pending_hits):
+            return 0
+
+        pending, self._pending = self._pending, {}
+        pending_hits, self._pending_hits = self._pending_hits, {}
+        rows = [(key, *row) for key, row in pending.items()]
+        hits = [(count, key) for key, count in pending_hits.items()]
+        await self._run(self._flush_sync, rows, hits)
+        self.writes += len(rows)
+        return len(rows)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache flush failed: {e}")
+
+    def _hot_rows_sync(self, limit: int) -> List[Tuple[str, bytes, float, float]]:
+        return self._conn.execute(
+            "SELECT key, value, stale_at, expires_at FROM cache "
+            "WHERE expires_at > ? ORDER BY hits DESC LIMIT ?",
+            (time.time(), limit)
+        ).fetchall()
+
+    async def hot_entries(self, limit: int) -> List[Tuple[Hashable, Any, float, float]]:
+        """Retorna as entradas válidas mais acessadas (para aquecer o cache na inicialização)"""
+        if self._conn is None or limit <= 0:
+            return []
+        rows = await self._run(self._hot_rows_sync, limit)
+        entries = []
+        for text, payload, stale_at, expires_at in rows:
+            # Linhas com chaves em formato antigo são ignoradas até expirarem
+            key = decode_key(text)
+            if key is not None:
+                entries.append((key, pickle.loads(payload), stale_at, expires_at))
+        return entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do segundo nível"""
+        return {
+            "enabled": self._conn is not None,
+            "path": self._path,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "pending_writes": len(self._pending)
+        }
+
+
+# Instância global do cache persistente (None quando desabilitado)
+persistent_cache: Optional[SQLiteCache] = (
+    SQLiteCache(settings.cache_l2_path, settings.cache_l2_flush_interval)
+    if settings.cache_l2_enabled else None
+)
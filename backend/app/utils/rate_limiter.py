@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+
+from ..config import settings
+from .exceptions import UpstreamRejectedException
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Limitador de taxa por balde de fichas
+
+    Fichas são repostas continuamente a rate por segundo até burst. Quem chega
+    sem ficha disponível reserva a próxima (o saldo fica negativo) e espera a
+    sua vez, o que mantém a ordem de chegada sem laços de nova tentativa.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._tokens + (now - self._updated_at) * self.rate, self.burst)
+        self._updated_at = now
+
+    async def acquire(self, deadline: float) -> bool:
+        """Consome uma ficha; retorna False se a espera ultrapassaria o deadline"""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self._refill(now)
+        wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+        if now + wait > deadline:
+            return False
+        self._tokens -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Cancelado na espera (ex.: prazo da requisição): a ficha reservada volta ao balde
+                self.refund()
+                raise
+        return True
+
+    def refund(self) -> None:
+        """Devolve uma ficha consumida sem que a chamada tenha sido feita"""
+        if self.rate > 0:
+            self._tokens = min(self._tokens + 1, self.burst)
+
+    @property
+    def tokens(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limite de concorrência adaptativo (AIMD)
+
+    Cada resposta bem-sucedida com o limite em uso aumenta o limite em
+    1/limite (cerca de +1 por janela); sinais de sobrecarga (429, 503,
+    timeouts) o reduzem multiplicativamente, no máximo uma vez por
+    decrease_interval. Chamadas acima do limite aguardam em fila FIFO.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        backoff_ratio: float = 0.7,
+        decrease_interval: float = 1.0
+    ):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._backoff_ratio = backoff_ratio
+        self._decrease_interval = decrease_interval
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, deadline: float) -> bool:
+        """Obtém uma vaga; retorna False se o deadline vencer ainda na fila"""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.CancelledError:
+            # A vaga pode ter sido concedida no mesmo ciclo do cancelamento
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+        if waiter.done():
+            return True
+        self._discard(waiter)
+        return False
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(True)
+
+    def release(self) -> None:
+        """Libera a vaga e acorda os próximos da fila"""
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def on_success(self) -> None:
+        """Aumento aditivo, apenas quando o limite está de fato em uso"""
+        if self._in_flight >= self.limit - 1 and self._limit < self.max_limit:
+            self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+            self._wake_waiters()
+
+    def on_overload(self) -> None:
+        """Redução multiplicativa diante de sinais de sobrecarga"""
+        now = time.monotonic()
+        if now - self._last_decrease < self._decrease_interval:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(self._limit * self._backoff_ratio, self.min_limit)
+        if self.limit != previous:
+            logger.info(f"Upstream concurrency limit reduced from {previous} to {self.limit}")
+
+
+class UpstreamLimiter:
+    """Balde de fichas e concorrência adaptativa de um host upstream"""
+
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        burst: int,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        queue_timeout: float
+    ):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrencyLimiter(initial_concurrency, min_concurrency, max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.rejected = 0
+
+    async def acquire(self, name: str) -> None:
+        """
+        Aguarda ficha e vaga dentro de queue_timeout
+
+        Levanta UpstreamRejectedException quando o prazo da fila se esgota, sem
+        enviar a requisição ao upstream.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        if await self.bucket.acquire(deadline):
+            try:
+                if await self.concurrency.acquire(deadline):
+                    return
+            except asyncio.CancelledError:
+                self.bucket.refund()
+                raise
+            self.bucket.refund()
+        self.rejected += 1
+        raise UpstreamRejectedException(f"Erro na API de {name}: limite de requisições ao upstream atingido")
+
+    def release(self, outcome: str) -> None:
+        """Libera a vaga informando o resultado ("ok", "overloaded" ou outro erro) ao controle adaptativo"""
+        if outcome == "ok":
+            self.concurrency.on_success()
+        elif outcome == "overloaded":
+            self.concurrency.on_overload()
+        self.concurrency.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do limitador"""
+        return {
+            "rate": self.bucket.rate,
+            "tokens": round(self.bucket.tokens, 2),
+            "concurrency_limit": self.concurrency.limit,
+            "in_flight": self.concurrency.in_flight,
+            "queued": self.concurrency.queued,
+            "rejected": self.rejected
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Espera antes da nova tentativa (backoff exponencial com jitter total)
+
+    Respeita Retry-After quando informado; retorna None se a espera pedida
+    pelo upstream exceder upstream_retry_max_delay (não vale tentar de novo).
+    """
+    if retry_after is not None:
+        return retry_after if retry_after <= settings.upstream_retry_max_delay else None
+    ceiling = min(settings.upstream_retry_base_delay * (2 ** attempt), settings.upstream_retry_max_delay)
+    return random.uniform(0, ceiling)
+
+
+# Limitadores por host upstream
+upstream_limiters: Dict[str, UpstreamLimiter] = {}
+
+
+def get_upstream_limiter(host: str) -> UpstreamLimiter:
+    """Obtém (ou cria) o limitador do host"""
+    limiter = upstream_limiters.get(host)
+    if limiter is None:
+        limiter = upstream_limiters[host] = UpstreamLimiter(
+            host,
+            rate=settings.upstream_rate_limit,
+            burst=settings.upstream_burst,
+            initial_concurrency=settings.upstream_concurrency_initial,
+            min_concurrency=settings.upstream_concurrency_min,
+            max_concurrency=settings.upstream_concurrency_max,
+            queue_timeout=settings.upstream_queue_timeout
+        )
+    return limiter
@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from ..config import settings
+from .metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele apenas gzip é oferecido
+    brotli = None
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Codificações do cabeçalho Accept-Encoding com seus q-values (q=0 significa recusada)"""
+    qvalues: Dict[str, float] = {}
+    for part in header.lower().split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    return qvalues
+
+
+def _quality(qvalues: Dict[str, float], *codings: str) -> float:
+    """q-value da codificação (ou de seus sinônimos), com "*" valendo para as não listadas"""
+    for coding in codings:
+        if coding in qvalues:
+            return qvalues[coding]
+    return qvalues.get("*", 0.0)
+
+
+class CachedResponse:
+    """Corpo JSON já serializado, com ETag e variantes comprimidas"""
+
+    __slots__ = ("body", "digest", "source_key", "source_entry", "point", "_encoded")
+
+    def __init__(self, body: bytes, source_key: Any = None, source_entry: Any = None, point: Any = None):
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.source_key = source_key
+        self.source_entry = source_entry
+        self.point = point
+        self._encoded: Dict[str, bytes] = {}
+
+    def negotiate(self, accept_encoding: str, min_size: int = 0) -> Optional[str]:
+        """Escolhe a melhor codificação aceita pelo cliente (None para o corpo sem compressão)"""
+        if len(self.body) < min_size:
+            return None
+
+        qvalues = parse_accept_encoding(accept_encoding)
+        # Maior q-value aceito; no empate, brotli antes de gzip
+        options = [(_quality(qvalues, "gzip", "x-gzip"), "gzip")]
+        if brotli is not None:
+            options.append((_quality(qvalues, "br"), "br"))
+        quality, encoding = max(options, key=lambda option: (option[0], option[1] == "br"))
+        return encoding if quality > 0 else None
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """
+        Retorna o corpo na codificação escolhida por negotiate
+
+        Cada variante comprimida é gerada uma única vez e reaproveitada.
+        """
+        if encoding is None:
+            return self.body
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = brotli.compress(self.body) if encoding == "br" else gzip.compress(self.body, compresslevel=6)
+            self._encoded[encoding] = body
+        return body
+
+    def etag(self, encoding: Optional[str]) -> str:
+        """ETag forte da representação: cada codificação tem o seu"""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def matches(self, if_none_match: Optional[str], encoding: Optional[str]) -> bool:
+        """Verifica se o If-None-Match corresponde ao ETag da representação (comparação fraca)"""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag(encoding) in tags
+
+
+class ResponseCache:
+    """Cache LRU de respostas serializadas, vinculadas à entrada de cache de origem"""
+
+    def __init__(self, max_size: int = 1000):
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Obtém a resposta pronta (a validade é conferida pelo chamador)"""
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            CACHE_EVENTS.inc("response", "miss")
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def record_hit(self) -> None:
+        self.hits += 1
+        CACHE_EVENTS.inc("response", "hit")
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        """Armazena a resposta, removendo a menos usada quando cheio"""
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            CACHE_EVENTS.inc("response", "eviction")
+
+    def discard(self, key: str) -> None:
+        """Remove uma resposta invalidada (contabilizada como falta)"""
+        if self._entries.pop(key, None) is not None:
+            self.misses += 1
+            CACHE_EVENTS.inc("response", "miss")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache de respostas"""
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "brotli": brotli is not None
+        }
+
+
+# Instância global do cache de respostas
+response_cache = ResponseCache(max_size=settings.response_cache_max_size)
@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+import httpx
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa o json da biblioteca padrão
+    orjson = None
+
+# Caminho rápido ativo quando o orjson está instalado e FAST_JSON_ENABLED
+FAST_JSON = orjson is not None and settings.fast_json_enabled
+
+
+def _default(value: Any) -> Any:
+    """Converte tipos que o codificador não conhece (modelos, datas, escalares NumPy)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa em JSON compacto (UTF-8)"""
+    if FAST_JSON:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    """Desserializa JSON a partir de bytes (sem decodificar para str antes, com orjson)"""
+    if FAST_JSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def response_json(response: httpx.Response) -> Any:
+    """
+    Decodifica o corpo de uma resposta do upstream
+
+    Substitui response.json(): o orjson lê os bytes do corpo diretamente,
+    sem detectar a codificação nem criar a str intermediária.
+    """
+    return loads(response.content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON que serializa direto para bytes
+
+    Modelos Pydantic são serializados pelo próprio pydantic-core (com aliases),
+    sem passar pelo jsonable_encoder; demais conteúdos usam dumps. Rotas que
+    retornam esta resposta dispensam a validação de saída do FastAPI, então
+    devem construí-la a partir do modelo já montado.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode()
+        return dumps(content)
@@ -0,0 +1,303 @@
+import asyncio
+import itertools
+import logging
+import pickle
+import struct
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from .deadline import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+# (valor, stale_at, expires_at) com tempos em epoch, como no cache persistente
+SharedRow = Tuple[Any, float, float]
+
+# Cabeçalho de cada mensagem: tamanho do corpo (pickle) em 4 bytes
+_HEADER = struct.Struct(">I")
+
+# Identificador de requisição sem resposta (gravações e liberações)
+NO_REPLY = 0
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    """Lê uma mensagem do socket"""
+    header = await reader.readexactly(_HEADER.size)
+    return pickle.loads(await reader.readexactly(_HEADER.unpack(header)[0]))
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Any) -> None:
+    """Grava uma mensagem no socket (sem aguardar o envio)"""
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(_HEADER.pack(len(body)) + body)
+
+
+class SharedCacheClient:
+    """
+    Cliente do servidor de cache compartilhado entre workers (socket Unix)
+
+    Usado como segundo nível pelos workers iniciados por app.launcher: uma
+    única conexão por worker, com várias requisições em andamento
+    identificadas por número. Gravações e liberações não esperam resposta.
+    Os valores trafegam já serializados com pickle; o servidor não os lê.
+
+    Concessões (leases) coordenam as atualizações: apenas o worker que
+    recebe a concessão de uma chave chama o upstream, os demais aguardam o
+    valor gravado por ele. Se o servidor estiver indisponível, cada worker
+    segue apenas com o próprio cache em memória.
+    """
+
+    def __init__(self, path: str, timeout: float = 1.0):
+        self._path = path
+        self._timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Lock] = None
+        self._retry_at = 0.0
+        self._ids = itertools.count(1)
+        # Requisições aguardando resposta: id -> (future, operação, chave)
+        self._pending: Dict[int, Tuple[asyncio.Future, str, Hashable]] = {}
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.leases = 0
+        self.waited = 0
+        self.errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def start(self) -> None:
+        """Conecta ao servidor (falhas são registradas e a conexão é refeita sob demanda)"""
+        if await self._ensure_connected():
+            logger.info(f"Shared cache connected at {self._path}")
+
+    async def close(self) -> None:
+        """Encerra a conexão"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        logger.info("Shared cache connection closed")
+
+    async def _ensure_connected(self) -> bool:
+        if self.connected:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self.connected:
+                return True
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self._path), self._timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                # Nova tentativa em no máximo um segundo; até lá as operações seguem sem o servidor
+                self._retry_at = time.monotonic() + 1.0
+                self.errors += 1
+                logger.warning(f"Shared cache unavailable at {self._path}: {e}")
+                return False
+            # A reconexão pode partir de uma requisição: o leitor não herda o prazo dela
+            with deadline_scope(None):
+                self._listener = asyncio.create_task(self._listen(self._reader, self._writer))
+            return True
+
+    async def _listen(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Entrega as respostas às requisições pendentes"""
+        try:
+            while True:
+                request_id, result = await read_frame(reader)
+                pending = self._pending.pop(request_id, None)
+                if pending is None:
+                    continue
+                future, op, key = pending
+                if not future.done():
+                    future.set_result(result)
+                elif op in ("acquire", "lock") and result[0] == "lease":
+                    # Concessão chegou depois que o chamador desistiu: devolve para não bloquear os demais
+                    self.release(key)
+        except (OSError, asyncio.IncompleteReadError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Shared cache connection lost: {e}")
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            for future, _, _ in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Conexão com o cache compartilhado encerrada"))
+            self._pending.clear()
+
+    def _send(self, op: str, *args) -> None:
+        """Envia uma operação sem resposta (ignorada se desconectado)"""
+        if not self.connected:
+            self.errors += 1
+            return
+        write_frame(self._writer, (NO_REPLY, op, args))
+
+    async def _call(self, op: str, key: Hashable, *args, timeout: Optional[float] = None) -> Any:
+        """Envia uma operação e aguarda a resposta; None se o servidor não responder"""
+        if not await self._ensure_connected():
+            return None
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, op, key)
+        write_frame(self._writer, (request_id, op, (key, *args)))
+        try:
+            # Timeout ou cancelamento cancelam o future; concessões que ainda chegarem são devolvidas pelo _listen
+            return await asyncio.wait_for(future, timeout or self._timeout)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.errors += 1
+            logger.warning(f"Shared cache {op} failed: {e or 'timeout'}")
+            return None
+
+    @staticmethod
+    def _row(raw: Optional[Tuple[bytes, float, float]]) -> Optional[SharedRow]:
+        if raw is None:
+            return None
+        payload, stale_at, expires_at = raw
+        return pickle.loads(payload), stale_at, expires_at
+
+    async def get(self, key: Hashable) -> Optional[SharedRow]:
+        """Obtém um valor não expirado"""
+        self.reads += 1
+        row = self._row(await self._call("get", key))
+        if row is not None:
+            self.hits += 1
+        return row
+
+    async def acquire(
+        self,
+        key: Hashable,
+        accept_stale: bool = True,
+        wait_timeout: Optional[float] = None
+    ) -> Tuple[Optional[SharedRow], bool]:
+        """
+        Obtém o valor da chave ou a concessão para atualizá-la
+
+        Se outro worker detém a concessão, aguarda até wait_timeout segundos
+        pelo valor gravado por ele. Sem accept_stale, apenas valores ainda
+        não obsoletos são aceitos (revalidação).
+
+        Returns:
+            (linha, False) com o valor; (None, True) com a concessão, que deve
+            ser devolvida por set ou release; (None, False) se o tempo de
+            espera se esgotou ou o servidor não respondeu
+        """
+        wait_timeout = settings.cache_shared_wait_timeout if wait_timeout is None else wait_timeout
+        min_stale_at = float("-inf") if accept_stale else time.time()
+        self.reads += 1
+        result = await self._call(
+            "acquire", key, min_stale_at, settings.cache_shared_lease_ttl, wait_timeout,
+            timeout=wait_timeout + self._timeout
+        )
+        if result is None:
+            return None, False
+        status, raw, waited = result
+        if waited:
+            self.waited += 1
+        if status == "value":
+            self.hits += 1
+            return self._row(raw), False
+        if status == "lease":
+            self.leases += 1
+            return None, True
+        return None, False
+
+    async def lock(self, key: Hashable, ttl: Optional[float] = None, wait_timeout: float = 0.0) -> bool:
+        """Obtém a concessão de key sem consultar valor (exclusão mútua entre workers)"""
+        result = await self._call(
+            "lock", key, ttl or settings.cache_shared_lease_ttl, wait_timeout,
+            timeout=wait_timeout + self._timeout
+        )
+        return result is not None and result[0] == "lease"
+
+    async def get_many(self, keys: Sequence[Hashable]) -> List[Optional[SharedRow]]:
+        """Obtém vários valores em uma única ida ao servidor"""
+        if not keys:
+            return []
+        self.reads += len(keys)
+        raws = await self._call("get_many", tuple(keys))
+        rows = [self._row(raw) for raw in raws] if raws is not None else [None] * len(keys)
+        self.hits += sum(row is not None for row in rows)
+        return rows
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0, tags: Sequence[str] = ()) -> None:
+        """Grava o valor para todos os workers e devolve a concessão da chave, se houver"""
+        stale_at = time.time() + ttl
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # Valor que não atravessa processos: fica só neste worker
+            logger.warning(f"Shared cache cannot serialize value for {key}: {e}")
+            self.release(key)
+            return
+        self.writes += 1
+        self._send("set", key, payload, stale_at, stale_at + stale_ttl, tuple(tags))
+
+    def release(self, key: Hashable) -> None:
+        """Devolve a concessão sem gravar valor (ex.: falha ou cancelamento da atualização)"""
+        self._send("release", key)
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        self._send("delete_many", tuple(keys))
+
+    def invalidate_prefix(self, prefix: Hashable) -> None:
+        self._send("invalidate_prefix", prefix)
+
+    def invalidate_tag(self, tag: str) -> None:
+        self._send("invalidate_tag", tag)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas deste worker e do servidor"""
+        return {
+            "enabled": True,
+            "connected": self.connected,
+            "path": self._path,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "leases": self.leases,
+            "waited_for_other_worker": self.waited,
+            "errors": self.errors,
+            "server": await self._call("stats", None) if self.connected else None
+        }
+
+
+@asynccontextmanager
+async def shared_lock(key: Hashable, ttl: Optional[float] = None, wait_timeout: Optional[float] = None) -> AsyncIterator[bool]:
+    """
+    Exclusão mútua entre workers para key (ex.: gravação de arquivos do histórico)
+
+    Sem servidor compartilhado não faz nada. Se a concessão não vier dentro de
+    wait_timeout, o bloco executa mesmo assim (retorna False).
+    """
+    if shared_cache is None:
+        yield False
+        return
+    wait_timeout = settings.cache_shared_wait_timeout if wait_timeout is None else wait_timeout
+    acquired = await shared_cache.lock(key, ttl, wait_timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            shared_cache.release(key)
+
+
+# Instância global do cliente (None fora do modo multi-worker)
+shared_cache: Optional[SharedCacheClient] = (
+    SharedCacheClient(settings.cache_shared_socket, settings.cache_shared_timeout)
+    if settings.cache_shared_socket else None
+)
@@ -0,0 +1,46 @@
+import unicodedata
+from functools import lru_cache
+from typing import Dict
+from ..config import settings
+
+# Variantes conhecidas -> nome canônico (chaves e valores já normalizados)
+CITY_ALIASES: Dict[str, str] = {
+    "sampa": "sao paulo",
+    "sp capital": "sao paulo",
+    "rio": "rio de janeiro",
+    "bh": "belo horizonte",
+    "beaga": "belo horizonte",
+    "poa": "porto alegre",
+    "floripa": "florianopolis",
+    "rib preto": "ribeirao preto",
+    "rib. preto": "ribeirao preto",
+    "s j do rio preto": "sao jose do rio preto",
+    "s. j. do rio preto": "sao jose do rio preto",
+    "pres prudente": "presidente prudente",
+    "pres. prudente": "presidente prudente"
+}
+
+
+def normalize_text(value: str) -> str:
+    """Remove acentos, ignora maiúsculas/minúsculas e colapsa espaços"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.casefold().split())
+
+
+@lru_cache(maxsize=1)
+def _configured_aliases() -> Dict[str, str]:
+    """Apelidos das configurações com as chaves normalizadas"""
+    return {normalize_text(variant): canonical for variant, canonical in settings.city_aliases.items()}
+
+
+def canonicalize_city(city_name: str) -> str:
+    """
+    Forma canônica do nome da cidade usada como chave de cache
+
+    Aplica normalize_text e resolve apelidos pela tabela CITY_ALIASES,
+    complementada por CITY_ALIASES definido nas configurações.
+    """
+    key = normalize_text(city_name)
+    alias = _configured_aliases().get(key) or CITY_ALIASES.get(key)
+    return normalize_text(alias) if alias else key
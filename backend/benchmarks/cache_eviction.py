@@ -0,0 +1,66 @@
+"""
+Microbenchmark das políticas de remoção do MemoryCache
+
+Uso (a partir de backend/):
+    python -m benchmarks.cache_eviction --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from app.utils.cache import MemoryCache
+from app.utils.eviction import POLICIES
+
+
+async def run_policy(policy: str, size: int, operations: int, seed: int = 42) -> Dict[str, float]:
+    """Mede inserções com remoção e leituras para uma política e tamanho"""
+    rng = random.Random(seed)
+    cache = MemoryCache(max_size=size, policy=policy)
+
+    start = time.perf_counter()
+    for i in range(size):
+        await cache.set(f"k{i}", i, ttl=rng.randint(60, 3600))
+    fill_time = time.perf_counter() - start
+
+    # Cada inserção com o cache cheio força uma remoção
+    start = time.perf_counter()
+    for i in range(size, size + operations):
+        await cache.set(f"k{i}", i, ttl=rng.randint(60, 3600))
+    evict_time = time.perf_counter() - start
+
+    # Leituras com distribuição enviesada para chaves recentes (conjunto quente)
+    keys: List[str] = [f"k{size + operations - 1 - int(rng.paretovariate(1.2))}" for _ in range(operations)]
+    start = time.perf_counter()
+    for key in keys:
+        await cache.get(key)
+    get_time = time.perf_counter() - start
+
+    return {
+        "fill_us": fill_time / size * 1e6,
+        "insert_evict_us": evict_time / operations * 1e6,
+        "get_us": get_time / operations * 1e6,
+        "hit_ratio": cache.hits / max(cache.hits + cache.misses, 1)
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES))
+    args = parser.parse_args()
+
+    print(f"{'policy':<8}{'size':>10}{'fill µs':>12}{'insert+evict µs':>18}{'get µs':>10}{'hit ratio':>11}")
+    for size in args.sizes:
+        for policy in args.policies:
+            result = await run_policy(policy, size, args.operations)
+            print(
+                f"{policy:<8}{size:>10}{result['fill_us']:>12.2f}"
+                f"{result['insert_evict_us']:>18.2f}{result['get_us']:>10.2f}{result['hit_ratio']:>11.2%}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
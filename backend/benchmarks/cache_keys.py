@@ -0,0 +1,95 @@
+"""
+Microbenchmark da montagem de chaves de cache
+
+Compara a chave anterior (JSON + MD5 sobre str() de cada argumento, incluindo
+self) com as chaves em tupla de key_builder: argumentos posicionais (caminho
+rápido), argumentos nomeados (resolvidos pela assinatura) e key_args. Também
+mede o custo de consultar um dicionário com cada formato de chave.
+
+Uso (a partir de backend/):
+    python -m benchmarks.cache_keys --iterations 200000
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.utils.cache_keys import key_builder
+
+
+def legacy_key_generator(*args, **kwargs) -> str:
+    """Geração de chave anterior (JSON + MD5)"""
+    key_data = {
+        "args": [str(arg) for arg in args],
+        "kwargs": {k: str(v) for k, v in kwargs.items()}
+    }
+    key_json = json.dumps(key_data, sort_keys=True)
+    return hashlib.md5(key_json.encode()).hexdigest()
+
+
+class Service:
+    """Serviço de exemplo com a mesma assinatura de get_weather_at"""
+
+    async def get_weather_at(self, latitude: float, longitude: float, units: str = "metric"):
+        return None
+
+
+def legacy_builder(prefix: str, func: Callable) -> Callable[..., str]:
+    def make_key(*args, **kwargs) -> str:
+        return ":".join([prefix, func.__name__]) + ":" + legacy_key_generator(*args, **kwargs)
+    return make_key
+
+
+def measure(make_key: Callable, calls: List[Tuple[tuple, dict]]) -> float:
+    """Tempo médio por chave em µs"""
+    start = time.perf_counter()
+    for args, kwargs in calls:
+        make_key(*args, **kwargs)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def measure_lookup(keys: list, iterations: int) -> float:
+    """Tempo médio por consulta em µs a um dicionário com as chaves dadas"""
+    table: Dict = {key: None for key in keys}
+    probes = [keys[i % len(keys)] for i in range(iterations)]
+    start = time.perf_counter()
+    for key in probes:
+        table.get(key)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    service = Service()
+    func = Service.get_weather_at
+    points = [(round(rng.uniform(-33, 5), 4), round(rng.uniform(-73, -35), 4)) for _ in range(args.distinct)]
+    positional = [((service, *points[i % len(points)]), {}) for i in range(args.iterations)]
+    named = [((service,), {"latitude": lat, "longitude": lon}) for lat, lon in (points[i % len(points)] for i in range(args.iterations))]
+
+    legacy = legacy_builder("weather", func)
+    builder = key_builder(func, "weather")
+    restricted = key_builder(func, "weather", key_args=("latitude", "longitude"))
+
+    print(f"{'variant':<26}{'build µs':>10}{'lookup µs':>11}")
+    rows = [
+        ("json+md5 (anterior)", legacy, positional),
+        ("tuple posicional", builder, positional),
+        ("tuple nomeados", builder, named),
+        ("tuple key_args", restricted, positional)
+    ]
+    for name, make_key, calls in rows:
+        build_us = measure(make_key, calls)
+        keys = [make_key(*call_args, **call_kwargs) for call_args, call_kwargs in calls[:args.distinct]]
+        lookup_us = measure_lookup(keys, args.iterations)
+        print(f"{name:<26}{build_us:>10.2f}{lookup_us:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
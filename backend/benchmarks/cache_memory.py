@@ -0,0 +1,111 @@
+"""
+Memória por entrada do cache: JSON completo da Open-Meteo contra registros compactos
+
+Preenche um MemoryCache com N entradas de clima e de geocodificação em cada
+formato e mede a memória alocada com tracemalloc (inclui chave, CacheEntry,
+índices e política de remoção), além da estimativa de memory_report.
+
+Uso (a partir de backend/):
+    python -m benchmarks.cache_memory --entries 100000
+"""
+import argparse
+import asyncio
+import gc
+import random
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from app.models.records import CurrentConditions, GeoPoint
+from app.models.weather import Location
+from app.utils.cache import MemoryCache
+
+
+def open_meteo_current(latitude: float, longitude: float, rng: random.Random) -> dict:
+    """Resposta da API de clima atual como decodificada por response.json()"""
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "generationtime_ms": rng.uniform(0.01, 0.1),
+        "utc_offset_seconds": -10800,
+        "timezone": "America/Sao_Paulo",
+        "timezone_abbreviation": "-03",
+        "elevation": rng.uniform(300, 900),
+        "current_units": {
+            "time": "iso8601",
+            "interval": "seconds",
+            "temperature_2m": "°C",
+            "relativehumidity_2m": "%",
+            "precipitation": "mm",
+            "windspeed_10m": "km/h",
+            "pressure_msl": "hPa",
+            "cloudcover": "%"
+        },
+        "current": {
+            "time": "2024-05-01T12:00",
+            "interval": 900,
+            "temperature_2m": round(rng.uniform(10, 38), 1),
+            "relativehumidity_2m": rng.randint(20, 100),
+            "precipitation": round(rng.uniform(0, 5), 1),
+            "windspeed_10m": round(rng.uniform(0, 40), 1),
+            "pressure_msl": round(rng.uniform(1000, 1025), 1),
+            "cloudcover": rng.randint(0, 100)
+        }
+    }
+
+
+async def measure(entries: int, make_value: Callable[[int, random.Random], Any], prefix: str) -> Dict[str, float]:
+    """Bytes por entrada medidos com tracemalloc e estimados por memory_report"""
+    rng = random.Random(42)
+    gc.collect()
+    tracemalloc.start()
+    cache = MemoryCache(max_size=entries)
+    for i in range(entries):
+        # Apenas o cache mantém o valor, como após a resposta da requisição
+        await cache.set((prefix, "f", i), make_value(i, rng), 300)
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    report = cache.memory_report(500)["by_prefix"][prefix]
+    return {
+        "traced": traced / entries,
+        "report": report["bytes_per_entry"],
+        "value": report["value_bytes_per_entry"]
+    }
+
+
+def full_weather(i: int, rng: random.Random) -> dict:
+    return open_meteo_current(round(-21 - i / 1e5, 4), round(-47 - i / 1e5, 4), rng)
+
+
+def compact_weather(i: int, rng: random.Random) -> CurrentConditions:
+    return CurrentConditions.from_api(full_weather(i, rng))
+
+
+def full_location(i: int, rng: random.Random) -> Location:
+    return Location(name=f"Municipio {i:05d}", latitude=-21 - i / 1e5, longitude=-47 - i / 1e5)
+
+
+def compact_location(i: int, rng: random.Random) -> GeoPoint:
+    location = full_location(i, rng)
+    return GeoPoint(location.name, location.latitude, location.longitude)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = [
+        ("weather json dict", full_weather, "weather"),
+        ("weather CurrentConditions", compact_weather, "weather"),
+        ("geocoding Location", full_location, "geocoding"),
+        ("geocoding GeoPoint", compact_location, "geocoding")
+    ]
+    print(f"{'value':<28}{'cache B/entry':>15}{'report B/entry':>16}{'value B':>10}")
+    for name, make_value, prefix in rows:
+        result = await measure(args.entries, make_value, prefix)
+        print(f"{name:<28}{result['traced']:>15.0f}{result['report']:>16.0f}{result['value']:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
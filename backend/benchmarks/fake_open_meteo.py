@@ -0,0 +1,249 @@
+"""
+Servidor local que imita as APIs de geocodificação e clima da Open-Meteo
+
+Latência, taxa de erro e tamanho das respostas são configuráveis, e as
+chamadas recebidas são contadas (GET /__stats, POST /__reset). O geocodificador
+conhece os municípios do índice local e os nomes sintéticos "Municipio NNNN"
+da cauda longa; qualquer outro nome retorna sem resultados.
+
+Uso (a partir de backend/):
+    python -m benchmarks.fake_open_meteo --port 8081 --latency-ms 50 --error-rate 0.01
+
+Depois aponte a API para ele:
+    GEOCODING_API_URL=http://127.0.0.1:8081/v1/search
+    WEATHER_API_URL=http://127.0.0.1:8081/v1/forecast
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.geocoding_index import DEFAULT_INDEX_PATH
+from app.utils.text import normalize_text
+
+LONG_TAIL_PREFIX = "Municipio"
+
+
+def long_tail_name(index: int) -> str:
+    """Nome sintético de um município da cauda longa"""
+    return f"{LONG_TAIL_PREFIX} {index:04d}"
+
+
+def load_gazetteer() -> Dict[str, tuple]:
+    """Municípios do índice local: nome normalizado -> (nome, latitude, longitude)"""
+    gazetteer = {}
+    with gzip.open(DEFAULT_INDEX_PATH, "rt", encoding="utf-8") as file:
+        for line in file:
+            name, _, latitude, longitude = line.rstrip("\n").split("\t")
+            gazetteer[normalize_text(name)] = (name, float(latitude), float(longitude))
+    return gazetteer
+
+
+def _stable_unit(text: str) -> float:
+    """Número em [0, 1) derivado do texto (coordenadas reprodutíveis)"""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big") / 2 ** 64
+
+
+@dataclass
+class FakeOpenMeteoConfig:
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    payload_bytes: int = 0   # Preenchimento extra por localização (simula respostas maiores)
+    seed: int = 42
+
+
+@dataclass
+class FakeOpenMeteoStats:
+    geocoding_calls: int = 0
+    weather_calls: int = 0
+    weather_locations: int = 0
+    forecast_calls: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "geocoding_calls": self.geocoding_calls,
+            "weather_calls": self.weather_calls,
+            "weather_locations": self.weather_locations,
+            "forecast_calls": self.forecast_calls,
+            "errors": self.errors
+        }
+
+
+def create_app(config: FakeOpenMeteoConfig) -> FastAPI:
+    """Cria a aplicação que responde como a Open-Meteo"""
+    app = FastAPI(title="Fake Open-Meteo")
+    app.state.config = config
+    app.state.stats = FakeOpenMeteoStats()
+    rng = random.Random(config.seed)
+    gazetteer = load_gazetteer()
+
+    async def simulate() -> Optional[JSONResponse]:
+        """Aplica latência e, com probabilidade error_rate, responde com erro"""
+        delay = max(config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms), 0) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < config.error_rate:
+            app.state.stats.errors += 1
+            return JSONResponse({"error": True, "reason": "simulated failure"}, status_code=503)
+        return None
+
+    @app.get("/v1/search")
+    async def search(name: str, count: int = 1):
+        app.state.stats.geocoding_calls += 1
+        failure = await simulate()
+        if failure is not None:
+            return failure
+
+        key = normalize_text(name)
+        match = gazetteer.get(key)
+        if match is None and key.startswith(normalize_text(LONG_TAIL_PREFIX)):
+            # Cauda longa: coordenadas estáveis dentro do Brasil
+            match = (name.title(), -33.0 + 28.0 * _stable_unit(key), -73.0 + 38.0 * _stable_unit(key[::-1]))
+        if match is None:
+            return {"generationtime_ms": 0.1}
+
+        result_name, latitude, longitude = match
+        return {"results": [{"name": result_name, "latitude": latitude, "longitude": longitude}]}
+
+    def current_weather(latitude: float, longitude: float) -> dict:
+        unit = _stable_unit(f"{latitude:.3f},{longitude:.3f},{int(time.time() // 900)}")
+        data = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": {
+                "time": int(time.time()),
+                "temperature_2m": round(12 + 26 * unit, 1),
+                "relativehumidity_2m": int(25 + 70 * unit),
+                "precipitation": round(max(unit - 0.6, 0) * 80, 1),
+                "windspeed_10m": round(45 * (1 - unit), 1),
+                "pressure_msl": round(1000 + 25 * unit, 1),
+                "cloudcover": int(100 * unit)
+            }
+        }
+        if config.payload_bytes:
+            data["padding"] = "x" * config.payload_bytes
+        return data
+
+    def forecast(latitude: float, longitude: float, days: int) -> dict:
+        start = int(time.time()) // 86400 * 86400
+        hours = [start + i * 3600 for i in range(days * 24)]
+        series = [_stable_unit(f"{latitude},{longitude},{hour}") for hour in hours]
+        daily = [start + d * 86400 for d in range(days)]
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "utc_offset_seconds": -10800,
+            "hourly": {
+                "time": hours,
+                "temperature_2m": [round(12 + 26 * u, 1) for u in series],
+                "relativehumidity_2m": [int(25 + 70 * u) for u in series],
+                "precipitation": [round(max(u - 0.8, 0) * 40, 1) for u in series],
+                "windspeed_10m": [round(45 * (1 - u), 1) for u in series]
+            },
+            "daily": {
+                "time": daily,
+                "temperature_2m_max": [34.0] * days,
+                "temperature_2m_min": [17.0] * days,
+                "precipitation_sum": [2.5] * days,
+                "windspeed_10m_max": [30.0] * days
+            }
+        }
+
+    @app.get("/v1/forecast")
+    async def weather(request: Request):
+        params = request.query_params
+        latitudes = [float(value) for value in params["latitude"].split(",")]
+        longitudes = [float(value) for value in params["longitude"].split(",")]
+        is_forecast = "hourly" in params
+
+        stats = app.state.stats
+        if is_forecast:
+            stats.forecast_calls += 1
+        else:
+            stats.weather_calls += 1
+            stats.weather_locations += len(latitudes)
+        failure = await simulate()
+        if failure is not None:
+            return failure
+
+        if is_forecast:
+            results = [forecast(lat, lon, int(params.get("forecast_days", 7))) for lat, lon in zip(latitudes, longitudes)]
+        else:
+            results = [current_weather(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        # Uma única localização retorna um objeto, várias retornam uma lista
+        return results[0] if len(results) == 1 else results
+
+    @app.get("/__stats")
+    async def get_stats():
+        return app.state.stats.as_dict()
+
+    @app.post("/__reset")
+    async def reset():
+        app.state.stats = FakeOpenMeteoStats()
+        return {"reset": True}
+
+    return app
+
+
+class FakeOpenMeteoServer:
+    """Executa o servidor falso em uma thread própria (loop separado da API medida)"""
+
+    def __init__(self, config: FakeOpenMeteoConfig, host: str = "127.0.0.1", port: int = 8081):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        # Sinais ficam com o processo principal
+        self._server.install_signal_handlers = lambda: None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> FakeOpenMeteoStats:
+        return self.app.state.stats
+
+    def reset_stats(self) -> None:
+        self.app.state.stats = FakeOpenMeteoStats()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.run, name="fake-open-meteo", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeOpenMeteoConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.payload_bytes)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
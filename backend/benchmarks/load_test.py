@@ -0,0 +1,337 @@
+"""
+Teste de carga de GET /weather contra uma Open-Meteo local (benchmarks.fake_open_meteo)
+
+Cada cenário gera nomes de cidade com uma distribuição realista (conjunto
+quente Zipfiano, cauda longa, erros de digitação) e mede vazão, percentis de
+latência, chamadas ao upstream e taxas de acerto do cache. Os resultados
+podem ser gravados como linha de base e comparados nas execuções seguintes.
+
+Por padrão a API roda no mesmo processo (transporte ASGI, cache zerado a cada
+cenário) e o servidor falso em uma thread própria. Com --target a carga vai
+para uma API já em execução, que deve apontar GEOCODING_API_URL e
+WEATHER_API_URL para o servidor falso (--fake-port).
+
+Uso (a partir de backend/):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --scenarios hot_set typos --requests 5000 --concurrency 64
+    python -m benchmarks.load_test --save-baseline
+    python -m benchmarks.load_test --check    # código de saída 1 em caso de regressão
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+from app.config import settings
+from app.utils.text import CITY_ALIASES
+from benchmarks.fake_open_meteo import FakeOpenMeteoConfig, FakeOpenMeteoServer, load_gazetteer, long_tail_name
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+
+# Métricas comparadas com a linha de base: nome -> True se maior é melhor
+COMPARED_METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "upstream_calls": False
+}
+
+
+@dataclass
+class Scenario:
+    description: str
+    make_picker: Callable[[random.Random], Callable[[], str]]
+    upstream: Dict[str, float] = field(default_factory=dict)   # Ajustes do servidor falso
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def strip_accents(value: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", value) if not unicodedata.combining(c))
+
+
+def harmless_variant(rng: random.Random, name: str) -> str:
+    """Variação que a canonicalização resolve (caixa, acentos, espaços)"""
+    choice = rng.randrange(4)
+    if choice == 0:
+        return name.upper()
+    if choice == 1:
+        return strip_accents(name).lower()
+    if choice == 2:
+        return "  " + name.replace(" ", "  ") + " "
+    return name
+
+
+def misspelling(rng: random.Random, name: str) -> str:
+    """Erro de digitação de verdade (troca ou remove uma letra): cidade inexistente"""
+    if len(name) < 4:
+        return name + "x"
+    index = rng.randrange(1, len(name) - 2)
+    if rng.random() < 0.5:
+        return name[:index] + name[index + 1] + name[index] + name[index + 2:]
+    return name[:index] + name[index + 1:]
+
+
+def build_scenarios(long_tail_size: int) -> Dict[str, Scenario]:
+    hot_names = [name for name, _, _ in load_gazetteer().values()]
+
+    def hot_set(rng: random.Random) -> Callable[[], str]:
+        names = hot_names[:]
+        rng.shuffle(names)
+        weights = zipf_weights(len(names))
+        return lambda: rng.choices(names, weights)[0]
+
+    def long_tail(rng: random.Random) -> Callable[[], str]:
+        pick_hot = hot_set(rng)
+        return lambda: pick_hot() if rng.random() < 0.3 else long_tail_name(rng.randrange(long_tail_size))
+
+    def typos(rng: random.Random) -> Callable[[], str]:
+        pick_hot = hot_set(rng)
+        aliases = list(CITY_ALIASES)
+
+        def pick() -> str:
+            roll = rng.random()
+            if roll < 0.15:
+                return rng.choice(aliases)
+            if roll < 0.35:
+                return misspelling(rng, pick_hot())
+            return harmless_variant(rng, pick_hot())
+        return pick
+
+    return {
+        "hot_set": Scenario("Zipf sobre os municípios do índice", hot_set),
+        "long_tail": Scenario(f"30% quente, 70% cauda longa de {long_tail_size} municípios", long_tail),
+        "typos": Scenario("Conjunto quente com apelidos, variações e erros de digitação", typos),
+        "degraded_upstream": Scenario(
+            "Cauda longa com upstream lento (200 ms) e 5% de erros",
+            long_tail,
+            upstream={"latency_ms": 200.0, "error_rate": 0.05}
+        )
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def fetch_stats(client: httpx.AsyncClient) -> dict:
+    response = await client.get("/weather/stats")
+    response.raise_for_status()
+    return response.json()
+
+
+def ratio(hits: float, misses: float) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    fake: FakeOpenMeteoServer,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    seed: int
+) -> dict:
+    """Dispara requests requisições com concurrency clientes em laço fechado"""
+    rng = random.Random(seed)
+    pick = scenario.make_picker(rng)
+    cities = [pick() for _ in range(requests)]
+
+    before = await fetch_stats(client)
+    fake.reset_stats()
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue = iter(cities)
+
+    async def worker() -> None:
+        for city in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.get("/weather", params={"city": city})
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    after = await fetch_stats(client)
+    upstream = fake.stats.as_dict()
+    latencies.sort()
+    cache_before, cache_after = before["cache"], after["cache"]
+    response_before, response_after = before.get("response_cache", {}), after.get("response_cache", {})
+
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "upstream_calls": upstream["geocoding_calls"] + upstream["weather_calls"] + upstream["forecast_calls"],
+        "upstream": upstream,
+        "cache_hit_ratio": ratio(
+            cache_after["hits"] - cache_before["hits"],
+            cache_after["misses"] - cache_before["misses"]
+        ),
+        "response_cache_hit_ratio": ratio(
+            response_after.get("hits", 0) - response_before.get("hits", 0),
+            response_after.get("misses", 0) - response_before.get("misses", 0)
+        )
+    }
+
+
+async def reset_in_process_state() -> None:
+    """Zera os caches da API em processo para que cada cenário comece frio"""
+    from app.utils.cache import cache
+    from app.utils.response_cache import response_cache
+
+    await cache.clear()
+    response_cache.clear()
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Lista as métricas que pioraram além da tolerância em relação à linha de base"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print(
+        f"{'scenario':<20}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+        f"{'upstream':>10}{'cache hit':>11}{'resp hit':>10}  statuses"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<20}{r['throughput_rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            f"{r['upstream_calls']:>10}{r['cache_hit_ratio']:>11.2%}{r['response_cache_hit_ratio']:>10.2%}"
+            f"  {r['statuses']}"
+        )
+        reference = baseline.get(name)
+        if reference:
+            print(
+                f"{'  baseline':<20}{reference['throughput_rps']:>9.1f}{reference['p50_ms']:>9.2f}"
+                f"{reference['p90_ms']:>9.2f}{reference['p99_ms']:>9.2f}{reference['upstream_calls']:>10}"
+            )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=None, help="Cenários a executar (padrão: todos)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clientes simultâneos")
+    parser.add_argument("--long-tail-size", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latência do upstream falso")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument(
+        "--upstream-rate", type=float, default=0.0,
+        help="UPSTREAM_RATE_LIMIT usado na API em processo (0 desativa o balde de fichas)"
+    )
+    parser.add_argument("--target", default=None, help="URL de uma API já em execução")
+    parser.add_argument("--fake-port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Falha se houver regressão além da tolerância")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.long_tail_size)
+    names = args.scenarios or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    base_config = FakeOpenMeteoConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.payload_bytes, args.seed)
+    # O log por requisição do httpx distorceria a medição
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    fake = FakeOpenMeteoServer(FakeOpenMeteoConfig(**vars(base_config)), port=args.fake_port)
+    fake.start()
+
+    results: Dict[str, dict] = {}
+    try:
+        if args.target:
+            client = httpx.AsyncClient(base_url=args.target, timeout=30.0)
+            lifespan = None
+        else:
+            # Configura a API antes de importá-la (o serviço lê as URLs na criação)
+            settings.geocoding_api_url = f"{fake.base_url}/v1/search"
+            settings.weather_api_url = f"{fake.base_url}/v1/forecast"
+            settings.upstream_rate_limit = args.upstream_rate
+            settings.prewarm_cities = []
+            from app.main import app
+
+            lifespan = app.router.lifespan_context(app)
+            await lifespan.__aenter__()
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30.0
+            )
+
+        async with client:
+            for index, name in enumerate(names):
+                scenario = scenarios[name]
+                config = fake.app.state.config
+                for key, value in vars(base_config).items():
+                    setattr(config, key, scenario.upstream.get(key, value))
+                if lifespan is not None:
+                    await reset_in_process_state()
+                print(f"Running {name}: {scenario.description}", file=sys.stderr)
+                results[name] = await run_scenario(
+                    client, fake, scenario, args.requests, args.concurrency, args.seed + index
+                )
+
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    finally:
+        fake.stop()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2, ensure_ascii=False) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,156 @@
+"""
+Vazão e chamadas ao upstream com vários workers (app.launcher)
+
+Para cada número de workers, a API é iniciada pelo launcher com o cache
+compartilhado e com caches independentes (--no-shared-cache), apontando para
+uma Open-Meteo local (benchmarks.fake_open_meteo), e recebe a mesma carga em
+laço fechado sobre o conjunto quente de cidades. Com caches independentes
+cada worker busca as mesmas cidades no upstream; com o cache compartilhado
+cada chave é buscada uma vez. A escala da vazão depende dos núcleos livres:
+o gerador de carga e o servidor falso rodam nesta mesma máquina.
+
+Uso (a partir de backend/):
+    python -m benchmarks.multi_worker
+    python -m benchmarks.multi_worker --workers 1 2 4 8 --requests 8000 --concurrency 128
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.fake_open_meteo import FakeOpenMeteoConfig, FakeOpenMeteoServer
+from benchmarks.load_test import build_scenarios, percentile
+
+MODES = {
+    "shared": [],
+    "independent": ["--no-shared-cache"]
+}
+
+
+def start_api(workers: int, mode: str, port: int, fake: FakeOpenMeteoServer) -> subprocess.Popen:
+    """Inicia a API pelo launcher, apontando para o servidor falso"""
+    env = {
+        **os.environ,
+        "GEOCODING_API_URL": f"{fake.base_url}/v1/search",
+        "WEATHER_API_URL": f"{fake.base_url}/v1/forecast",
+        "UPSTREAM_RATE_LIMIT": "0",
+        "PREWARM_CITIES": "[]"
+    }
+    socket_path = os.path.join(tempfile.gettempdir(), f"multi-worker-bench-{os.getpid()}.sock")
+    command = [
+        sys.executable, "-m", "app.launcher",
+        "--workers", str(workers), "--port", str(port), "--socket", socket_path, "--log-level", "warning",
+        *MODES[mode]
+    ]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_api(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API encerrou ao iniciar (código {process.returncode})")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"API não respondeu em {timeout}s")
+
+
+async def run_load(client: httpx.AsyncClient, cities: List[str], concurrency: int) -> dict:
+    """Dispara as requisições com concurrency clientes em laço fechado"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue = iter(cities)
+
+    async def worker() -> None:
+        for city in queue:
+            started = time.perf_counter()
+            try:
+                status = (await client.get("/weather", params={"city": city})).status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "throughput_rps": round(len(cities) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--scenario", default="hot_set")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latência do upstream falso")
+    parser.add_argument("--settle", type=float, default=2.0, help="Espera após /health para os demais workers subirem")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fake-port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scenario = build_scenarios(2000)[args.scenario]
+    pick = scenario.make_picker(random.Random(args.seed))
+    cities = [pick() for _ in range(args.requests)]
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    fake = FakeOpenMeteoServer(FakeOpenMeteoConfig(latency_ms=args.latency_ms), port=args.fake_port)
+    fake.start()
+
+    print(f"Núcleos: {os.cpu_count()}; cenário {args.scenario}, {args.requests} requisições", file=sys.stderr)
+    print(f"{'workers':>7}  {'cache':<12}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'upstream':>10}  statuses")
+    try:
+        for workers in args.workers:
+            for mode in args.modes:
+                process = start_api(workers, mode, args.port, fake)
+                try:
+                    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0) as client:
+                        await wait_ready(client, process)
+                        await asyncio.sleep(args.settle * (workers > 1))
+                        fake.reset_stats()
+                        result = await run_load(client, cities, args.concurrency)
+                finally:
+                    stop_api(process)
+                upstream = fake.stats.as_dict()
+                calls = upstream["geocoding_calls"] + upstream["weather_calls"] + upstream["forecast_calls"]
+                print(
+                    f"{workers:>7}  {mode:<12}{result['throughput_rps']:>9.1f}{result['p50_ms']:>9.2f}"
+                    f"{result['p99_ms']:>9.2f}{calls:>10}  {result['statuses']}",
+                    flush=True
+                )
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
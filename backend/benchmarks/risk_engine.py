@@ -0,0 +1,166 @@
+"""
+Benchmark do motor de risco vetorizado contra a análise escalar original
+
+Também verifica que ambos produzem exatamente o mesmo resultado, inclusive
+nos limites de cada faixa.
+
+Uso (a partir de backend/):
+    python -m benchmarks.risk_engine --points 100000
+"""
+import argparse
+import random
+import time
+from typing import List, Literal, Tuple
+
+import numpy as np
+
+from app.services.risk_engine import assess_risk
+
+
+def legacy_analyze(weather_data: dict) -> Tuple[str, List[str]]:
+    """Implementação escalar original (referência de equivalência)"""
+    current = weather_data["current"]
+
+    temp = current.get("temperature_2m", 0)
+    humidity = current.get("relativehumidity_2m", 0)
+    precipitation = current.get("precipitation", 0)
+    wind_speed = current.get("windspeed_10m", 0)
+
+    risk_factors = []
+    recommendations = []
+
+    if temp > 35 or temp < 10:
+        risk_factors.append("temperature")
+        if temp > 35:
+            recommendations.append("⚠️ Temperatura muito alta - risco de estresse hídrico")
+        else:
+            recommendations.append("⚠️ Temperatura baixa - risco de crescimento lento")
+    elif temp > 30 or temp < 15:
+        risk_factors.append("temperature")
+        if temp > 30:
+            recommendations.append("🌡️ Temperatura elevada - monitore a irrigação")
+        else:
+            recommendations.append("🌡️ Temperatura amena - boas condições para desenvolvimento")
+    else:
+        recommendations.append("✅ Temperatura ideal para o desenvolvimento da cana")
+
+    if precipitation > 50:
+        risk_factors.append("precipitation")
+        recommendations.append("🌧️ Chuva intensa - risco de erosão e alagamento")
+    elif precipitation > 20:
+        risk_factors.append("precipitation")
+        recommendations.append("💧 Chuva moderada - boas condições de umidade")
+    elif precipitation > 0:
+        recommendations.append("🌦️ Chuva leve - condições favoráveis")
+    else:
+        recommendations.append("☀️ Sem chuva - verifique necessidade de irrigação")
+
+    if humidity < 30 or humidity > 90:
+        risk_factors.append("humidity")
+        if humidity < 30:
+            recommendations.append("🏜️ Umidade baixa - risco de desidratação")
+        else:
+            recommendations.append("💦 Umidade alta - risco de doenças fúngicas")
+    elif humidity < 40 or humidity > 80:
+        risk_factors.append("humidity")
+        recommendations.append("🌫️ Umidade moderada - monitore pragas e doenças")
+    else:
+        recommendations.append("💨 Umidade adequada para o cultivo")
+
+    if wind_speed > 40:
+        risk_factors.append("wind")
+        recommendations.append("💨 Vento forte - risco de quebra e perda de umidade")
+    elif wind_speed > 25:
+        risk_factors.append("wind")
+        recommendations.append("🍃 Vento moderado - evite pulverização")
+    else:
+        recommendations.append("🍃 Condições de vento favoráveis")
+
+    risk_level: Literal["low", "medium", "high"]
+    if len(risk_factors) >= 3 or any(factor in ["temperature", "precipitation"] and
+                                      ((temp > 35 or temp < 10) or precipitation > 50)
+                                      for factor in risk_factors):
+        risk_level = "high"
+    elif len(risk_factors) >= 1:
+        risk_level = "medium"
+    else:
+        risk_level = "low"
+
+    if risk_level == "high":
+        recommendations.insert(0, "🚨 CONDIÇÕES ADVERSAS - Monitore sua lavoura constantemente")
+    elif risk_level == "medium":
+        recommendations.insert(0, "⚠️ ATENÇÃO - Mantenha-se alerta às condições")
+    else:
+        recommendations.insert(0, "✅ CONDIÇÕES FAVORÁVEIS - Bom momento para atividades agrícolas")
+
+    return risk_level, recommendations
+
+
+BOUNDARIES = {
+    "temperature_2m": [9.9, 10, 14.9, 15, 30, 30.1, 35, 35.1],
+    "relativehumidity_2m": [29, 30, 39, 40, 80, 81, 90, 91],
+    "precipitation": [0, 0.1, 20, 20.1, 50, 50.1],
+    "windspeed_10m": [25, 25.1, 40, 40.1]
+}
+
+
+def random_points(count: int, seed: int = 42) -> List[dict]:
+    """Gera pontos aleatórios misturando valores de limite e valores contínuos"""
+    rng = random.Random(seed)
+    ranges = {
+        "temperature_2m": (0, 45),
+        "relativehumidity_2m": (10, 100),
+        "precipitation": (0, 80),
+        "windspeed_10m": (0, 60)
+    }
+    points = []
+    for _ in range(count):
+        current = {}
+        for field, (low, high) in ranges.items():
+            if rng.random() < 0.3:
+                current[field] = rng.choice(BOUNDARIES[field])
+            else:
+                current[field] = round(rng.uniform(low, high), 1)
+        points.append({"current": current})
+    return points
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100_000)
+    args = parser.parse_args()
+
+    points = random_points(args.points)
+
+    start = time.perf_counter()
+    scalar = [legacy_analyze(point) for point in points]
+    scalar_time = time.perf_counter() - start
+
+    columns = {
+        field: np.fromiter((point["current"][field] for point in points), dtype=np.float64, count=len(points))
+        for field in BOUNDARIES
+    }
+    start = time.perf_counter()
+    assessment = assess_risk(
+        columns["temperature_2m"],
+        columns["relativehumidity_2m"],
+        columns["precipitation"],
+        columns["windspeed_10m"]
+    )
+    vector_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vector = [(assessment.risk_level(i), assessment.recommendations(i)) for i in range(len(points))]
+    materialize_time = time.perf_counter() - start
+
+    mismatches = sum(1 for expected, actual in zip(scalar, vector) if expected != actual)
+
+    print(f"pontos:                     {args.points}")
+    print(f"escalar (original):         {scalar_time * 1e3:10.2f} ms  ({scalar_time / args.points * 1e6:.2f} µs/ponto)")
+    print(f"vetorizado (níveis):        {vector_time * 1e3:10.2f} ms  ({vector_time / args.points * 1e6:.3f} µs/ponto)")
+    print(f"vetorizado + recomendações: {(vector_time + materialize_time) * 1e3:10.2f} ms")
+    print(f"divergências:               {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Custo de CPU da serialização JSON por requisição
+
+Decodificação de respostas do upstream (response.json() do httpx contra
+response_json) e codificação das respostas da API (caminho padrão do FastAPI,
+serialize_response + JSONResponse, contra FastJSONResponse). Os corpos
+produzidos pelos dois caminhos são comparados antes da medição.
+
+Uso (a partir de backend/):
+    python -m benchmarks.serialization --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.api.routes import weather as weather_routes
+from app.models.weather import (
+    AgriculturalInsight,
+    BatchLocationQuery,
+    BatchWeatherItem,
+    BatchWeatherResponse,
+    CurrentWeather,
+    ForecastDay,
+    ForecastPoint,
+    ForecastResponse,
+    Location,
+    WeatherResponse
+)
+from app.utils import serialization
+from app.utils.serialization import FastJSONResponse, response_json
+
+
+def current_body(locations: int) -> bytes:
+    item = {
+        "latitude": -21.18, "longitude": -47.81, "generationtime_ms": 0.05, "utc_offset_seconds": -10800,
+        "timezone": "America/Sao_Paulo", "timezone_abbreviation": "-03", "elevation": 546.0,
+        "current_units": {"time": "iso8601", "temperature_2m": "°C", "relativehumidity_2m": "%"},
+        "current": {
+            "time": "2024-05-01T12:00", "interval": 900, "temperature_2m": 27.3, "relativehumidity_2m": 61,
+            "precipitation": 0.0, "windspeed_10m": 11.2, "pressure_msl": 1014.2, "cloudcover": 20
+        }
+    }
+    return json.dumps(item if locations == 1 else [item] * locations).encode()
+
+
+def forecast_body(days: int) -> bytes:
+    start = 1714521600
+    hours = [start + i * 3600 for i in range(days * 24)]
+    return json.dumps({
+        "latitude": -21.18, "longitude": -47.81, "utc_offset_seconds": -10800,
+        "hourly": {
+            "time": hours,
+            "temperature_2m": [20.0 + (i % 24) * 0.5 for i in range(len(hours))],
+            "relativehumidity_2m": [60 + i % 30 for i in range(len(hours))],
+            "precipitation": [0.1 * (i % 7) for i in range(len(hours))],
+            "windspeed_10m": [10.0 + i % 9 for i in range(len(hours))]
+        },
+        "daily": {
+            "time": [start + d * 86400 for d in range(days)],
+            "temperature_2m_max": [34.0] * days, "temperature_2m_min": [17.0] * days,
+            "precipitation_sum": [2.5] * days, "windspeed_10m_max": [30.0] * days
+        }
+    }).encode()
+
+
+def archive_body(days: int) -> bytes:
+    first = date(2014, 1, 1)
+    return json.dumps({
+        "daily": {
+            "time": [(first + timedelta(days=d)).isoformat() for d in range(days)],
+            "temperature_2m_max": [30.0 + d % 5 for d in range(days)],
+            "temperature_2m_min": [18.0 + d % 3 for d in range(days)],
+            "precipitation_sum": [float(d % 11) for d in range(days)]
+        }
+    }).encode()
+
+
+def weather_response() -> WeatherResponse:
+    return WeatherResponse(
+        location=Location(name="Ribeirão Preto", latitude=-21.1775, longitude=-47.8103),
+        current=CurrentWeather(
+            temperature=27.3, humidity=61, precipitation=0.0, wind_speed=11.2,
+            pressure=1014.2, cloud_cover=20, last_updated=datetime.now()
+        ),
+        agricultural_insights=AgriculturalInsight(risk_level="low", recommendations=["Condições favoráveis"])
+    )
+
+
+def forecast_response(hours: int) -> ForecastResponse:
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    return ForecastResponse(
+        location=Location(name="Ribeirão Preto", latitude=-21.1775, longitude=-47.8103),
+        hourly=[
+            ForecastPoint(
+                time=start + timedelta(hours=i), temperature=20.0 + i % 12, humidity=60.0,
+                precipitation=0.0, wind_speed=10.0, risk_level="low", risk_factors=0
+            )
+            for i in range(hours)
+        ],
+        daily=[
+            ForecastDay(
+                day=(start + timedelta(days=d)).date(), temperature_max=34.0, temperature_min=17.0,
+                precipitation_sum=2.5, wind_speed_max=30.0, risk_level="medium", high_risk_hours=2
+            )
+            for d in range(hours // 24 + 1)
+        ]
+    )
+
+
+def batch_response(items: int) -> BatchWeatherResponse:
+    data = weather_response()
+    return BatchWeatherResponse(results=[
+        BatchWeatherItem(query=BatchLocationQuery(city=f"Cidade {i}"), status_code=200, data=data)
+        for i in range(items)
+    ])
+
+
+def cpu_us(func: Callable[[], Any], iterations: int) -> float:
+    """Tempo de CPU médio por chamada em µs"""
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def response_field(path: str):
+    route = next(r for r in weather_routes.router.routes if isinstance(r, APIRoute) and r.path == path)
+    return route.response_field
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    loop = asyncio.new_event_loop()
+
+    print(f"JSON rápido: {'orjson' if serialization.FAST_JSON else 'indisponível (json da biblioteca padrão)'}")
+    print(f"{'operation':<32}{'default µs':>12}{'fast µs':>10}{'speedup':>9}")
+
+    decode_cases: List[tuple] = [
+        ("decode current (1 local)", current_body(1)),
+        ("decode current (50 locais)", current_body(50)),
+        ("decode forecast (7 dias)", forecast_body(7)),
+        ("decode archive (3660 dias)", archive_body(3660))
+    ]
+    for name, body in decode_cases:
+        assert httpx.Response(200, content=body).json() == response_json(httpx.Response(200, content=body))
+        iterations = max(args.iterations // max(len(body) // 20000, 1), 20)
+        default = cpu_us(lambda: httpx.Response(200, content=body).json(), iterations)
+        fast = cpu_us(lambda: response_json(httpx.Response(200, content=body)), iterations)
+        print(f"{name:<32}{default:>12.1f}{fast:>10.1f}{default / fast:>8.1f}x")
+
+    encode_cases: List[tuple] = [
+        ("encode weather", weather_response(), "/weather"),
+        ("encode forecast (48 h)", forecast_response(48), "/weather/forecast"),
+        ("encode forecast (168 h)", forecast_response(168), "/weather/forecast"),
+        ("encode batch (200 itens)", batch_response(200), "/weather/batch")
+    ]
+    for name, model, path in encode_cases:
+        field = response_field(path)
+
+        def default_path() -> bytes:
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=model, is_coroutine=True)
+            )
+            return JSONResponse(content).body
+
+        def fast_path() -> bytes:
+            return FastJSONResponse(model).body
+
+        assert json.loads(default_path()) == json.loads(fast_path()), name
+        iterations = max(args.iterations // (10 if "batch" in name else 1), 20)
+        default = cpu_us(default_path, iterations)
+        fast = cpu_us(fast_path, iterations)
+        print(f"{name:<32}{default:>12.1f}{fast:>10.1f}{default / fast:>8.1f}x")
+
+    stats: Dict[str, Any] = {"cache": {"size": 1000, "prefixes": {"weather": 600, "geocoding": 400}}, "ok": True}
+    default = cpu_us(lambda: JSONResponse(stats).body, args.iterations)
+    fast = cpu_us(lambda: FastJSONResponse(stats).body, args.iterations)
+    print(f"{'encode stats (dict)':<32}{default:>12.1f}{fast:>10.1f}{default / fast:>8.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
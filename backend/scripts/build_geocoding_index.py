@@ -0,0 +1,51 @@
+"""
+Gera o índice compacto de municípios usado na geocodificação offline
+
+Entrada: CSV com as colunas nome, latitude, longitude e codigo_uf (formato do
+dataset público kelvins/municipios-brasileiros, derivado do IBGE) ou TSV
+simples com nome, UF, latitude e longitude.
+
+Uso (a partir de backend/):
+    python -m scripts.build_geocoding_index municipios.csv app/data/municipios.tsv.gz
+"""
+import argparse
+import csv
+from pathlib import Path
+from typing import Iterator
+
+from app.services.geocoding_index import Record, write_index
+
+# Códigos de UF do IBGE
+UF_CODES = {
+    11: "RO", 12: "AC", 13: "AM", 14: "RR", 15: "PA", 16: "AP", 17: "TO",
+    21: "MA", 22: "PI", 23: "CE", 24: "RN", 25: "PB", 26: "PE", 27: "AL", 28: "SE", 29: "BA",
+    31: "MG", 32: "ES", 33: "RJ", 35: "SP",
+    41: "PR", 42: "SC", 43: "RS",
+    50: "MS", 51: "MT", 52: "GO", 53: "DF"
+}
+
+
+def read_records(path: Path) -> Iterator[Record]:
+    """Lê municípios de um CSV do IBGE ou de um TSV nome/UF/latitude/longitude"""
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.suffix == ".tsv":
+            for name, state, latitude, longitude in csv.reader(file, delimiter="\t"):
+                yield name, state, float(latitude), float(longitude)
+            return
+
+        for row in csv.DictReader(file):
+            yield row["nome"], UF_CODES[int(row["codigo_uf"])], float(row["latitude"]), float(row["longitude"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path)
+    parser.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    count = write_index(sorted(read_records(args.source)), args.output)
+    print(f"{count} municípios gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
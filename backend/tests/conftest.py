@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+# Testes isolados: sem cache compartilhado nem segundo nível, independente do .env local
+os.environ["CACHE_SHARED_SOCKET"] = ""
+os.environ["CACHE_L2_ENABLED"] = "false"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
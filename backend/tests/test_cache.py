@@ -0,0 +1,206 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import MemoryCache, SingleFlight, cached
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Cache e single-flight novos a cada teste (o decorator consulta as instâncias globais)"""
+    memory = MemoryCache(max_size=100, fallback_ttl=60)
+    flight = SingleFlight()
+    monkeypatch.setattr(cache_module, "cache", memory)
+    monkeypatch.setattr(cache_module, "single_flight", flight)
+    return memory, flight
+
+
+async def wait_until(condition, timeout: float = 1.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não atingida a tempo"
+        await asyncio.sleep(0.005)
+
+
+async def test_concurrent_misses_share_one_call(fresh_cache):
+    _, flight = fresh_cache
+    calls = []
+
+    @cached(ttl=60, key_prefix="test")
+    async def fetch(city: str) -> str:
+        calls.append(city)
+        await asyncio.sleep(0.05)
+        return city.upper()
+
+    results = await asyncio.gather(*(fetch("campinas") for _ in range(10)))
+
+    assert results == ["CAMPINAS"] * 10
+    assert calls == ["campinas"]
+    assert flight.coalesced == 9
+    assert await fetch("campinas") == "CAMPINAS"
+    assert calls == ["campinas"]
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    calls = []
+
+    @cached(ttl=60, key_prefix="test")
+    async def fetch(city: str) -> str:
+        calls.append(city)
+        await asyncio.sleep(0.05)
+        return city.upper()
+
+    first = asyncio.ensure_future(fetch("campinas"))
+    second = asyncio.ensure_future(fetch("campinas"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "CAMPINAS"
+    assert first.cancelled()
+    assert calls == ["campinas"]
+
+
+async def test_last_waiter_leaving_cancels_shared_call(fresh_cache):
+    _, flight = fresh_cache
+    finished = []
+
+    @cached(ttl=60, key_prefix="test")
+    async def fetch(city: str) -> str:
+        await asyncio.sleep(0.05)
+        finished.append(city)
+        return city
+
+    task = asyncio.ensure_future(fetch("campinas"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.sleep(0.08)
+
+    assert finished == []
+    assert flight.abandoned == 1
+    assert not flight.is_in_flight(fetch.cache_key("campinas"))
+
+
+async def test_stale_entry_is_served_while_revalidating(fresh_cache):
+    memory, flight = fresh_cache
+    version = [0]
+
+    @cached(ttl=60, stale_ttl=60, key_prefix="test")
+    async def fetch(city: str) -> int:
+        version[0] += 1
+        return version[0]
+
+    assert await fetch("campinas") == 1
+    memory._cache[fetch.cache_key("campinas")].stale_at = time.monotonic() - 1
+
+    # O valor obsoleto volta na hora; a atualização roda em segundo plano
+    assert await fetch("campinas") == 1
+    await wait_until(lambda: version[0] == 2)
+    await wait_until(lambda: not flight.is_in_flight(fetch.cache_key("campinas")))
+
+    assert await fetch("campinas") == 2
+    assert flight.background_refreshes == 1
+
+
+async def test_expired_entry_is_not_served(fresh_cache):
+    memory, _ = fresh_cache
+    version = [0]
+
+    @cached(ttl=60, stale_ttl=60, key_prefix="test")
+    async def fetch(city: str) -> int:
+        version[0] += 1
+        return version[0]
+
+    assert await fetch("campinas") == 1
+    entry = memory._cache[fetch.cache_key("campinas")]
+    entry.stale_at = entry.expires_at = time.monotonic() - 1
+
+    assert await fetch("campinas") == 2
+
+
+async def test_negative_cache_reraises_without_calling_again():
+    calls = []
+
+    @cached(ttl=60, key_prefix="test", negative_ttls={LookupError: 60})
+    async def fetch(city: str) -> str:
+        calls.append(city)
+        raise LookupError(city)
+
+    for _ in range(3):
+        with pytest.raises(LookupError):
+            await fetch("atlantida")
+    assert calls == ["atlantida"]
+
+
+async def test_cache_many_batches_misses_and_keeps_none_results():
+    batches = []
+
+    class Service:
+        @cached(ttl=60, key_prefix="test")
+        async def lookup(self, code: int):
+            raise AssertionError("cache_many não deve chamar a função item a item")
+
+    service = Service()
+
+    async def fetch_many(calls):
+        batches.append([code for _, code in calls])
+        return [None if code % 2 else code * 10 for _, code in calls]
+
+    calls = [(service, code) for code in (1, 2, 1, 3, 2)]
+    first = await Service.lookup.cache_many(calls, fetch_many, chunk_size=2)
+    second = await Service.lookup.cache_many(calls, fetch_many, chunk_size=2)
+
+    assert first == second == [None, 20, None, None, 20]
+    # Chaves repetidas são buscadas uma vez; None é um resultado em cache, não uma falta
+    assert batches == [[1, 2], [3]]
+
+
+async def test_cache_many_joins_call_already_in_flight():
+    started = asyncio.Event()
+    release = asyncio.Event()
+    batches = []
+
+    class Service:
+        @cached(ttl=60, key_prefix="test")
+        async def lookup(self, code: int) -> int:
+            started.set()
+            await release.wait()
+            return code * 100
+
+    service = Service()
+
+    async def fetch_many(calls):
+        batches.append([code for _, code in calls])
+        return [code * 10 for _, code in calls]
+
+    single = asyncio.ensure_future(service.lookup(1))
+    await started.wait()
+    batch = asyncio.ensure_future(Service.lookup.cache_many([(service, 1), (service, 2)], fetch_many))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await batch == [100, 20]
+    assert await single == 100
+    assert batches == [[2]]
+
+
+async def test_cache_many_reports_failures_per_item():
+    class Service:
+        @cached(ttl=60, key_prefix="test")
+        async def lookup(self, code: int) -> int:
+            return code
+
+    service = Service()
+
+    async def fetch_many(calls):
+        if any(code == 3 for _, code in calls):
+            raise RuntimeError("upstream")
+        return [code for _, code in calls]
+
+    results = await Service.lookup.cache_many([(service, code) for code in (1, 2, 3)], fetch_many, chunk_size=2)
+
+    assert results[:2] == [1, 2]
+    assert isinstance(results[2], RuntimeError)
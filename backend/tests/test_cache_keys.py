@@ -0,0 +1,84 @@
+import inspect
+
+import pytest
+
+from app.utils.cache_keys import key_builder
+
+
+class Service:
+    async def forecast(self, latitude: float, longitude: float, days: int = 7, units: str = "metric"):
+        pass
+
+    async def search(self, query: str, *filters, limit: int = 10, **options):
+        pass
+
+
+def bound_key(func, *args, **kwargs):
+    """Chave montada pelo caminho lento (signature.bind), para comparação"""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return ("test", func.__name__) + tuple(bound.arguments.values())[1:]
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [
+        ((-22.9, -47.1), {}),
+        ((-22.9, -47.1, 3), {}),
+        ((-22.9, -47.1, 3, "imperial"), {}),
+        ((-22.9,), {"longitude": -47.1}),
+        ((), {"latitude": -22.9, "longitude": -47.1, "units": "imperial"}),
+        ((-22.9, -47.1), {"units": "imperial"}),
+        ((-22.9,), {"units": "imperial", "longitude": -47.1, "days": 3}),
+    ],
+)
+def test_fast_path_matches_signature_bind(args, kwargs):
+    make_key = key_builder(Service.forecast, "test")
+    service = Service()
+
+    assert make_key(service, *args, **kwargs) == bound_key(Service.forecast, service, *args, **kwargs)
+
+
+def test_key_args_selects_named_values():
+    make_key = key_builder(Service.forecast, "test", key_args=("longitude", "latitude"))
+    service = Service()
+
+    assert make_key(service, -22.9, -47.1, days=3) == ("test", "forecast", -47.1, -22.9)
+    assert make_key(service, latitude=-22.9, longitude=-47.1) == ("test", "forecast", -47.1, -22.9)
+
+
+def test_unknown_key_args_are_rejected():
+    with pytest.raises(ValueError, match="altitude"):
+        key_builder(Service.forecast, "test", key_args=("altitude",))
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [
+        ((-22.9,), {}),
+        ((-22.9, -47.1, 3, "metric", "extra"), {}),
+        ((-22.9, -47.1), {"latitude": -22.9}),
+        ((-22.9, -47.1), {"altitude": 600}),
+    ],
+)
+def test_invalid_arguments_raise_like_the_function(args, kwargs):
+    make_key = key_builder(Service.forecast, "test")
+
+    with pytest.raises(TypeError):
+        make_key(Service(), *args, **kwargs)
+
+
+def test_variadic_signature_uses_signature_bind():
+    make_key = key_builder(Service.search, "test")
+    service = Service()
+
+    assert make_key(service, "campinas", "chuva", limit=5, lang="pt") == (
+        "test", "search", "campinas", ("chuva",), 5, {"lang": "pt"}
+    )
+    assert make_key(service, "campinas") == ("test", "search", "campinas", (), 10, {})
+
+
+def test_custom_key_receives_arguments_without_self():
+    make_key = key_builder(Service.forecast, "test", key=lambda latitude, longitude, **_: (round(latitude), round(longitude)))
+
+    assert make_key(Service(), -22.9, -47.1, days=3) == ("test", "forecast", -23, -47)
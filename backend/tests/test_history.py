@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.history import plan_fetches, shift_years
+from app.services.history_store import (
+    PRECIPITATION,
+    TEMPERATURE_MAX,
+    HistoryStore,
+    split_by_year,
+)
+
+
+def days_between(start: date, end: date):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def test_plan_fetches_merges_close_gaps():
+    missing = [
+        (date(2020, 3, 1), date(2020, 3, 31)),
+        (date(2020, 1, 1), date(2020, 1, 31)),
+        (date(2020, 12, 1), date(2020, 12, 31)),
+    ]
+
+    assert plan_fetches(missing, merge_gap_days=30, max_days=3660) == [
+        (date(2020, 1, 1), date(2020, 3, 31)),
+        (date(2020, 12, 1), date(2020, 12, 31)),
+    ]
+    assert plan_fetches(missing, merge_gap_days=366, max_days=3660) == [
+        (date(2020, 1, 1), date(2020, 12, 31)),
+    ]
+
+
+def test_plan_fetches_respects_max_days_when_merging():
+    missing = [(date(2020, 1, 1), date(2020, 1, 10)), (date(2020, 1, 15), date(2020, 1, 25))]
+
+    assert plan_fetches(missing, merge_gap_days=30, max_days=20) == missing
+
+
+def test_plan_fetches_splits_long_gaps():
+    plans = plan_fetches([(date(2000, 1, 1), date(2000, 1, 25))], merge_gap_days=0, max_days=10)
+
+    assert plans == [
+        (date(2000, 1, 1), date(2000, 1, 10)),
+        (date(2000, 1, 11), date(2000, 1, 20)),
+        (date(2000, 1, 21), date(2000, 1, 25)),
+    ]
+    assert all((end - start).days < 10 for start, end in plans)
+
+
+def test_split_by_year_columns():
+    assert split_by_year(date(2019, 12, 30), date(2021, 1, 2)) == [
+        (2019, 363, 365),
+        (2020, 0, 366),
+        (2021, 0, 2),
+    ]
+    assert split_by_year(date(2023, 3, 1), date(2023, 3, 1)) == [(2023, 59, 60)]
+
+
+def test_shift_years_clamps_leap_day():
+    assert shift_years(date(2024, 2, 29), 1) == date(2023, 2, 28)
+    assert shift_years(date(2023, 6, 15), 10) == date(2013, 6, 15)
+
+
+def test_missing_ranges_across_year_boundary(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    start, end = date(2019, 12, 1), date(2020, 1, 31)
+    assert store.missing_ranges("cell", start, end) == [(start, end)]
+
+    stored = days_between(date(2019, 12, 10), date(2019, 12, 20)) + days_between(date(2020, 1, 5), date(2020, 1, 31))
+    for block in (stored[:11], stored[11:]):
+        store.write(
+            "cell", block,
+            {TEMPERATURE_MAX: np.full(len(block), 30.0), PRECIPITATION: np.zeros(len(block))},
+            np.ones(len(block), dtype=bool)
+        )
+
+    # A lacuna que atravessa a virada do ano volta como um único intervalo
+    assert store.missing_ranges("cell", start, end) == [
+        (date(2019, 12, 1), date(2019, 12, 9)),
+        (date(2019, 12, 21), date(2020, 1, 4)),
+    ]
+    series = store.series("cell", date(2019, 12, 19), date(2019, 12, 22), TEMPERATURE_MAX)
+    assert series[:2].tolist() == [30.0, 30.0]
+    assert np.isnan(series[2:]).all()
+
+
+def test_unfetched_days_stay_missing(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    days = days_between(date(2021, 5, 1), date(2021, 5, 4))
+    store.write("cell", days, {PRECIPITATION: np.zeros(4)}, np.array([True, True, False, True]))
+
+    assert store.missing_ranges("cell", days[0], days[-1]) == [(date(2021, 5, 3), date(2021, 5, 3))]
+
+
+def test_writes_from_another_store_are_detected(tmp_path):
+    reader, writer = HistoryStore(str(tmp_path)), HistoryStore(str(tmp_path))
+    days = days_between(date(2022, 1, 1), date(2022, 1, 10))
+    writer.write("cell", days[:5], {PRECIPITATION: np.ones(5)}, np.ones(5, dtype=bool))
+    assert reader.aggregate("cell", days[0], days[-1], 10.0, 1.0, 5)["rainfall"] == 5.0
+
+    writer.write("cell", days[5:], {PRECIPITATION: np.ones(5)}, np.ones(5, dtype=bool))
+    assert reader.aggregate("cell", days[0], days[-1], 10.0, 1.0, 5)["rainfall"] == 10.0
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.utils import rate_limiter
+from app.utils.exceptions import UpstreamRejectedException
+from app.utils.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    TokenBucket,
+    UpstreamLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+async def fill(limiter: AdaptiveConcurrencyLimiter, count: int) -> None:
+    for _ in range(count):
+        assert await limiter.acquire(time.monotonic() + 1)
+
+
+@pytest.mark.anyio
+async def test_additive_increase_only_when_limit_is_in_use():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=10)
+
+    # Uma chamada isolada não prova que o limite comporta mais
+    await fill(limiter, 1)
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.limit == 4
+
+    # Com o limite ocupado, +1/limite por sucesso: cerca de +1 por janela
+    await fill(limiter, 3)
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.limit == 5
+
+
+@pytest.mark.anyio
+async def test_additive_increase_stops_at_max_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=3)
+    await fill(limiter, 2)
+    for _ in range(100):
+        limiter.on_success()
+
+    assert limiter.limit == 3
+
+
+def test_multiplicative_decrease_once_per_interval():
+    limiter = AdaptiveConcurrencyLimiter(initial=20, min_limit=2, backoff_ratio=0.5, decrease_interval=60)
+
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.limit == 10
+
+    limiter._last_decrease -= 60
+    limiter.on_overload()
+    assert limiter.limit == 5
+
+    for _ in range(5):
+        limiter._last_decrease -= 60
+        limiter.on_overload()
+    assert limiter.limit == 2
+
+
+@pytest.mark.anyio
+async def test_queued_callers_are_served_in_order_and_time_out():
+    limiter = AdaptiveConcurrencyLimiter(initial=1)
+    await fill(limiter, 1)
+
+    order = []
+
+    async def worker(name: str, timeout: float):
+        if await limiter.acquire(time.monotonic() + timeout):
+            order.append(name)
+
+    first = asyncio.ensure_future(worker("first", 1))
+    second = asyncio.ensure_future(worker("second", 1))
+    late = asyncio.ensure_future(worker("late", 0.01))
+    await asyncio.sleep(0.05)
+    assert limiter.queued == 2
+
+    limiter.release()
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(first, second, late)
+
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+
+@pytest.mark.anyio
+async def test_token_refunded_when_wait_is_cancelled():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert await bucket.acquire(time.monotonic() + 1)
+
+    task = asyncio.ensure_future(bucket.acquire(time.monotonic() + 1))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # Sem a devolução o saldo estaria perto de -1
+    assert bucket.tokens > -0.5
+
+
+def test_token_bucket_rejects_wait_beyond_deadline():
+    bucket = TokenBucket(rate=1, burst=1)
+    now = time.monotonic()
+
+    assert asyncio.run(bucket.acquire(now + 5))
+    assert not asyncio.run(bucket.acquire(time.monotonic() + 0.1))
+
+
+@pytest.mark.anyio
+async def test_upstream_limiter_rejects_and_refunds_when_queue_times_out():
+    limiter = UpstreamLimiter(
+        "api.test", rate=100, burst=5, initial_concurrency=1, min_concurrency=1, max_concurrency=1, queue_timeout=0.05
+    )
+    await limiter.acquire("Teste")
+    tokens = limiter.bucket.tokens
+
+    with pytest.raises(UpstreamRejectedException):
+        await limiter.acquire("Teste")
+
+    assert limiter.rejected == 1
+    assert limiter.bucket.tokens >= tokens
+    limiter.release("ok")
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 0 ") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_backoff_delay_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, "upstream_retry_max_delay", 5.0)
+
+    assert backoff_delay(0, retry_after=3.0) == 3.0
+    assert backoff_delay(4, retry_after=0.0) == 0.0
+    # Espera pedida acima do teto: não vale tentar de novo
+    assert backoff_delay(0, retry_after=60.0) is None
+
+
+def test_backoff_delay_uses_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, "upstream_retry_base_delay", 0.2)
+    monkeypatch.setattr(rate_limiter.settings, "upstream_retry_max_delay", 1.0)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+
+    assert backoff_delay(0) == pytest.approx(0.2)
+    assert backoff_delay(2) == pytest.approx(0.8)
+    assert backoff_delay(10) == pytest.approx(1.0)
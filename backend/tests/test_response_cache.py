@@ -0,0 +1,124 @@
+import gzip
+
+import pytest
+
+from app.utils import response_cache as response_cache_module
+from app.utils.response_cache import CachedResponse, parse_accept_encoding
+
+BODY = b'{"city": "Campinas", "temperature": 24.5}' * 20
+
+
+@pytest.fixture(autouse=True)
+def without_brotli(monkeypatch):
+    """Negociação determinística: só gzip, com ou sem o brotli instalado"""
+    monkeypatch.setattr(response_cache_module, "brotli", None)
+
+
+def test_parse_accept_encoding_reads_qvalues():
+    assert parse_accept_encoding("gzip;q=0.5, br , *;q=0, identity; q=0.9") == {
+        "gzip": 0.5,
+        "br": 1.0,
+        "*": 0.0,
+        "identity": 0.9,
+    }
+    assert parse_accept_encoding("GZIP;Q=0.3") == {"gzip": 0.3}
+    assert parse_accept_encoding("gzip;q=abc") == {"gzip": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("x-gzip", "gzip"),
+        ("gzip;q=0.1", "gzip"),
+        ("gzip;q=0", None),
+        ("deflate, *", "gzip"),
+        ("*;q=0", None),
+        ("gzip;q=0, *", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_honours_qvalues(header, expected):
+    assert CachedResponse(BODY).negotiate(header) == expected
+
+
+def test_negotiate_skips_small_bodies():
+    assert CachedResponse(b"{}").negotiate("gzip", min_size=500) is None
+
+
+def test_encoded_variant_is_built_once():
+    response = CachedResponse(BODY)
+    compressed = response.encoded("gzip")
+
+    assert gzip.decompress(compressed) == BODY
+    assert response.encoded("gzip") is compressed
+    assert response.encoded(None) is BODY
+
+
+def test_each_representation_has_its_own_etag():
+    response = CachedResponse(BODY)
+
+    assert response.etag(None) == f'"{response.digest}"'
+    assert response.etag("gzip") == f'"{response.digest}-gzip"'
+    assert CachedResponse(BODY).etag("gzip") == response.etag("gzip")
+    assert CachedResponse(BODY + b" ").etag("gzip") != response.etag("gzip")
+
+
+def test_if_none_match_uses_weak_comparison():
+    response = CachedResponse(BODY)
+    identity, compressed = response.etag(None), response.etag("gzip")
+
+    assert response.matches(compressed, "gzip")
+    assert response.matches(f"W/{compressed}", "gzip")
+    assert response.matches(f'"outro", {identity}', None)
+    assert response.matches("*", "gzip")
+    # O ETag de uma codificação não valida a outra
+    assert not response.matches(identity, "gzip")
+    assert not response.matches(compressed, None)
+    assert not response.matches(None, None)
+    assert not response.matches("", "gzip")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api.routes import weather
+    from app.main import app
+
+    payload = CachedResponse(BODY)
+
+    async def get_weather_payload(city_name):
+        return payload
+
+    monkeypatch.setattr(weather.settings, "response_cache_enabled", True)
+    monkeypatch.setattr(weather.settings, "response_compression_min_size", 0)
+    monkeypatch.setattr(weather.weather_service, "get_weather_payload", get_weather_payload)
+    return TestClient(app)
+
+
+def test_weather_route_answers_304_per_representation(client):
+    compressed = client.get("/weather", params={"city": "Campinas"}, headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.content == BODY
+    etag = compressed.headers["etag"]
+
+    not_modified = client.get(
+        "/weather", params={"city": "Campinas"}, headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    # Mesmo ETag, outra representação: o corpo completo é enviado
+    identity = client.get(
+        "/weather", params={"city": "Campinas"}, headers={"Accept-Encoding": "gzip;q=0", "If-None-Match": etag}
+    )
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] != etag
+    assert identity.content == BODY
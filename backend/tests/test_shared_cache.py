@@ -0,0 +1,88 @@
+import asyncio
+import os
+import stat
+
+import pytest
+
+from app.utils.cache_server import CacheServer
+from app.utils.shared_cache import SharedCacheClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def server(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    cache_server = CacheServer(path, max_size=100)
+    task = asyncio.ensure_future(cache_server.serve())
+    while not os.path.exists(path):
+        await asyncio.sleep(0.01)
+    yield cache_server, path
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.fixture
+async def clients(server):
+    _, path = server
+    workers = [SharedCacheClient(path, timeout=1.0) for _ in range(2)]
+    for worker in workers:
+        await worker.start()
+    yield workers
+    for worker in workers:
+        await worker.close()
+
+
+async def test_socket_is_private(server):
+    _, path = server
+
+    assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+
+
+async def test_lease_is_exclusive_until_value_is_set(server, clients):
+    cache_server, _ = server
+    first, second = clients
+
+    assert await first.acquire("key", wait_timeout=0) == (None, True)
+    waiting = asyncio.ensure_future(second.acquire("key", wait_timeout=2))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    first.set("key", {"temperature": 24.5}, ttl=60)
+    row, leased = await waiting
+
+    assert not leased
+    assert row[0] == {"temperature": 24.5}
+    assert cache_server.get_stats()["waits"] == 1
+    assert cache_server.get_stats()["active_leases"] == 0
+
+
+async def test_expired_lease_is_taken_over(server, clients):
+    cache_server, _ = server
+    first, second = clients
+
+    assert await first.lock("key", ttl=0.1)
+    assert not await second.lock("key", wait_timeout=0)
+    # O worker travado não devolve a concessão: ela vence após o TTL
+    assert await second.lock("key", ttl=5, wait_timeout=1)
+    assert cache_server.lease_expirations == 1
+
+
+async def test_leases_are_released_on_disconnect(server, clients):
+    cache_server, _ = server
+    first, second = clients
+
+    assert await first.acquire("key", wait_timeout=0) == (None, True)
+    waiting = asyncio.ensure_future(second.acquire("key", wait_timeout=5))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    await first.close()
+
+    assert await asyncio.wait_for(waiting, 1) == (None, True)
+    assert cache_server.lease_expirations == 0
+    await asyncio.sleep(0.01)
+    assert cache_server.connections == 1